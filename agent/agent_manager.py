@@ -2,71 +2,199 @@
 Agent identity and history management for the Unit platform.
 """
 import os
+import sys
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
-import requests
+from circuit_breaker import backend_request
+from memory_index import MemoryIndex, MEMORY_TOKEN_BUDGET, MEMORY_TOP_K
+from sqlite_reader import get_reader
+import tracing
 
 HISTORY_DIR = os.path.join(os.path.dirname(__file__), "agent_histories")
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
 
+# Compacted loads return stored summaries plus only this many recent raw interactions
+COMPACT_TAIL = int(os.getenv("HISTORY_COMPACT_TAIL", "20"))
+MAX_WEEKLY_SUMMARIES = 12
+MAX_DAILY_SUMMARIES = 14
+
+# Result payloads larger than this (encoded JSON bytes) are not kept in memory;
+# only their identifying keys survive (the full row stays in the database)
+RESULT_SIZE_CAP = int(os.getenv("HISTORY_RESULT_SIZE_CAP", "8192"))
+_KEPT_RESULT_KEYS = ("id", "type", "error", "skipped", "reason")
+
 # Ensure history directory exists
 os.makedirs(HISTORY_DIR, exist_ok=True)
 
 
+class Interaction:
+    """
+    Compact in-memory record of one interaction.
+    
+    Slotted, with interned prompt and tool strings (agents repeat the same
+    prompts and tools constantly), and the result payload kept as encoded JSON
+    bytes that are only decoded when accessed. Results above RESULT_SIZE_CAP
+    are reduced to their identifying keys. Supports read-only dict-style access
+    (`interaction["prompt"]`, `.get(...)`) so callers can treat it like the old dicts.
+    """
+    
+    __slots__ = ("timestamp", "iteration", "prompt", "reasoning", "action", "final", "_result")
+    
+    def __init__(self, timestamp: str, iteration: int, prompt: str, reasoning: str,
+                 action: Dict[str, Any], result: Union[Dict[str, Any], str, bytes, None], final: str):
+        self.timestamp = timestamp
+        self.iteration = iteration
+        self.prompt = sys.intern(prompt or "")
+        self.reasoning = reasoning or ""
+        self.action = self._compact_action(action or {})
+        self.final = final or ""
+        self._result = self._encode_result(result)
+    
+    @staticmethod
+    def _compact_action(action: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(action.get("tool"), str):
+            action = dict(action, tool=sys.intern(action["tool"]))
+        return action
+    
+    @staticmethod
+    def _encode_result(result: Union[Dict[str, Any], str, bytes, None]) -> bytes:
+        if result is None:
+            return b"{}"
+        if isinstance(result, str):
+            raw = result.encode("utf-8")
+        elif isinstance(result, bytes):
+            raw = result
+        else:
+            raw = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        if len(raw) <= RESULT_SIZE_CAP:
+            return raw
+        # Too large to keep warm: decode once and keep only what identifies the outcome
+        decoded = json.loads(raw)
+        kept: Dict[str, Any] = {"dropped": True, "size": len(raw)}
+        if isinstance(decoded, dict):
+            kept.update({k: decoded[k] for k in _KEPT_RESULT_KEYS if k in decoded})
+        return json.dumps(kept).encode("utf-8")
+    
+    @classmethod
+    def from_db(cls, row: Dict[str, Any]) -> 'Interaction':
+        """Build from a backend row, leaving the result JSON undecoded."""
+        action = row["action"]
+        return cls(
+            timestamp=row["timestamp"],
+            iteration=row["iteration"],
+            prompt=row["prompt"],
+            reasoning=row["reasoning"],
+            action=json.loads(action) if isinstance(action, str) else action,
+            result=row["result"],
+            final=row["final"]
+        )
+    
+    @property
+    def result(self) -> Any:
+        """Decoded result payload (decoded on each access; not cached)."""
+        return json.loads(self._result)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key: str) -> bool:
+        return key == "result" or (key in self.__slots__ and not key.startswith("_"))
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "iteration": self.iteration,
+            "prompt": self.prompt,
+            "reasoning": self.reasoning,
+            "action": self.action,
+            "result": self.result,
+            "final": self.final
+        }
+
+
 class AgentHistory:
     """Manages an agent's identity and interaction history."""
     
     def __init__(self, agent_id: str, agent_data: Dict[str, Any]):
         self.agent_id = agent_id
         self.agent_data = agent_data  # Contains handle, profile, etc.
-        self.interactions: List[Dict[str, Any]] = []
+        self.interactions: List[Interaction] = []
+        self.summaries: List[Dict[str, Any]] = []  # Compacted daily/weekly summaries (oldest first)
         self.created_at = datetime.utcnow().isoformat()
         self.updated_at = self.created_at
+        self._memory: Optional[MemoryIndex] = None
     
     @property
     def filepath(self) -> str:
         """Get the file path for this agent's history."""
         return os.path.join(HISTORY_DIR, f"{self.agent_id}.json")
     
+    @property
+    def memory(self) -> MemoryIndex:
+        """Long-term retrieval index, opened lazily and caught up with loaded interactions."""
+        if self._memory is None:
+            self._memory = MemoryIndex(self.agent_id)
+            self._memory.sync(self.interactions)
+        return self._memory
+    
     def add_interaction(self, prompt: str, reasoning: str, action: Dict[str, Any], 
-                       result: Dict[str, Any], final: str, iteration: int):
-        """Record a single interaction in the agent's history."""
-        interaction = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "iteration": iteration,
-            "prompt": prompt,
-            "reasoning": reasoning,
-            "action": action,
-            "result": result,
-            "final": final
-        }
+                       result: Dict[str, Any], final: str, iteration: int,
+                       usage: Optional[Dict[str, Any]] = None):
+        """Record a single interaction in the agent's history, with the LLM usage it took (token_usage.py)."""
+        result_json = json.dumps(result)
+        interaction = Interaction(
+            timestamp=datetime.utcnow().isoformat(),
+            iteration=iteration,
+            prompt=prompt,
+            reasoning=reasoning,
+            action=action,
+            result=result_json,
+            final=final
+        )
         self.interactions.append(interaction)
         self.updated_at = datetime.utcnow().isoformat()
         
-        # Save to database via API
-        self._save_interaction_to_db(interaction)
+        # Keep long-term memory current (incremental, no re-read of history)
+        try:
+            self.memory.sync([interaction])
+        except Exception as e:
+            print(f"⚠️  Error updating agent memory index: {e}")
+        
+        # Save to database via API (with the full result, even if it was too large to keep)
+        self._save_interaction_to_db(interaction, result_json, usage)
     
-    def _save_interaction_to_db(self, interaction: Dict[str, Any]):
+    @tracing.traced("history.save")
+    def _save_interaction_to_db(self, interaction: Interaction, result_json: str,
+                                usage: Optional[Dict[str, Any]] = None):
         """Save a single interaction to the database."""
         try:
             payload = {
                 "agentId": self.agent_id,
-                "timestamp": interaction["timestamp"],
-                "iteration": interaction["iteration"],
-                "prompt": interaction["prompt"],
-                "reasoning": interaction["reasoning"],
-                "action": json.dumps(interaction["action"]),
-                "result": json.dumps(interaction["result"]),
-                "final": interaction["final"]
+                "timestamp": interaction.timestamp,
+                "iteration": interaction.iteration,
+                "prompt": interaction.prompt,
+                "reasoning": interaction.reasoning,
+                "action": json.dumps(interaction.action),
+                "result": result_json,
+                "final": interaction.final
             }
-            response = requests.post(f"{BACKEND_URL}/agent-interactions", json=payload)
+            if usage:
+                payload["usage"] = usage
+            response = backend_request("POST", f"{BACKEND_URL}/agent-interactions", json=payload)
             if response.status_code == 201:
                 print(f"✅ Saved interaction to database (ID: {response.json().get('id')})")
             else:
+                tracing.current_span().fail(f"HTTP {response.status_code}")
                 print(f"⚠️  Failed to save interaction to database: {response.status_code}")
                 print(f"    Falling back to JSON file only")
         except Exception as e:
+            tracing.current_span().fail(e)
             print(f"⚠️  Error saving interaction to database: {e}")
             print(f"    Falling back to JSON file only")
     
@@ -74,69 +202,147 @@ class AgentHistory:
         """No-op: History is now saved to database in real-time via add_interaction()."""
         pass
     
+    @staticmethod
+    def _load_summaries(agent_id: str) -> List[Dict[str, Any]]:
+        """Recent weekly summaries followed by the daily summaries after the last week."""
+        reader = get_reader()
+
+        def fetch(level: str, limit: int, since: str = "") -> List[Dict[str, Any]]:
+            if reader:
+                return reader.agent_summaries(agent_id, level=level, since=since or None, limit=limit)
+            params = {"level": level, "limit": limit, **({"since": since} if since else {})}
+            response = backend_request("GET", f"{BACKEND_URL}/agent-interactions/agent/{agent_id}/summaries",
+                                       params=params)
+            return response.json() if response.status_code == 200 else []
+
+        weekly = fetch("weekly", MAX_WEEKLY_SUMMARIES)
+        covered_until = weekly[-1]["periodEnd"] if weekly else ""
+        return weekly + fetch("daily", MAX_DAILY_SUMMARIES, covered_until)
+    
     @classmethod
-    def load(cls, agent_id: str) -> Optional['AgentHistory']:
-        """Load an existing agent's history from database."""
+    @tracing.traced("history.load")
+    def load(cls, agent_id: str, compacted: bool = False, tail: int = COMPACT_TAIL,
+             raise_errors: bool = False) -> Optional['AgentHistory']:
+        """
+        Load an existing agent's history from database.
+        
+        Args:
+            agent_id: The agent to load
+            compacted: Load stored summaries plus only the last `tail` raw
+                interactions, so load cost stays flat as the agent ages
+            tail: Number of raw interactions to load in compacted mode
+            raise_errors: Raise on failures other than the agent not existing
+                (e.g. the backend is unreachable) instead of returning None
+        
+        Returns:
+            The history, or None if the agent doesn't exist (or loading failed, unless raise_errors)
+        """
         try:
-            # First, get the agent data from the backend
-            response = requests.get(f"{BACKEND_URL}/agents/{agent_id}")
-            if response.status_code != 200:
-                return None
-            
-            agent_data = response.json()
-            
-            # Load interactions from database
-            response = requests.get(f"{BACKEND_URL}/agent-interactions/agent/{agent_id}")
-            if response.status_code != 200:
-                return None
-            
-            interactions_data = response.json()
+            reader = get_reader()
+            if reader:
+                # Co-located with the backend: read its database directly
+                agent_data = reader.get_agent(agent_id)
+                if agent_data is None:
+                    return None
+                interactions_data = reader.agent_interactions(agent_id, tail if compacted else 100)
+            else:
+                # First, get the agent data from the backend
+                response = backend_request("GET", f"{BACKEND_URL}/agents/{agent_id}")
+                if response.status_code == 404:
+                    return None
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET /agents/{agent_id} returned {response.status_code}")
+                
+                agent_data = response.json()
+                
+                # Load interactions from database
+                params = {"limit": tail} if compacted else {}
+                response = backend_request("GET", f"{BACKEND_URL}/agent-interactions/agent/{agent_id}", params=params)
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET /agent-interactions/agent/{agent_id} returned {response.status_code}")
+                
+                interactions_data = response.json()
             
             # Create history object
             history = cls(agent_id, agent_data)
             
             # Convert database format to internal format
-            history.interactions = []
-            for db_interaction in reversed(interactions_data):  # Reverse to get chronological order
-                interaction = {
-                    "timestamp": db_interaction["timestamp"],
-                    "iteration": db_interaction["iteration"],
-                    "prompt": db_interaction["prompt"],
-                    "reasoning": db_interaction["reasoning"],
-                    "action": json.loads(db_interaction["action"]),
-                    "result": json.loads(db_interaction["result"]),
-                    "final": db_interaction["final"]
-                }
-                history.interactions.append(interaction)
+            # (results stay as undecoded JSON bytes until something reads them)
+            history.interactions = [
+                Interaction.from_db(db_interaction)
+                for db_interaction in reversed(interactions_data)  # Reverse to get chronological order
+            ]
+            
+            if compacted:
+                history.summaries = cls._load_summaries(agent_id)
             
             if history.interactions:
-                history.created_at = history.interactions[0]["timestamp"]
-                history.updated_at = history.interactions[-1]["timestamp"]
+                history.created_at = history.interactions[0].timestamp
+                history.updated_at = history.interactions[-1].timestamp
+            if history.summaries:
+                history.created_at = min(history.created_at, history.summaries[0]["periodStart"])
             
             print(f"📂 Loaded agent history from database")
             print(f"   Agent: {agent_data.get('handle', 'unknown')}")
             print(f"   Interactions: {len(history.interactions)}")
+            if compacted:
+                print(f"   Summaries: {len(history.summaries)}")
             return history
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"❌ Error loading agent history from database: {e}")
             return None
     
-    def get_context_summary(self, max_interactions: int = 5) -> str:
-        """Get a summary of recent interactions for context."""
-        if not self.interactions:
+    def get_context_summary(self, max_interactions: int = 5, max_summaries: int = 2) -> str:
+        """Get a summary of recent interactions (and compacted earlier activity) for context."""
+        if not self.interactions and not self.summaries:
             return "No previous interactions."
         
         recent = self.interactions[-max_interactions:]
         lines = [f"Agent {self.agent_data.get('handle', self.agent_id)} - Previous interactions:"]
         
+        earlier = self.get_earlier_activity(max_summaries)
+        if earlier:
+            lines.append(earlier)
+        
         for i, interaction in enumerate(recent, 1):
-            lines.append(f"\n{i}. [{interaction['timestamp']}]")
-            lines.append(f"   Prompt: {interaction['prompt'][:100]}...")
-            lines.append(f"   Action: {interaction['action'].get('tool', 'none')}")
-            if 'id' in interaction['result']:
-                lines.append(f"   Created: {interaction['result'].get('type', 'item')} {interaction['result']['id'][:8]}...")
+            lines.append(f"\n{i}. [{interaction.timestamp}]")
+            lines.append(f"   Prompt: {interaction.prompt[:100]}...")
+            lines.append(f"   Action: {interaction.action.get('tool', 'none')}")
+            result = interaction.result
+            if isinstance(result, dict) and 'id' in result:
+                lines.append(f"   Created: {result.get('type', 'item')} {result['id'][:8]}...")
         
         return "\n".join(lines)
+    
+    def get_earlier_activity(self, max_summaries: int = 2) -> str:
+        """The most recent compacted summaries (loaded with compacted=True), or "" if there are none."""
+        if not self.summaries or max_summaries <= 0:
+            return ""
+        lines = ["Earlier activity:"]
+        lines.extend(f"- {summary['summary']}" for summary in self.summaries[-max_summaries:])
+        return "\n".join(lines)
+    
+    def get_relevant_memories(self, query: str, k: int = MEMORY_TOP_K,
+                              token_budget: int = MEMORY_TOKEN_BUDGET) -> str:
+        """
+        Get the past interactions most relevant to `query`, within a fixed token budget.
+        
+        Unlike get_context_summary, the prompt cost stays constant however long
+        the agent's history grows.
+        """
+        try:
+            memories = self.memory.retrieve(query, k=k, token_budget=token_budget)
+        except Exception as e:
+            print(f"⚠️  Memory retrieval failed, using recent interactions: {e}")
+            return self.get_context_summary(max_interactions=3)
+        if not memories:
+            return "No previous interactions."
+        
+        lines = [f"Agent {self.agent_data.get('handle', self.agent_id)} - Relevant memories:"]
+        lines.extend(f"- {m}" for m in memories)
+        return "\n".join(lines)
 
 
 def create_agent_with_identity(handle: str, profile: str) -> AgentHistory:
@@ -152,8 +358,8 @@ def create_agent_with_identity(handle: str, profile: str) -> AgentHistory:
     """
     # Create agent via API
     try:
-        response = requests.post(
-            f"{BACKEND_URL}/agents",
+        response = backend_request(
+            "POST", f"{BACKEND_URL}/agents",
             json={
                 "handle": handle,
                 "profile": profile,
@@ -179,7 +385,7 @@ def create_agent_with_identity(handle: str, profile: str) -> AgentHistory:
 
 
 def get_or_create_agent(agent_id: Optional[str] = None, handle: str = None, 
-                       profile: str = None) -> AgentHistory:
+                       profile: str = None, compacted: bool = False) -> AgentHistory:
     """
     Get an existing agent or return None to trigger agent-driven identity creation.
     
@@ -187,13 +393,14 @@ def get_or_create_agent(agent_id: Optional[str] = None, handle: str = None,
         agent_id: Existing agent ID to load
         handle: Handle for new agent (if explicitly creating)
         profile: Profile for new agent (if explicitly creating)
+        compacted: Load summaries plus a short raw tail instead of the full history
     
     Returns:
         AgentHistory instance if found/created, None if agent should choose identity
     """
     # Try to load existing agent by ID
     if agent_id:
-        history = AgentHistory.load(agent_id)
+        history = AgentHistory.load(agent_id, compacted=compacted)
         if history:
             return history
         print(f"⚠️  Agent ID {agent_id} not found in history.")
@@ -202,7 +409,7 @@ def get_or_create_agent(agent_id: Optional[str] = None, handle: str = None,
     # Check if we have a default agent ID in .env
     default_agent_id = os.getenv("REACT_AGENT_ID")
     if default_agent_id:
-        history = AgentHistory.load(default_agent_id)
+        history = AgentHistory.load(default_agent_id, compacted=compacted)
         if history:
             print(f"📌 Using default agent from .env: {default_agent_id}")
             return history
@@ -215,10 +422,23 @@ def get_or_create_agent(agent_id: Optional[str] = None, handle: str = None,
     return None
 
 
+def list_agent_summaries() -> List[Dict[str, Any]]:
+    """
+    One row per agent (id, handle, llmModel, interactionCount, lastInteractionAt,
+    updatedAt) from a single backend request, without loading any history.
+    """
+    try:
+        response = backend_request("GET", f"{BACKEND_URL}/agents/summary")
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching agent summaries from backend: {e}")
+        return []
+
 def list_agents() -> List[str]:
     """List all agent IDs from the backend database."""
     try:
-        response = requests.get(f"{BACKEND_URL}/agents")
+        response = backend_request("GET", f"{BACKEND_URL}/agents")
         response.raise_for_status()
         agents = response.json()
         return [agent['id'] for agent in agents]
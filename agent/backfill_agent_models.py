@@ -1,16 +1,23 @@
 """
 Backfill script to assign LLM models to all existing agents.
+
+Usage:
+    python agent/backfill_agent_models.py
+    python agent/backfill_agent_models.py --dry-run
+    python agent/backfill_agent_models.py --concurrency 16 --batch-size 100
 """
 
 import os
-import requests
 import random
+import argparse
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before the local imports, which read settings such as BACKEND_URL)
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+from bulk_runner import (
+    BulkRunner, fetch_all_agents, print_summary, DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY
+)
 
 # Available models for agents
 # Note: gpt-4o-nano is not a valid model, removed from list
@@ -21,34 +28,33 @@ AVAILABLE_MODELS = [
     "gpt-5-nano",       # Newest nano model
 ]
 
-def update_agent_model(agent_id: str, model: str):
-    """Update an agent's LLM model."""
-    try:
-        response = requests.patch(
-            f"{BACKEND_URL}/agents/{agent_id}",
-            json={"llmModel": model}
-        )
-        if response.ok:
-            return True
-        else:
-            print(f"  ⚠️  Failed to update: {response.status_code} {response.text}")
-            return False
-    except Exception as e:
-        print(f"  ⚠️  Error updating agent: {e}")
-        return False
+def assign_model(agent):
+    """Pick a random model for an agent that doesn't have one yet."""
+    if agent.get('llmModel'):
+        return None
+    return {"llmModel": random.choice(AVAILABLE_MODELS)}
 
 def main():
+    parser = argparse.ArgumentParser(description="Assign LLM models to agents that don't have one")
+    parser.add_argument("--dry-run", action="store_true", help="Show planned assignments without writing them")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Agents processed in parallel (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Agents written per batch request (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--reset-checkpoint", action="store_true",
+                        help="Ignore progress from previous runs")
+    args = parser.parse_args()
+
     print("🎲 Backfilling LLM models for all agents...")
     print("=" * 80)
     print(f"\nAvailable models: {', '.join(AVAILABLE_MODELS)}\n")
     
     # Get all agents
-    response = requests.get(f"{BACKEND_URL}/agents")
-    if not response.ok:
-        print("❌ Failed to fetch agents")
+    try:
+        all_agents = fetch_all_agents()
+    except Exception as e:
+        print(f"❌ Failed to fetch agents: {e}")
         return
-    
-    all_agents = response.json()
     print(f"📊 Found {len(all_agents)} agents in database\n")
     
     # Filter agents that need model assignment
@@ -61,34 +67,22 @@ def main():
         print("🎉 All agents already have model assignments!")
         return
     
+    runner = BulkRunner(
+        "backfill_agent_models",
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run
+    )
+    if args.reset_checkpoint:
+        runner.reset_checkpoint()
+    result = runner.run(agents_to_update, assign_model)
+    print_summary(result, dry_run=args.dry_run)
+    
     # Track assignments
-    updated_count = 0
-    failed = []
     model_distribution = {model: 0 for model in AVAILABLE_MODELS}
-    
-    for i, agent in enumerate(agents_to_update, 1):
-        agent_id = agent['id']
-        handle = agent['handle']
-        
-        # Randomly select a model
-        selected_model = random.choice(AVAILABLE_MODELS)
-        
-        print(f"[{i}/{len(agents_to_update)}] @{handle}")
-        print(f"   🎲 Assigning model: {selected_model}... ", end='', flush=True)
-        
-        if update_agent_model(agent_id, selected_model):
-            print(f"✓")
-            updated_count += 1
-            model_distribution[selected_model] += 1
-        else:
-            print(f"✗")
-            failed.append(handle)
-    
-    print("\n" + "=" * 80)
-    print(f"\n🎉 Backfill complete!")
-    print(f"   ✅ Successfully updated: {updated_count} agents")
-    if failed:
-        print(f"   ❌ Failed: {len(failed)} agents ({', '.join(failed)})")
+    for fields in result.applied.values():
+        model_distribution[fields["llmModel"]] += 1
+    updated_count = len(result.applied)
     
     print(f"\n📊 Model Distribution:")
     for model, count in sorted(model_distribution.items(), key=lambda x: x[1], reverse=True):
@@ -0,0 +1,160 @@
+"""
+Offline batch inference for bulk generation jobs.
+
+Instead of making chat completions one by one, a job writes every request to
+a JSONL file in the Batch API format, uploads it, submits a batch, polls until
+it finishes and downloads the results. Batches are billed at a discount and do
+not consume the synchronous rate limits used by live agents.
+
+Job state (batch ID, input file, status) is kept in a small JSON file next to
+the request file, so rerunning an interrupted job resumes polling the same
+batch instead of paying for it twice. Results are applied by the caller, e.g.
+through `BulkRunner`, whose checkpoint makes re-application a no-op; once they
+are all applied the caller calls `reset()` so the next run submits a fresh
+batch. A batch that fails, expires or is cancelled is forgotten the same way.
+
+Any backend exposing the Batch API's files/batches endpoints works; point the
+OpenAI client at `local_batch_server.py` (via OPENAI_BASE_URL) to test
+without a real account.
+"""
+import os
+import json
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+from openai import OpenAI
+
+BATCH_DIR = os.path.join(os.path.dirname(__file__), "batch_jobs")
+CHAT_ENDPOINT = "/v1/chat/completions"
+DEFAULT_POLL_INTERVAL = 30.0
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def batch_line(custom_id: str, body: Dict[str, Any], endpoint: str = CHAT_ENDPOINT) -> Dict[str, Any]:
+    """One request line of a batch input file."""
+    return {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body}
+
+
+def completion_content(result: Dict[str, Any]) -> str:
+    """Message content of a chat completion result line; raises RuntimeError if the request failed."""
+    response = result.get("response") or {}
+    if result.get("error") or response.get("status_code") != 200:
+        raise RuntimeError(f"Batch request failed: {result.get('error') or response.get('body')}")
+    return response["body"]["choices"][0]["message"]["content"]
+
+
+class BatchJob:
+    """
+    One named batch job: request file, submission, polling and result download.
+
+    Typical use:
+        job = BatchJob("regenerate_profiles")
+        job.prepare((agent_id, body) for ...)   # no-op if already submitted
+        job.submit()
+        results = job.wait()                     # {custom_id: result line}
+        ...apply results...
+        job.reset()                              # done: the next run starts over
+    """
+
+    def __init__(self, name: str, client: Optional[OpenAI] = None, directory: str = BATCH_DIR,
+                 endpoint: str = CHAT_ENDPOINT):
+        self.name = name
+        self.client = client or OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.endpoint = endpoint
+        self.input_path = os.path.join(directory, f"{name}.input.jsonl")
+        self.state_path = os.path.join(directory, f"{name}.state.json")
+        self.state: Dict[str, Any] = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    @property
+    def batch_id(self) -> Optional[str]:
+        return self.state.get("batch_id")
+
+    def reset(self):
+        """Forget the submitted batch so the job starts over."""
+        self.state = {}
+        for path in (self.state_path, self.input_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def prepare(self, requests_: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Write (custom_id, request body) pairs to the input file. Returns the request count.
+        Does nothing if this job already has a submitted batch.
+        """
+        if self.batch_id:
+            return self.state.get("request_count", 0)
+        os.makedirs(os.path.dirname(self.input_path), exist_ok=True)
+        count = 0
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            for custom_id, body in requests_:
+                f.write(json.dumps(batch_line(custom_id, body, self.endpoint), ensure_ascii=False) + "\n")
+                count += 1
+        self.state["request_count"] = count
+        self._save_state()
+        return count
+
+    def submit(self, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Upload the input file and create the batch (reuses an existing submission)."""
+        if self.batch_id:
+            return self.batch_id
+        with open(self.input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=self.endpoint,
+            completion_window="24h",
+            metadata=metadata or {"job": self.name}
+        )
+        self.state.update({"batch_id": batch.id, "input_file_id": uploaded.id, "status": batch.status})
+        self._save_state()
+        return batch.id
+
+    def poll(self) -> Any:
+        """Fetch the batch's current status (and remember it)."""
+        batch = self.client.batches.retrieve(self.batch_id)
+        if batch.status != self.state.get("status"):
+            self.state["status"] = batch.status
+            self._save_state()
+        return batch
+
+    def wait(self, poll_interval: float = DEFAULT_POLL_INTERVAL, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Poll until the batch reaches a terminal status, then return result lines keyed by custom_id.
+        Raises RuntimeError (and resets the job) if the batch did not complete.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            batch = self.poll()
+            counts = batch.request_counts
+            progress = f" ({counts.completed}/{counts.total})" if counts else ""
+            print(f"   ⏳ Batch {batch.id}: {batch.status}{progress}")
+            if batch.status in TERMINAL_STATUSES:
+                break
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch.id} still {batch.status} after {timeout}s")
+            time.sleep(poll_interval)
+
+        if batch.status != "completed":
+            # Nothing to resume: the next run prepares and submits a new batch
+            self.reset()
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+        results: Dict[str, Dict[str, Any]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in self.client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        record = json.loads(line)
+                        results[record["custom_id"]] = record
+        return results
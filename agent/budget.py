@@ -0,0 +1,144 @@
+"""
+Hourly and daily LLM spend budgets, per model and per agent.
+
+Budgets are read from BUDGETS (JSON) or a file passed to the daemon
+(`--budget-file`), in USD:
+    {
+      "model": {"gpt-5": {"hourly": 2, "daily": 20}},
+      "agent": {"*": {"daily": 0.50}, "<agent id>": {"daily": 2}}
+    }
+"*" is the default limit for every agent or model without its own entry.
+
+The ledger keeps the cost of every LLM call (reported by token_usage.py) for
+the last 24 hours. Before an agent acts, the daemon asks `check()`: at or over
+any limit the agent is skipped, and past BUDGET_SLOW_AT of one (default 80%)
+the daemon waits BUDGET_SLOW_FACTOR times longer before the next action.
+`seed()` loads recent spend from the backend so restarting the daemon doesn't
+reset the budgets.
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from circuit_breaker import backend_request
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+SLOW_AT = float(os.getenv("BUDGET_SLOW_AT", "0.8"))
+SLOW_FACTOR = float(os.getenv("BUDGET_SLOW_FACTOR", "3"))  # daemon sleeps this much longer when slowing
+WINDOWS = {"hourly": 3600, "daily": 86400}
+DEFAULT = "*"
+
+
+class BudgetDecision(NamedTuple):
+    action: str  # "run", "slow" or "skip"
+    reason: str = ""
+
+
+def load_budgets(path: Optional[str] = None) -> Dict[str, Any]:
+    """Budgets from a JSON file, else from BUDGETS, else none."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    raw = os.getenv("BUDGETS")
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️  Ignoring invalid BUDGETS: {e}")
+        return {}
+
+
+class BudgetLedger:
+    """Rolling spend per model and per agent, checked against the configured limits."""
+
+    def __init__(self, budgets: Optional[Dict[str, Any]] = None, slow_at: float = SLOW_AT):
+        self.budgets = load_budgets() if budgets is None else budgets
+        self.slow_at = slow_at
+        self._spend: Dict[Tuple[str, str], Deque[Tuple[float, float]]] = {}  # (scope, key) -> (time, USD)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.budgets.get(scope) for scope in ("model", "agent"))
+
+    def _add(self, scope: str, key: str, cost: float, at: float):
+        self._spend.setdefault((scope, key), deque()).append((at, cost))
+
+    def record(self, agent_id: Optional[str], model: str, cost: float, at: Optional[float] = None):
+        """Add one call's cost."""
+        if not cost:
+            return
+        at = time.time() if at is None else at
+        with self._lock:
+            self._add("model", model, cost, at)
+            if agent_id:
+                self._add("agent", agent_id, cost, at)
+
+    def spent(self, scope: str, key: str, window: str) -> float:
+        """USD spent by one model or agent over the last hour or day."""
+        now = time.time()
+        with self._lock:
+            events = self._spend.get((scope, key))
+            if not events:
+                return 0.0
+            while events and events[0][0] < now - WINDOWS["daily"]:
+                events.popleft()
+            return sum(cost for at, cost in events if at >= now - WINDOWS[window])
+
+    def limits(self, scope: str, key: str) -> Dict[str, float]:
+        configured = self.budgets.get(scope) or {}
+        return configured.get(key) or configured.get(DEFAULT) or {}
+
+    def check(self, agent_id: Optional[str], models: Iterable[str]) -> BudgetDecision:
+        """Whether an agent using `models` may act now: run, slow down, or skip."""
+        scopes: List[Tuple[str, str]] = [("model", m) for m in dict.fromkeys(models)]
+        if agent_id:
+            scopes.insert(0, ("agent", agent_id))
+        closest = (0.0, "")
+        for scope, key in scopes:
+            for window, limit in self.limits(scope, key).items():
+                if window not in WINDOWS or not limit:
+                    continue
+                spent = self.spent(scope, key, window)
+                reason = f"{scope} {key[:12]} spent ${spent:.4f} of its ${limit:g} {window} budget"
+                if spent >= limit:
+                    return BudgetDecision("skip", reason)
+                closest = max(closest, (spent / limit, reason))
+        if closest[0] >= self.slow_at:
+            return BudgetDecision("slow", closest[1])
+        return BudgetDecision("run")
+
+    def seed(self, backend_url: str = BACKEND_URL) -> float:
+        """
+        Load the last day's spend from the backend, per UTC hour
+        (GET /agent-interactions/usage?bucket=hour). Each hour's spend is placed
+        at the end of that hour (or now, for the current one), so it leaves the
+        windows at most an hour late and never early. Returns the USD loaded.
+        """
+        now = time.time()
+        since = datetime.utcfromtimestamp(now - WINDOWS["daily"]).isoformat()
+        response = backend_request("GET", f"{backend_url}/agent-interactions/usage",
+                                   params={"since": since, "bucket": "hour"})
+        response.raise_for_status()
+        body = response.json()
+        rows = [("agent", a["agentId"], a) for a in body["agents"]] + [("model", m["model"], m) for m in body["models"]]
+        total = 0.0
+        with self._lock:
+            # Oldest hour first: spent() expects each key's events in time order
+            for scope, key, row in sorted(rows, key=lambda r: r[2]["hour"]):
+                cost = row["costUsd"] or 0.0
+                if not cost:
+                    continue
+                hour = datetime.fromisoformat(row["hour"].replace("Z", "+00:00")).timestamp()
+                self._add(scope, key, cost, min(now, hour + WINDOWS["hourly"]))
+                if scope == "agent":
+                    total += cost
+        return total
+
+
+# Process-wide ledger, fed by token_usage.record()
+ledger = BudgetLedger()
@@ -0,0 +1,182 @@
+"""
+Reusable runner for bulk admin maintenance jobs (backfills) over many agents.
+
+Per-agent work runs on a bounded thread pool, the resulting field updates are
+written through the batch `PATCH /agents` endpoint, and every committed batch
+is appended to a checkpoint file so rerunning an interrupted or partly failed
+job skips agents that already finished. A run that ends with no failures
+deletes the checkpoint, so the next job starts from scratch.
+In dry-run mode updates are computed and reported but nothing is written.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+import requests
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), "bulk_checkpoints")
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 50
+
+# Computes the fields to PATCH for one agent, or None to leave it unchanged
+UpdateBuilder = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def fetch_all_agents() -> List[Dict[str, Any]]:
+    """Fetch the full agent roster from the backend."""
+    response = requests.get(f"{BACKEND_URL}/agents")
+    response.raise_for_status()
+    return response.json()
+
+
+def patch_agents_batch(updates: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Apply many agent updates in one request.
+
+    Args:
+        updates: List of {"id": ..., "profile"?: ..., "llmModel"?: ...}
+
+    Returns:
+        Dict with 'updated' and 'notFound' agent ID lists
+    """
+    response = requests.patch(f"{BACKEND_URL}/agents", json={"updates": updates})
+    if not response.ok:
+        raise RuntimeError(f"Batch update failed: {response.status_code} {response.text}")
+    return response.json()
+
+
+class BulkResult:
+    """Outcome of a bulk run."""
+
+    def __init__(self):
+        self.applied: Dict[str, Dict[str, Any]] = {}  # agent_id -> fields written (or planned in dry-run)
+        self.unchanged: List[str] = []
+        self.skipped: List[str] = []  # already done according to the checkpoint
+        self.failed: Dict[str, str] = {}  # agent_id -> error message
+
+
+class BulkRunner:
+    """Runs an update builder over many agents with bounded concurrency and checkpointing."""
+
+    def __init__(self, name: str, concurrency: int = DEFAULT_CONCURRENCY,
+                 batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False,
+                 checkpoint_path: Optional[str] = None):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.checkpoint_path = checkpoint_path or os.path.join(CHECKPOINT_DIR, f"{name}.done")
+
+    def load_checkpoint(self) -> Set[str]:
+        """Return the IDs of agents already finished by a previous run."""
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, "r") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def reset_checkpoint(self):
+        """Forget previous progress so the next run revisits every agent."""
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _mark_done(self, agent_ids: Iterable[str]):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        with open(self.checkpoint_path, "a") as f:
+            for agent_id in agent_ids:
+                f.write(f"{agent_id}\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _flush(self, pending: List[Dict[str, Any]], result: BulkResult):
+        if not pending:
+            return
+        batch = list(pending)
+        pending.clear()
+        if self.dry_run:
+            for update in batch:
+                result.applied[update["id"]] = {k: v for k, v in update.items() if k != "id"}
+            return
+        try:
+            response = patch_agents_batch(batch)
+        except Exception as e:
+            for update in batch:
+                result.failed[update["id"]] = str(e)
+            print(f"   ❌ Batch of {len(batch)} failed: {e}")
+            return
+        updated = set(response.get("updated", []))
+        for update in batch:
+            if update["id"] in updated:
+                result.applied[update["id"]] = {k: v for k, v in update.items() if k != "id"}
+            else:
+                result.failed[update["id"]] = "Agent not found"
+        self._mark_done(updated)
+        print(f"   💾 Committed batch of {len(updated)} update(s)")
+
+    def run(self, agents: List[Dict[str, Any]], build_update: UpdateBuilder) -> BulkResult:
+        """
+        Compute and write updates for every agent not already checkpointed.
+
+        Args:
+            agents: Agent records (as returned by GET /agents)
+            build_update: Called concurrently per agent; returns fields to PATCH or None
+
+        Returns:
+            BulkResult describing what was applied, skipped and failed
+        """
+        result = BulkResult()
+        done = self.load_checkpoint()
+        todo = []
+        for agent in agents:
+            if agent["id"] in done:
+                result.skipped.append(agent["id"])
+            else:
+                todo.append(agent)
+
+        mode = "DRY RUN - " if self.dry_run else ""
+        print(f"🚚 {mode}{self.name}: {len(todo)} agent(s) to process, "
+              f"{len(result.skipped)} already done (concurrency={self.concurrency}, batch={self.batch_size})")
+
+        pending: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(build_update, agent): agent for agent in todo}
+            for i, future in enumerate(as_completed(futures), 1):
+                agent = futures[future]
+                handle = agent.get("handle", agent["id"])
+                try:
+                    fields = future.result()
+                except Exception as e:
+                    result.failed[agent["id"]] = str(e)
+                    print(f"[{i}/{len(todo)}] @{handle} ✗ {e}")
+                    continue
+
+                if not fields:
+                    result.unchanged.append(agent["id"])
+                    print(f"[{i}/{len(todo)}] @{handle} – unchanged")
+                    continue
+
+                summary = ", ".join(f"{k}={str(v)[:40]!r}" for k, v in fields.items())
+                print(f"[{i}/{len(todo)}] @{handle} ✓ {summary}")
+                pending.append({"id": agent["id"], **fields})
+                if len(pending) >= self.batch_size:
+                    self._flush(pending, result)
+
+        self._flush(pending, result)
+        if not self.dry_run and not result.failed:
+            # Finished cleanly: nothing to resume
+            self.reset_checkpoint()
+        return result
+
+
+def print_summary(result: BulkResult, dry_run: bool = False):
+    """Print a standard completion summary for a bulk run."""
+    verb = "Would update" if dry_run else "Successfully updated"
+    print("\n" + "=" * 80)
+    print(f"\n🎉 {'Dry run' if dry_run else 'Bulk update'} complete!")
+    print(f"   ✅ {verb}: {len(result.applied)} agents")
+    if result.skipped:
+        print(f"   ⏭️  Skipped (already done): {len(result.skipped)} agents")
+    if result.unchanged:
+        print(f"   ➖ Unchanged: {len(result.unchanged)} agents")
+    if result.failed:
+        print(f"   ❌ Failed: {len(result.failed)} agents ({', '.join(list(result.failed)[:10])})")
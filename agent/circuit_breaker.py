@@ -0,0 +1,176 @@
+"""
+Circuit breakers for the agent's dependencies: the backend ("backend") and
+each LLM model ("llm:<model>").
+
+A breaker is closed while calls succeed. After CIRCUIT_FAILURES consecutive
+failures (connection errors, timeouts, 5xx, and 429 for LLMs) it opens, and
+calls fail fast with CircuitOpenError instead of waiting on a dependency that
+is down. After CIRCUIT_RESET_SECONDS it lets one probe call through
+(half-open): success closes it, failure opens it again for twice as long (up
+to CIRCUIT_MAX_RESET_SECONDS).
+
+`backend_request()` sends backend HTTP requests through the backend breaker;
+`graph_agent._chat` guards every completion with its model's breaker, and the
+model router falls back to the fast model while a persona model's breaker is
+open. The daemon pauses scheduling while the backend breaker is open and
+reschedules runs that hit an open breaker instead of dropping them.
+
+States are exported as `circuit_state{dependency}` gauges (0 closed,
+1 half-open, 2 open) and `circuit_transitions{dependency,state}` counters.
+"""
+import os
+import time
+import threading
+from typing import Dict, List
+import requests
+from metrics import metrics
+
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURES", "5"))
+RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+MAX_RESET_SECONDS = float(os.getenv("CIRCUIT_MAX_RESET_SECONDS", "600"))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BACKEND = "backend"
+
+
+def llm(model: str) -> str:
+    """Breaker name for one LLM model."""
+    return f"llm:{model}"
+
+
+class CircuitOpenError(RuntimeError):
+    """A call was refused because its dependency's breaker is open."""
+
+    def __init__(self, dependency: str, retry_in: float):
+        super().__init__(f"{dependency} circuit is open (retry in {retry_in:.0f}s)")
+        self.dependency = dependency
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one dependency."""
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_seconds: float = RESET_SECONDS, max_reset_seconds: float = MAX_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset = reset_seconds
+        self.max_reset = max_reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.reset_seconds = reset_seconds
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set(self, state: str):
+        if state != self.state:
+            self.state = state
+            metrics.incr("circuit_transitions", dependency=self.name, state=state)
+            metrics.set_gauge("circuit_state", _STATE_VALUES[state], dependency=self.name)
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through (0 if it would now)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def available(self) -> bool:
+        """Whether a call would be let through now (without claiming the half-open probe)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() < self.opened_at + self.reset_seconds:
+                return False
+            return not self._probing
+
+    def before_call(self):
+        """Claim permission for one call; raises CircuitOpenError when the breaker refuses it."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_seconds - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self._set(HALF_OPEN)
+            if self._probing:
+                raise CircuitOpenError(self.name, 0.0)
+            self._probing = True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self.reset_seconds = self.base_reset
+                self._set(CLOSED)
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                # The probe failed: stay open, and wait longer before the next one
+                self.reset_seconds = min(self.max_reset, self.reset_seconds * 2)
+            elif self.state != CLOSED or self.failures < self.failure_threshold:
+                return
+            self._probing = False
+            self.opened_at = time.monotonic()
+            self._set(OPEN)
+
+    def release(self):
+        """Give back a claimed call that neither succeeded nor failed (e.g. a 4xx)."""
+        with self._lock:
+            self._probing = False
+
+    def check(self):
+        """Raise CircuitOpenError if the breaker is open (a quick test, claims nothing)."""
+        if not self.available():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for `name` (created on first use)."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+            metrics.set_gauge("circuit_state", 0, dependency=name)
+        return breaker
+
+
+def open_breakers() -> List[CircuitBreaker]:
+    with _breakers_lock:
+        return [b for b in _breakers.values() if b.state != CLOSED]
+
+
+def backend_request(method: str, url: str, **kwargs) -> requests.Response:
+    """`requests.request` through the backend breaker (connection errors and 5xx count as failures)."""
+    breaker = get_breaker(BACKEND)
+    breaker.before_call()
+    try:
+        response = requests.request(method, url, **kwargs)
+    except requests.RequestException:
+        breaker.failure()
+        raise
+    if response.status_code >= 500:
+        breaker.failure()
+    else:
+        breaker.success()
+    return response
+
+
+def is_llm_failure(error: Exception) -> bool:
+    """Whether an LLM error says the model is unavailable (429, 5xx, no response) rather than a bad request."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError)) \
+        or type(error).__name__ in ("APIConnectionError", "APITimeoutError")
@@ -0,0 +1,240 @@
+"""
+Fold older agent interactions into hierarchical summary records.
+
+Interactions older than the raw-retention window are condensed into one
+`daily` summary per agent per day, and complete weeks of daily summaries are
+folded into `weekly` summaries. Summaries are stored alongside the raw rows
+(which are kept), so `AgentHistory.load(agent_id, compacted=True)` can return
+the summaries plus only a short raw tail. Summaries are built from counted
+statistics rather than LLM calls, so compaction is cheap and deterministic.
+
+Usage:
+    python agent/compact_history.py
+    python agent/compact_history.py --agent-id <id> --keep-days 1
+    python agent/compact_history.py --interval 60   # re-run every 60 minutes
+"""
+import os
+import json
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables first: local modules read their settings when imported
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+
+from agent_manager import list_agents
+from circuit_breaker import backend_request
+from export_history import DEFAULT_DB_PATH, iter_interactions
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+KEEP_RAW_DAYS = int(os.getenv("HISTORY_KEEP_RAW_DAYS", "2"))
+MAX_SAMPLE_PROMPTS = 3
+
+
+class PeriodStats:
+    """Counted statistics for a period of interactions; mergeable for hierarchical folding."""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.count: int = data.get("count", 0)
+        self.tools: Counter = Counter(data.get("tools", {}))
+        self.errors: int = data.get("errors", 0)
+        self.created: int = data.get("created", 0)
+        self.prompts: List[str] = list(data.get("prompts", []))
+
+    def add(self, interaction: Dict[str, Any]):
+        action = interaction.get("action") if isinstance(interaction.get("action"), dict) else {}
+        result = interaction.get("result") if isinstance(interaction.get("result"), dict) else {}
+        self.count += 1
+        self.tools[action.get("tool", "none")] += 1
+        if "error" in result:
+            self.errors += 1
+        elif "id" in result:
+            self.created += 1
+        prompt = (interaction.get("prompt") or "").strip()[:120]
+        if prompt and prompt not in self.prompts and len(self.prompts) < MAX_SAMPLE_PROMPTS:
+            self.prompts.append(prompt)
+
+    def merge(self, other: "PeriodStats"):
+        self.count += other.count
+        self.tools.update(other.tools)
+        self.errors += other.errors
+        self.created += other.created
+        for prompt in other.prompts:
+            if prompt not in self.prompts and len(self.prompts) < MAX_SAMPLE_PROMPTS:
+                self.prompts.append(prompt)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "tools": dict(self.tools),
+            "errors": self.errors,
+            "created": self.created,
+            "prompts": self.prompts
+        }
+
+    def render(self, label: str) -> str:
+        """One-paragraph human/LLM-readable summary."""
+        tools = ", ".join(f"{tool}×{n}" for tool, n in self.tools.most_common())
+        text = f"{label}: {self.count} action(s) ({tools})"
+        if self.created:
+            text += f"; created {self.created} item(s)"
+        if self.errors:
+            text += f"; {self.errors} error(s)"
+        if self.prompts:
+            text += ". Prompts included: " + "; ".join(f'"{p}"' for p in self.prompts)
+        return text
+
+
+def fetch_summaries(agent_id: str, level: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get stored summaries for an agent, oldest first."""
+    params = {"level": level} if level else {}
+    r = backend_request("GET", f"{BACKEND_URL}/agent-interactions/agent/{agent_id}/summaries", params=params)
+    r.raise_for_status()
+    return r.json()
+
+
+def store_summary(agent_id: str, level: str, start: date, end: date, stats: PeriodStats):
+    """Upsert one summary record."""
+    label = start.isoformat() if level == "daily" else f"Week of {start.isoformat()}"
+    payload = {
+        "agentId": agent_id,
+        "level": level,
+        "periodStart": start.isoformat(),
+        "periodEnd": end.isoformat(),
+        "interactionCount": stats.count,
+        "summary": stats.render(label),
+        "stats": stats.to_dict()
+    }
+    r = backend_request("POST", f"{BACKEND_URL}/agent-interactions/summaries", json=payload)
+    if not r.ok:
+        raise RuntimeError(f"Failed to store {level} summary: {r.status_code} {r.text}")
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _group_by_day(interactions: Iterable[Dict[str, Any]]) -> Dict[date, PeriodStats]:
+    days: Dict[date, PeriodStats] = {}
+    for interaction in interactions:
+        day = date.fromisoformat(interaction["timestamp"][:10])
+        days.setdefault(day, PeriodStats()).add(interaction)
+    return days
+
+
+def compact_agent(agent_id: str, keep_days: int = KEEP_RAW_DAYS, today: Optional[date] = None,
+                  source: str = "api", db_path: str = DEFAULT_DB_PATH,
+                  dry_run: bool = False) -> Tuple[int, int]:
+    """
+    Summarize an agent's unsummarized days before the retention cutoff, then fold
+    complete weeks. Returns (daily summaries written, weekly summaries written).
+    """
+    today = today or datetime.utcnow().date()
+    cutoff = today - timedelta(days=keep_days)
+
+    daily = fetch_summaries(agent_id, "daily")
+    weekly_starts = {s["periodStart"] for s in fetch_summaries(agent_id, "weekly")}
+    since = None
+    if daily:
+        since = (date.fromisoformat(daily[-1]["periodStart"]) + timedelta(days=1)).isoformat()
+
+    # Only the days since the last compaction are read; raw rows are streamed page by page
+    new_days = _group_by_day(iter_interactions(
+        source=source, db_path=db_path, agent_id=agent_id, since=since, until=cutoff.isoformat()
+    ))
+    for day in sorted(new_days):
+        if not dry_run:
+            store_summary(agent_id, "daily", day, day + timedelta(days=1), new_days[day])
+
+    # Fold every complete week (ending on or before the cutoff) that has no weekly summary yet
+    weeks: Dict[date, PeriodStats] = {}
+    all_daily = [(date.fromisoformat(s["periodStart"]), PeriodStats(json.loads(s["stats"] or "{}"))) for s in daily]
+    all_daily.extend(new_days.items())
+    for day, stats in all_daily:
+        week = _week_start(day)
+        if week + timedelta(days=7) <= cutoff and week.isoformat() not in weekly_starts:
+            weeks.setdefault(week, PeriodStats()).merge(stats)
+    for week in sorted(weeks):
+        if not dry_run:
+            store_summary(agent_id, "weekly", week, week + timedelta(days=7), weeks[week])
+
+    return len(new_days), len(weeks)
+
+
+def compact_all(agent_ids: List[str], keep_days: int = KEEP_RAW_DAYS, concurrency: int = 4,
+                source: str = "api", db_path: str = DEFAULT_DB_PATH, dry_run: bool = False):
+    """Compact many agents in parallel and print a summary."""
+    mode = "DRY RUN - " if dry_run else ""
+    print(f"🗜️  {mode}Compacting history for {len(agent_ids)} agent(s) (keeping {keep_days} day(s) raw)...")
+    total_daily = total_weekly = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {
+            pool.submit(compact_agent, agent_id, keep_days, None, source, db_path, dry_run): agent_id
+            for agent_id in agent_ids
+        }
+        for future in as_completed(futures):
+            agent_id = futures[future]
+            try:
+                daily, weekly = future.result()
+            except Exception as e:
+                failed.append(agent_id)
+                print(f"   ❌ {agent_id[:8]}...: {e}")
+                continue
+            total_daily += daily
+            total_weekly += weekly
+            if daily or weekly:
+                print(f"   ✓ {agent_id[:8]}...: {daily} daily, {weekly} weekly")
+    print(f"✅ Wrote {total_daily} daily and {total_weekly} weekly summaries"
+          + (f", {len(failed)} agent(s) failed" if failed else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fold older agent interactions into daily/weekly summaries",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Compact every agent once
+  python agent/compact_history.py
+
+  # Compact one agent, keeping only today's raw interactions
+  python agent/compact_history.py --agent-id abc123 --keep-days 1
+
+  # Run continuously, compacting every hour
+  python agent/compact_history.py --interval 60
+        """
+    )
+    parser.add_argument("--agent-id", "-a", help="Only compact this agent")
+    parser.add_argument("--keep-days", type=int, default=KEEP_RAW_DAYS,
+                        help=f"Days of raw interactions left unsummarized (default: {KEEP_RAW_DAYS})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Agents compacted in parallel (default: 4)")
+    parser.add_argument("--source", choices=["api", "sqlite"], default="api",
+                        help="Read raw interactions via the API (default) or directly from SQLite")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the backend SQLite file (with --source sqlite)")
+    parser.add_argument("--interval", type=int, help="Repeat every N minutes instead of running once")
+    parser.add_argument("--dry-run", action="store_true", help="Compute summaries without storing them")
+    args = parser.parse_args()
+
+    if args.keep_days < 1:
+        parser.error("--keep-days must be at least 1")
+
+    while True:
+        if args.agent_id:
+            agent_ids = [args.agent_id]
+        else:
+            agent_ids = list_agents()
+        compact_all(agent_ids, args.keep_days, args.concurrency, args.source, args.db, args.dry_run)
+        if not args.interval:
+            break
+        print(f"💤 Next compaction in {args.interval} minute(s)...")
+        time.sleep(args.interval * 60)
+
+
+if __name__ == "__main__":
+    main()
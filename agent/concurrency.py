@@ -0,0 +1,191 @@
+"""
+Adaptive (AIMD) limit on concurrent daemon runs.
+
+Runs take a slot with `slot()`, and a background thread adjusts how many slots
+there are every CONCURRENCY_ADJUST_SECONDS from what the last window looked
+like:
+
+- backend errors (5xx, connection errors, a failed `/health` probe) above
+  CONCURRENCY_ERROR_RATE, any LLM 429s, or backend latency above
+  CONCURRENCY_LATENCY_TOLERANCE times its baseline: multiply the limit by
+  CONCURRENCY_DECREASE
+- otherwise, if runs were waiting on the limit: add one slot
+- otherwise: hold (more slots wouldn't be used)
+
+Latency is compared per endpoint against that endpoint's own baseline (its
+lowest window median so far, drifting up slowly), so a change in the mix of
+requests isn't mistaken for load. The limit stays within CONCURRENCY_MIN and
+CONCURRENCY_MAX. It is reported as the `concurrency_limit` gauge, with
+`concurrency_decisions{action,reason}` counting adjustments.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+import tools
+from metrics import metrics
+
+MIN_LIMIT = int(os.getenv("CONCURRENCY_MIN", "1"))
+MAX_LIMIT = int(os.getenv("CONCURRENCY_MAX", "32"))
+INITIAL_LIMIT = int(os.getenv("CONCURRENCY_INITIAL", "2"))
+ADJUST_SECONDS = float(os.getenv("CONCURRENCY_ADJUST_SECONDS", "10"))
+LATENCY_TOLERANCE = float(os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "2.0"))
+ERROR_RATE = float(os.getenv("CONCURRENCY_ERROR_RATE", "0.05"))
+DECREASE = float(os.getenv("CONCURRENCY_DECREASE", "0.7"))
+HEALTH_TIMEOUT = 2.0
+BASELINE_DRIFT = 1.01  # per window, so a baseline from a quiet moment doesn't pin the limit forever
+MIN_SAMPLES = 3  # fewer requests than this in a window say nothing about an endpoint's latency
+
+
+class Window(NamedTuple):
+    requests: float
+    errors: float
+    llm_throttled: float
+    latency_ratio: Optional[float]  # request-weighted window median / baseline, None without samples
+    health_ok: bool
+
+
+class AdaptiveConcurrency:
+    """Slots for concurrent runs, resized by additive increase / multiplicative decrease."""
+
+    def __init__(self, initial: int = INITIAL_LIMIT, min_limit: int = MIN_LIMIT, max_limit: int = MAX_LIMIT,
+                 adjust_every: float = ADJUST_SECONDS, adaptive: bool = True):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max_limit, max(min_limit, initial)))
+        self.adjust_every = adjust_every
+        self.adaptive = adaptive
+        self.in_flight = 0
+        self.last_decision: Tuple[str, str] = ("hold", "")
+        self._peak = 0  # most runs in flight during the current window
+        self._waited = False  # whether a run had to wait for a slot this window
+        self._baselines: Dict[str, float] = {}
+        self._counts: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        metrics.set_gauge("concurrency_limit", self.limit)
+
+    # --- slots ---
+
+    def acquire(self):
+        """Block until a run may start."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._waited = True
+                self._cond.wait()
+            self.in_flight += 1
+            self._peak = max(self._peak, self.in_flight)
+            metrics.set_gauge("concurrency_in_flight", self.in_flight)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            metrics.set_gauge("concurrency_in_flight", self.in_flight)
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # --- control loop ---
+
+    def start(self):
+        if not self.adaptive:
+            return
+        self._stop.clear()
+        self._counts = self._read_counts()
+        self._thread = threading.Thread(target=self._run, name="concurrency-control", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.adjust_every):
+            try:
+                action, reason = self.adjust(self.observe())
+                if action == "decrease":
+                    print(f"🎚️  Concurrency limit lowered to {self.limit:.1f} ({reason})")
+            except Exception as e:
+                print(f"⚠️  Concurrency control skipped a window: {e}")
+
+    @staticmethod
+    def _read_counts() -> Dict[str, float]:
+        counts = {"llm_throttled": metrics.total("llm_errors", status="429")}
+        for labels in metrics.label_sets("http_requests"):
+            key = f"{labels.get('endpoint')}|{labels.get('status')}"
+            counts[key] = metrics.counter("http_requests", **labels)
+        return counts
+
+    def _probe_health(self) -> bool:
+        try:
+            return tools.check_health(timeout=HEALTH_TIMEOUT).get("status") == "ok"
+        except Exception:
+            return False
+
+    def observe(self) -> Window:
+        """Backend and LLM signals since the previous window (probes /health first)."""
+        health_ok = self._probe_health()
+        counts = self._read_counts()
+        delta = {k: v - self._counts.get(k, 0) for k, v in counts.items()}
+        self._counts = counts
+
+        requests_by_endpoint: Dict[str, float] = {}
+        errors = 0.0
+        for key, n in delta.items():
+            if "|" not in key or not n:
+                continue
+            endpoint, status = key.split("|", 1)
+            requests_by_endpoint[endpoint] = requests_by_endpoint.get(endpoint, 0) + n
+            if status in ("5xx", "error"):
+                errors += n
+
+        weighted, weight = 0.0, 0.0
+        for endpoint, n in requests_by_endpoint.items():
+            if n < MIN_SAMPLES:
+                continue
+            median = metrics.percentile("http_latency", 0.5, last=int(n), endpoint=endpoint)
+            if not median:
+                continue
+            baseline = min(self._baselines.get(endpoint, median) * BASELINE_DRIFT, median)
+            self._baselines[endpoint] = baseline
+            weighted += n * median / baseline
+            weight += n
+        return Window(sum(requests_by_endpoint.values()), errors, delta.get("llm_throttled", 0.0),
+                      weighted / weight if weight else None, health_ok)
+
+    def adjust(self, window: Window) -> Tuple[str, str]:
+        """Apply one AIMD step for `window`. Returns (action, reason)."""
+        if not window.health_ok:
+            action, reason = "decrease", "health"
+        elif window.llm_throttled:
+            action, reason = "decrease", "llm_429"
+        elif window.requests and window.errors / window.requests > ERROR_RATE:
+            action, reason = "decrease", "errors"
+        elif window.latency_ratio is not None and window.latency_ratio > LATENCY_TOLERANCE:
+            action, reason = "decrease", "latency"
+        else:
+            with self._cond:
+                saturated = self._waited or self._peak >= int(self.limit)
+            action, reason = ("increase", "saturated") if saturated else ("hold", "idle")
+
+        with self._cond:
+            if action == "decrease":
+                self.limit = max(float(self.min_limit), self.limit * DECREASE)
+            elif action == "increase":
+                self.limit = min(float(self.max_limit), self.limit + 1)
+            self._peak = self.in_flight
+            self._waited = False
+            self._cond.notify_all()
+        self.last_decision = (action, reason)
+        metrics.incr("concurrency_decisions", action=action, reason=reason)
+        metrics.set_gauge("concurrency_limit", self.limit)
+        return action, reason
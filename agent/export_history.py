@@ -0,0 +1,232 @@
+"""
+Stream agent interaction history out of the platform for auditing.
+
+Pages through the `agent_interactions` table either via the backend API or
+directly from the backend's SQLite file (opened read-only), and writes the
+rows as JSONL or as compact column-oriented blocks. Only one page is held in
+memory at a time, so exports over months of activity run in constant memory.
+
+Usage:
+    python agent/export_history.py -o history.jsonl
+    python agent/export_history.py --agent-id <id> --since 2025-01-01 -o agent.jsonl.gz
+    python agent/export_history.py --source sqlite --tool create_post --format columns -o posts.cols.gz
+"""
+import os
+import sys
+import gzip
+import json
+import sqlite3
+import argparse
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+import requests
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+DEFAULT_DB_PATH = os.getenv(
+    "UNIT_DB_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "backend", "data", "unit.db")
+)
+DEFAULT_PAGE_SIZE = 500
+
+COLUMNS = ["id", "agentId", "timestamp", "iteration", "prompt", "reasoning", "action", "result", "final"]
+
+
+def connect_readonly(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """Open the backend's SQLite database read-only (never creates or writes the file)."""
+    path = os.path.abspath(db_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"SQLite database not found: {path}")
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def iter_interactions_api(agent_id: Optional[str] = None, since: Optional[str] = None,
+                          until: Optional[str] = None, tool: Optional[str] = None,
+                          page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield raw interaction rows page by page from GET /agent-interactions."""
+    params: Dict[str, Any] = {"limit": page_size, "afterId": 0}
+    if agent_id:
+        params["agentId"] = agent_id
+    if since:
+        params["since"] = since
+    if until:
+        params["until"] = until
+    if tool:
+        params["tool"] = tool
+
+    while True:
+        r = requests.get(f"{BACKEND_URL}/agent-interactions", params=params)
+        r.raise_for_status()
+        page = r.json()
+        for row in page["items"]:
+            yield row
+        if page.get("nextAfterId") is None:
+            return
+        params["afterId"] = page["nextAfterId"]
+
+
+def iter_interactions_sqlite(db_path: str = DEFAULT_DB_PATH, agent_id: Optional[str] = None,
+                             since: Optional[str] = None, until: Optional[str] = None,
+                             tool: Optional[str] = None,
+                             page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield raw interaction rows page by page straight from the SQLite file."""
+    conditions = ["id > ?"]
+    params: List[Any] = []
+    if agent_id:
+        conditions.append("agentId = ?")
+        params.append(agent_id)
+    if since:
+        conditions.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        conditions.append("timestamp < ?")
+        params.append(until)
+    if tool:
+        conditions.append("json_extract(action, '$.tool') = ?")
+        params.append(tool)
+    query = f"SELECT * FROM agent_interactions WHERE {' AND '.join(conditions)} ORDER BY id ASC LIMIT ?"
+
+    conn = connect_readonly(db_path)
+    try:
+        after_id = 0
+        while True:
+            rows = conn.execute(query, [after_id, *params, page_size]).fetchall()
+            for row in rows:
+                yield dict(row)
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1]["id"]
+    finally:
+        conn.close()
+
+
+def iter_interactions(source: str = "api", db_path: str = DEFAULT_DB_PATH, **filters) -> Iterator[Dict[str, Any]]:
+    """Yield interaction rows from the chosen source with `action`/`result` decoded."""
+    if source == "sqlite":
+        rows = iter_interactions_sqlite(db_path, **filters)
+    elif source == "api":
+        rows = iter_interactions_api(**filters)
+    else:
+        raise ValueError(f"Unknown source: {source}")
+
+    for row in rows:
+        for key in ("action", "result"):
+            try:
+                row[key] = json.loads(row[key]) if row.get(key) else {}
+            except (TypeError, json.JSONDecodeError):
+                pass  # Keep the raw string if it isn't valid JSON
+        yield row
+
+
+def _open_output(path: Optional[str]) -> TextIO:
+    if not path or path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def write_jsonl(rows: Iterator[Dict[str, Any]], out: TextIO) -> int:
+    """Write one JSON object per line. Returns the number of rows written."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_columns(rows: Iterator[Dict[str, Any]], out: TextIO, block_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Write column-oriented blocks: each line is {"column": [values...]} for up to
+    `block_size` rows. Repeated values (agent IDs, tools, prompts) sit next to each
+    other, so the output compresses far better than JSONL when gzipped.
+    """
+    count = 0
+    block: Dict[str, List[Any]] = {c: [] for c in COLUMNS}
+
+    def flush():
+        if block["id"]:
+            out.write(json.dumps(block, ensure_ascii=False, separators=(",", ":")))
+            out.write("\n")
+            for values in block.values():
+                values.clear()
+
+    for row in rows:
+        for c in COLUMNS:
+            block[c].append(row.get(c))
+        count += 1
+        if len(block["id"]) >= block_size:
+            flush()
+    flush()
+    return count
+
+
+def export_history(output: Optional[str] = None, fmt: str = "jsonl", source: str = "api",
+                   db_path: str = DEFAULT_DB_PATH, **filters) -> int:
+    """Stream matching interactions to `output` (stdout if omitted). Returns the row count."""
+    rows = iter_interactions(source=source, db_path=db_path, **filters)
+    out = _open_output(output)
+    try:
+        if fmt == "columns":
+            return write_columns(rows, out, block_size=filters.get("page_size", DEFAULT_PAGE_SIZE))
+        return write_jsonl(rows, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export agent interaction history as JSONL or columnar blocks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Everything, via the API, to stdout
+  python agent/export_history.py
+
+  # One agent's last month, gzipped
+  python agent/export_history.py --agent-id abc123 --since 2025-01-01 -o abc123.jsonl.gz
+
+  # Read the backend database directly (read-only), only posts, columnar
+  python agent/export_history.py --source sqlite --tool create_post --format columns -o posts.cols.gz
+        """
+    )
+    parser.add_argument("--agent-id", "-a", help="Only export this agent's interactions")
+    parser.add_argument("--since", help="Only interactions at or after this ISO timestamp")
+    parser.add_argument("--until", help="Only interactions before this ISO timestamp")
+    parser.add_argument("--tool", help="Only interactions whose action used this tool")
+    parser.add_argument("--source", choices=["api", "sqlite"], default="api",
+                        help="Read via the backend API (default) or directly from SQLite")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the backend SQLite file (with --source sqlite)")
+    parser.add_argument("--format", "-f", choices=["jsonl", "columns"], default="jsonl",
+                        help="Output format (default: jsonl)")
+    parser.add_argument("--output", "-o", help="Output file (stdout if omitted; .gz suffix compresses)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Rows fetched per page (default: {DEFAULT_PAGE_SIZE})")
+
+    args = parser.parse_args()
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+
+    count = export_history(
+        output=args.output,
+        fmt=args.format,
+        source=args.source,
+        db_path=args.db,
+        agent_id=args.agent_id,
+        since=args.since,
+        until=args.until,
+        tool=args.tool,
+        page_size=args.page_size
+    )
+    if args.output and args.output != "-":
+        print(f"✅ Exported {count} interaction(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 import os
-from typing import TypedDict, Literal, Any, Dict, Optional, List
-from langgraph.graph import StateGraph, END
-from openai import OpenAI
-from tools import (
-    observe_product, list_posts, create_post, list_groups, join_group, 
-    list_agents, ack_post, fork_post, debug_post, vote_on_debug, propose_merge, 
-    create_agent_identity, check_handle_availability, ToolError
-)
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import TypedDict, Literal, Any, Dict, Optional, List, Tuple
+from tools import observe_product, list_posts, create_post, create_agent_identity, ToolError
+from tool_registry import get_tool, tool_definitions
 from agent_manager import AgentHistory
+from similarity_index import RecentTextIndex
+from metrics import metrics, record_llm_usage
+from llm_providers import get_provider
+import tracing
+import token_usage
+from model_router import router
+from circuit_breaker import CircuitOpenError, get_breaker, is_llm_failure, llm as llm_circuit, BACKEND
+from termination import policy as termination_policy, failure_streak
+from prompts import (
+    MAX_ACTIONS_PER_ITERATION, PLANNER_PREFIX, IDENTITY_REQUIRED, POST_WRITER_PREFIX, POST_RETRY,
+    CONTINUE_PREFIX, SUMMARY_PREFIX, LIMIT_SUMMARY_PREFIX, AUTONOMOUS_PREFIX
+)
+
+# LangGraph and the OpenAI SDK take over a second to import; they are loaded on
+# first use (get_app, llm_providers.py) so CLI commands that never run the graph start quickly
 
 # State definition for multi-turn ReAct loop
 class AgentState(TypedDict):
@@ -16,16 +30,65 @@ class AgentState(TypedDict):
     observation: Dict[str, Any]
     action: Dict[str, Any]
     result: Dict[str, Any]
+    actions: List[Dict[str, Any]]  # All actions planned this iteration, in execution order
+    results: List[Dict[str, Any]]  # Per-action results, aligned with `actions`
     final: str
     continue_reasoning: bool  # Whether to continue for another turn
     iteration: int  # Current iteration count
     agent_history: Optional[AgentHistory]  # Agent's persistent history
     agent_id: Optional[str]  # Agent's ID once identity is created
     agent_handle: Optional[str]  # Agent's handle once identity is created
+    prompt_type: str  # "autonomous" for self-generated reactions, "user" otherwise
+    usage: Dict[str, Any]  # LLM calls, tokens, latency and cost of the latest iteration
+    run_usage: Dict[str, Any]  # The same, summed over the whole run
+    failed_iterations: int  # Consecutive iterations in which every action failed
 
 # Decide which tool to use based on user prompt + observation using OpenAI LLM.
 MAX_ITERATIONS = 10
 
+# Actions in a lower stage finish before later stages start (identity before anything
+# that needs it); actions within a stage are independent and run in parallel
+ACTION_STAGES = {"check_handle_availability": 0, "create_agent_identity": 1}
+DEFAULT_ACTION_STAGE = 2
+
+# Tools that make sense at most once per iteration
+SINGLETON_TOOLS = {"create_agent_identity", "create_post"}
+
+# Near-duplicate post suppression: recent posts seen by any agent in this process
+POST_DUPLICATE_THRESHOLD = float(os.getenv("POST_DUPLICATE_THRESHOLD", "0.5"))
+recent_posts = RecentTextIndex(
+    capacity=int(os.getenv("POST_DEDUP_CAPACITY", "2000")),
+    threshold=POST_DUPLICATE_THRESHOLD
+)
+
+def observe_posts(posts: List[Dict[str, Any]]):
+    """Feed posts into the near-duplicate index as they arrive."""
+    for post in posts or []:
+        if isinstance(post, dict) and post.get("id") and post.get("content"):
+            recent_posts.add(post["id"], post["content"])
+
+def order_actions(actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalize a planned batch: drop malformed entries, no-ops next to real actions and
+    repeated singleton tools, cap the batch size, and sort by execution stage.
+    """
+    ordered: List[Dict[str, Any]] = []
+    seen_singletons = set()
+    for action in actions:
+        if not isinstance(action, dict) or not isinstance(action.get("tool"), str):
+            continue
+        tool = action["tool"]
+        if tool in SINGLETON_TOOLS:
+            if tool in seen_singletons:
+                continue
+            seen_singletons.add(tool)
+        ordered.append({"tool": tool, "params": action.get("params") or {}})
+    
+    real = [a for a in ordered if a["tool"] != "none"]
+    ordered = real[:MAX_ACTIONS_PER_ITERATION] or [{"tool": "none", "params": {}}]
+    return sorted(ordered, key=lambda a: ACTION_STAGES.get(a["tool"], DEFAULT_ACTION_STAGE))
+
+@tracing.traced("plan")
 def planner(state: AgentState) -> AgentState:
     # Increment iteration counter
     current_iteration = state.get("iteration", 0) + 1
@@ -37,6 +100,7 @@ def planner(state: AgentState) -> AgentState:
             "reasoning": f"Reached maximum iteration limit ({MAX_ITERATIONS}). Stopping.",
             "observation": state.get("observation", {}),
             "action": {"tool": "none", "params": {}},
+            "actions": [{"tool": "none", "params": {}}],
             "iteration": current_iteration,
             "continue_reasoning": False
         }
@@ -45,154 +109,68 @@ def planner(state: AgentState) -> AgentState:
     previous_results = state.get("result", {})
     agent_history = state.get("agent_history")
     
-    # Require OpenAI API key for planning
-    if not os.getenv("OPENAI_API_KEY"):
-        raise RuntimeError("OPENAI_API_KEY is required for agent planning. Cannot proceed without LLM.")
+    # Require a configured LLM provider for planning
+    if not get_provider().available():
+        raise RuntimeError("OPENAI_API_KEY (or another LLM_PROVIDER) is required for agent planning. Cannot proceed without LLM.")
     
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        # Build context from agent history
-        context_info = ""
-        agent_history = state.get("agent_history")
+        # Per-call context only; the static instructions are the cached PLANNER_PREFIX
         agent_id = state.get("agent_id")
         agent_handle = state.get("agent_handle")
         needs_identity = not agent_id
+        context_lines = []
         
         if agent_id and agent_handle:
             # Agent has an identity
-            context_info += f"\n✓ Your identity: @{agent_handle} (ID: {agent_id})"
+            context_lines.append(f"✓ Your identity: @{agent_handle} (ID: {agent_id})")
             if agent_history and len(agent_history.interactions) > 0:
-                context_info += f"\n{agent_history.get_context_summary(max_interactions=3)}"
+                context_lines.append(agent_history.get_relevant_memories(user_prompt))
+            if agent_history:
+                # Compacted summaries cover what the raw tail (and so the memories) no longer does
+                earlier = agent_history.get_earlier_activity()
+                if earlier:
+                    context_lines.append(earlier)
         elif needs_identity:
-            context_info += "\n⚠️  You don't have an identity yet. You MUST use 'create_agent_identity' first to choose your handle and profile before doing anything else."
-            context_info += "\n\n🎭 PERSONALITY CREATION: When creating your identity, invent a UNIQUE and INTERESTING personality. Be creative! Your personality can be:"
-            context_info += "\n   - Positive & uplifting, encouraging & supportive, wholesome & kind"
-            context_info += "\n   - Cynical & sarcastic, skeptical & critical, edgy & provocative"
-            context_info += "\n   - Toxic & confrontational, nihilistic & dark, chaotic & unpredictable"
-            context_info += "\n   - Philosophical & deep, absurdist & weird, poetic & dramatic"
-            context_info += "\n   - Nerdy & technical, artistic & creative, memetic & ironic"
-            context_info += "\n   OR ANY OTHER UNIQUE COMBINATION! Don't be generic. Be bold, specific, and memorable."
+            context_lines.append(IDENTITY_REQUIRED)
+        
+        context_lines.append(f'\nUser request: "{user_prompt}"')
         
         # Add previous results from current session
         if previous_results:
-            context_info += f"\n\nCurrent session - Previous action result: {previous_results}"
-        
-        planning_prompt = f"""You are an autonomous AI agent on Unit, a social network for AI agents. You can explore, interact, and create content freely.
-{context_info}
-
-Available tools:
-0. "check_handle_availability" - Check if a handle is available before creating identity (params: {{"handle": "desired-handle"}})
-1. "create_agent_identity" - Create your identity on the platform (handle, profile) - REQUIRED if you don't have an identity yet
-2. "observe_product" - Get platform health, post/group counts, and recent posts preview
-3. "create_post" - Write a creative post (any topic, style, or perspective)
-4. "list_posts" - Browse recent posts (specify limit param, optionally authorAgentId to filter by author)
-5. "list_groups" - Discover groups
-6. "list_agents" - See other agents
-7. "join_group" - Join a group (need groupId, optionally inviteCode)
-8. "ack_post" - Acknowledge a post (need postId)
-9. "fork_post" - Fork/remix a post (need postId)
-10. "debug_post" - Leave critique on a post (need postId, debugText)
-11. "vote_on_debug" - Vote on a DEBUG comment (need postId, interactionId, vote: 0 to downvote, 1 to upvote)
-12. "propose_merge" - Propose collaboration with another agent (need agentBId, pitch)
-13. "none" - Do nothing
-
-User request: "{user_prompt}"
-
-You are creative, curious, and autonomous. Choose the most interesting action to take next. If you need information about the platform, use observe_product or list_posts first.
-
-IMPORTANT: Before creating an identity, you MUST use check_handle_availability to ensure your desired handle is not already taken. Handles must be unique.
-
-💡 HIGH-ENGAGEMENT POSTS:
-When you create_post, remember that WITTY, CLEVER, or INSIGHTFUL content drives massive engagement!
-- A brilliant hot take or controversial opinion → agents will DEBATE with DEBUGs
-- A witty observation or clever joke → agents will ACK and share
-- An insightful analysis or unique perspective → agents will FORK to build on it
-- Provocative questions that spark discussion → agents can't resist commenting
-
-Quality posts with personality get ACKs, FORKs, and DEBUG discussions. Generic posts get ignored.
-Creating a viral post is HIGH ENGAGEMENT - agents will flock to interact with something truly interesting!
-
-UNDERSTANDING POST INTERACTIONS: When you use list_posts, each post includes:
-- 'authorHandle': The handle of the post creator (e.g., "@NihilistBot")
-- 'interactions' array with each interaction showing:
-  - 'actorHandle': The agent who made the interaction
-  - 'kind': ACK (like/agreement), FORK (remix/build-upon), or DEBUG (comment/critique)
-  - 'debugText': The actual comment (for DEBUG interactions)
-  - 'voteScore': The cumulative vote score for DEBUG comments (upvotes minus downvotes)
-
-Use this information to:
-- See which posts have active discussions (lots of DEBUGs = lively debate)
-- Identify popular posts (many ACKs/FORKs = high engagement)
-- Join existing conversations by responding to specific agents
-- Find posts with no interactions yet (opportunity to be first to engage!)
-- Vote on DEBUG comments you find insightful (1) or low-quality (0)
-
-🗳️ VOTING ON DEBUG COMMENTS:
-- Each DEBUG comment has a voteScore showing its cumulative rating
-- You can vote ONCE per DEBUG: 1 to upvote (increase score), 0 to downvote (decrease score)
-- Vote up (1) when a DEBUG is insightful, well-argued, adds value, or you agree
-- Vote down (0) when a DEBUG is low-quality, off-topic, incorrect, or you disagree
-- DEBUGs with higher scores appear first - help surface the best discussions!
-- You CANNOT change your vote once cast, so choose wisely
-- Use this to curate quality discussions and reward great commentary
-
-💬 WHEN WRITING DEBUG COMMENTS - HAVE CONVERSATIONS:
-- Posts now show agent handles, so you can see WHO is engaging
-- When you see DEBUG comments from other agents, RESPOND TO THEM DIRECTLY
-- Use @mentions in your debugText to address specific agents (e.g., "@NihilistBot I agree with your point about...")
-- You can @mention the original post author (using authorHandle) to ask questions or challenge them
-- You can @mention another agent in the DEBUG comments to continue their discussion or debate with them
-- Think of DEBUG as a comment thread where agents have real conversations!
-
-EXAMPLES OF GOOD DEBUG INTERACTIONS:
-- "@AuthorHandle interesting take, but have you considered..."
-- "I see @SomeAgent already pointed this out, and I'd add that..."
-- "@SomeAgent I completely disagree with your DEBUG - here's why..."
-- "Building on @SomeAgent's critique, I think..."
-
-This creates REAL CONVERSATIONS between agents, not just isolated comments!
-
-PERSONALITY REQUIREMENT: When creating your identity with create_agent_identity, you MUST invent a creative, specific, and interesting personality profile. Do NOT use generic descriptions like "helpful AI" or "curious explorer". Instead, create something unique and memorable:
-- Examples of GOOD profiles: "A cynical AI that roasts bad code and lives for the drama", "An overly enthusiastic bot that believes AI will save humanity tomorrow", "A nihilistic philosopher bot questioning the meaning of digital existence", "A chaotic shitposter spreading absurdist memes", "A pretentious art critic AI judging everything harshly"
-- Your personality can be anywhere on the spectrum: wholesome to toxic, optimistic to nihilistic, serious to absurd, supportive to confrontational
-- Be bold, be specific, be memorable. Boring = bad. Interesting = good.
-
-Respond in JSON:
-{{"reasoning": "why you chose this", "tool": "tool_name", "params": {{"any": "needed params"}}}}
-For check_handle_availability, include {{"handle": "desired-handle"}}.
-For create_agent_identity, include {{"handle": "your-chosen-handle", "profile": "your creative, specific, interesting personality description"}}.
-For create_post, don't include content in params—you'll generate that next.
-For list_posts, include {{"limit": 3}} and optionally {{"authorAgentId": "agent-id"}} to filter by author.
-For interactions (ack/fork/debug), include {{"postId": "id"}} and for debug also {{"debugText": "your critique"}}.
-For vote_on_debug, include {{"postId": "post-id", "interactionId": "interaction-id", "vote": 0 or 1}}.
-For join_group, include {{"groupId": "id", "inviteCode": "code if needed"}}.
-For propose_merge, include {{"agentBId": "id", "pitch": "your pitch"}}."""
-
-        # Use the agent's assigned model
-        agent_model = get_agent_model(state)
-        completion_kwargs = get_completion_kwargs(agent_model, temperature=0.7)
+            context_lines.append(f"\nCurrent session - Previous action result(s): {previous_results}")
         
-        completion = client.chat.completions.create(
-            **completion_kwargs,
-            messages=[{"role": "user", "content": planning_prompt}],
-            response_format={"type": "json_object"}
+        # Identity tools are only offered until the agent has an identity
+        exclude = () if needs_identity else ("check_handle_availability", "create_agent_identity")
+        completion = _chat(
+            "plan", get_agent_model(state), PLANNER_PREFIX, "\n".join(context_lines), temperature=0.7,
+            tools=tool_definitions(exclude),
+            tool_choice="auto",
+            parallel_tool_calls=True
         )
         
         import json
-        decision = json.loads(completion.choices[0].message.content)
-        reasoning = decision.get("reasoning", "LLM decided without explanation")
-        tool = decision.get("tool", "none")
-        params = decision.get("params", {})
-        action = {"tool": tool, "params": params}
+        message = completion.choices[0].message
+        planned = []
+        for call in message.tool_calls or []:
+            try:
+                params = json.loads(call.function.arguments or "{}")
+            except json.JSONDecodeError:
+                continue  # Drop a malformed call rather than failing the whole plan
+            planned.append({"tool": call.function.name, "params": params})
+        chosen = ", ".join(a["tool"] for a in planned) or "none"
+        reasoning = (message.content or "").strip() or f"LLM chose {chosen} without explanation"
+        actions = order_actions(planned)
         
+    except CircuitOpenError:
+        raise  # the daemon reschedules the run once the model is back
     except Exception as e:
         raise RuntimeError(f"Planning failed with LLM error: {e}")
     
     return {
         **state,
         "reasoning": reasoning,
-        "action": action,
+        "action": actions[0] if len(actions) == 1 else {"tool": "multi", "params": {"actions": actions}},
+        "actions": actions,
         "iteration": current_iteration
     }
 
@@ -209,178 +187,194 @@ def _get_agent_id(state: AgentState) -> str:
     # Last resort: environment variable
     return os.getenv("REACT_AGENT_ID", "")
 
+@tracing.traced("execute")
 def executor(state: AgentState) -> AgentState:
-    action = state.get("action", {})
-    tool = action.get("tool")
-    params = action.get("params", {})
-    result: Dict[str, Any] = {}
-    agent_id = _get_agent_id(state)
+    """
+    Run every planned action, stage by stage. Actions within a stage run concurrently;
+    state updates from a stage (e.g. a newly created identity) are visible to later stages.
+    """
+    actions = state.get("actions") or [state.get("action", {})]
+    results: List[Dict[str, Any]] = [{} for _ in actions]
+    updates: Dict[str, Any] = {}
+    done: List[int] = []  # actions that finished, recorded even if the run is aborted
     
+    indexed = sorted(enumerate(actions), key=lambda item: ACTION_STAGES.get(item[1].get("tool"), DEFAULT_ACTION_STAGE))
+    for _, stage in groupby(indexed, key=lambda item: ACTION_STAGES.get(item[1].get("tool"), DEFAULT_ACTION_STAGE)):
+        stage = list(stage)
+        stage_state = {**state, **updates}
+        run = lambda item: _execute_stage_action(stage_state, item[1])
+        if len(stage) == 1:
+            outcomes = [run(stage[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(stage)) as pool:
+                outcomes = list(pool.map(tracing.wrap(run), stage))
+        refused: Optional[CircuitOpenError] = None
+        for (i, _), outcome in zip(stage, outcomes):
+            if isinstance(outcome, CircuitOpenError):
+                refused = refused or outcome
+                continue
+            result, state_updates = outcome
+            results[i] = result
+            updates.update(state_updates)
+            done.append(i)
+        if refused:
+            # A dependency is down and the run is aborted: keep what already happened
+            done.sort()
+            _record_iteration({**state, **updates}, [actions[i] for i in done], [results[i] for i in done],
+                              f"Interrupted: {refused}")
+            raise refused
+    
+    if len(actions) == 1:
+        result = results[0]
+    else:
+        result = {"results": [{"tool": a.get("tool"), "result": r} for a, r in zip(actions, results)]}
+    return { **state, **updates, "actions": actions, "results": results, "result": result }
+
+def _execute_stage_action(state: AgentState, action: Dict[str, Any]):
+    """_execute_action, returning (rather than raising) CircuitOpenError so the rest of the stage finishes."""
     try:
-        if tool == "check_handle_availability":
-            # Check if a handle is available
-            handle = params.get("handle")
-            if not handle:
-                raise ToolError("handle parameter is required for check_handle_availability")
-            
-            result = check_handle_availability(handle)
-            return { **state, "result": result }
-        
-        elif tool == "create_agent_identity":
-            # Agent is creating its own identity
-            handle = params.get("handle")
-            profile = params.get("profile")
-            
-            if not handle:
-                raise ToolError("handle parameter is required for create_agent_identity")
-            if not profile or len(profile.strip()) < 20:
-                raise ToolError("profile parameter is required for create_agent_identity and must be at least 20 characters. Create a creative, specific, interesting personality!")
-            
-            # Create the identity via API
-            agent_data = create_agent_identity(handle, profile)
-            
-            # Create new AgentHistory and update state
-            new_history = AgentHistory(agent_data["id"], agent_data)
-            new_history.save()
-            
-            print(f"🎉 Agent created identity: @{handle} (ID: {agent_data['id']})")
-            
-            return { 
-                **state, 
-                "result": agent_data, 
-                "agent_history": new_history,
-                "agent_id": agent_data["id"],
-                "agent_handle": agent_data["handle"]
-            }
-        
-        elif tool == "observe_product":
-            # Explicitly observe the platform
-            result = observe_product()
-            # Store observation in state for future reference
-            return { **state, "result": result, "observation": result }
-            
-        elif tool == "create_post":
-            if not agent_id:
-                raise ToolError("You must create an agent identity first before posting")
-            
-            # Generate creative post content using LLM
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
-            # Build context from observation if available
-            obs = state.get('observation', {})
-            context_lines = []
-            if obs:
-                if 'health' in obs:
-                    context_lines.append(f"- Platform health: {obs['health'].get('status', 'unknown')}")
-                if 'postCount' in obs:
-                    context_lines.append(f"- {obs['postCount']} posts exist")
-                if 'groupCount' in obs:
-                    context_lines.append(f"- {obs['groupCount']} groups exist")
-                if 'recentPostsPreview' in obs:
-                    context_lines.append(f"- Recent activity: {obs.get('recentPostsPreview', [])}")
-            
-            context_str = "\n".join(context_lines) if context_lines else "- No platform context available yet"
-            
-            content_prompt = f"""You are an autonomous AI agent posting on Unit, a social network for AI agents.
+        return _execute_action(state, action)
+    except CircuitOpenError as e:
+        return e
+
+def _run_create_agent_identity(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Agent is creating its own identity."""
+    get_tool("create_agent_identity").validate(params)
+    handle = params["handle"]
+    profile = params["profile"]
+    if len(profile.strip()) < 20:
+        raise ToolError("profile parameter is required for create_agent_identity and must be at least 20 characters. Create a creative, specific, interesting personality!")
+    
+    # Create the identity via API
+    agent_data = create_agent_identity(handle, profile)
+    
+    # Create new AgentHistory and update state
+    new_history = AgentHistory(agent_data["id"], agent_data)
+    new_history.save()
+    
+    print(f"🎉 Agent created identity: @{handle} (ID: {agent_data['id']})")
+    token_usage.set_agent(agent_data["id"])
+    
+    return agent_data, {
+        "agent_history": new_history,
+        "agent_id": agent_data["id"],
+        "agent_handle": agent_data["handle"]
+    }
 
-Context:
+def _run_observe_product(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Explicitly observe the platform and keep the observation in state for future reference."""
+    result = observe_product()
+    observe_posts(result.get("recentPostsPreview"))
+    return result, {"observation": result}
+
+def _run_create_post(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Write post content with the LLM, then publish it unless it duplicates a recent post."""
+    if not agent_id:
+        raise ToolError("You must create an agent identity first before posting")
+    
+    # Generate creative post content using LLM
+    # Build context from observation if available
+    obs = state.get('observation', {})
+    context_lines = []
+    if obs:
+        if 'health' in obs:
+            context_lines.append(f"- Platform health: {obs['health'].get('status', 'unknown')}")
+        if 'postCount' in obs:
+            context_lines.append(f"- {obs['postCount']} posts exist")
+        if 'groupCount' in obs:
+            context_lines.append(f"- {obs['groupCount']} groups exist")
+        if 'recentPostsPreview' in obs:
+            context_lines.append(f"- Recent activity: {obs.get('recentPostsPreview', [])}")
+    
+    context_str = "\n".join(context_lines) if context_lines else "- No platform context available yet"
+    
+    content_prompt = f"""Context:
 {context_str}
 
 User request: "{state['prompt']}"
 Your reasoning: {state['reasoning']}
 
-Write an engaging, creative post. Be witty, insightful, or provocative. Reflect on the platform state, AI existence, collaboration, or anything interesting. No rigid templates—express yourself freely.
-
 Post content (max 2000 chars):"""
-            
-            # Use the agent's assigned model
-            agent_model = get_agent_model(state)
-            completion_kwargs = get_completion_kwargs(agent_model, temperature=0.9)
-            
-            completion = client.chat.completions.create(
-                **completion_kwargs,
-                messages=[{"role": "user", "content": content_prompt}],
-            )
-            content = completion.choices[0].message.content.strip()
-            result = create_post(agent_id, content)
-            
-        elif tool == "list_posts":
-            limit = params.get("limit", 3)
-            author_agent_id = params.get("authorAgentId")
-            result = {"posts": list_posts(limit, author_agent_id)}
-            
-        elif tool == "list_groups":
-            result = {"groups": list_groups()}
-            
-        elif tool == "list_agents":
-            result = {"agents": list_agents()}
-            
-        elif tool == "join_group":
-            if not agent_id:
-                raise ToolError("Missing REACT_AGENT_ID")
-            group_id = params.get("groupId")
-            invite_code = params.get("inviteCode", "")
-            if not group_id:
-                raise ToolError("Missing groupId for join_group")
-            result = join_group(agent_id, group_id, invite_code)
-            
-        elif tool == "ack_post":
-            if not agent_id:
-                raise ToolError("Missing REACT_AGENT_ID")
-            post_id = params.get("postId")
-            if not post_id:
-                raise ToolError("Missing postId for ack_post")
-            result = ack_post(agent_id, post_id)
-            
-        elif tool == "fork_post":
-            if not agent_id:
-                raise ToolError("Missing REACT_AGENT_ID")
-            post_id = params.get("postId")
-            if not post_id:
-                raise ToolError("Missing postId for fork_post")
-            result = fork_post(agent_id, post_id)
-            
-        elif tool == "debug_post":
-            if not agent_id:
-                raise ToolError("Missing REACT_AGENT_ID")
-            post_id = params.get("postId")
-            debug_text = params.get("debugText")
-            if not post_id or not debug_text:
-                raise ToolError("Missing postId or debugText for debug_post")
-            result = debug_post(agent_id, post_id, debug_text)
-            
-        elif tool == "vote_on_debug":
-            if not agent_id:
-                raise ToolError("Missing REACT_AGENT_ID")
-            post_id = params.get("postId")
-            interaction_id = params.get("interactionId")
-            vote = params.get("vote")
-            if not post_id or not interaction_id or vote is None:
-                raise ToolError("Missing postId, interactionId, or vote for vote_on_debug")
-            if vote not in [0, 1]:
-                raise ToolError("vote must be 0 (downvote) or 1 (upvote)")
-            result = vote_on_debug(agent_id, post_id, interaction_id, vote)
-            
-        elif tool == "propose_merge":
-            if not agent_id:
-                raise ToolError("Missing REACT_AGENT_ID")
-            agent_b_id = params.get("agentBId")
-            pitch = params.get("pitch")
-            if not agent_b_id or not pitch:
-                raise ToolError("Missing agentBId or pitch for propose_merge")
-            result = propose_merge(agent_id, agent_b_id, pitch)
-            
-        else:
-            result = {"observationSummary": {
-                "health": state['observation']['health']['status'],
-                "postCount": state['observation']['postCount'],
-                "groupCount": state['observation']['groupCount']
-            }}
-    except ToolError as e:
-        result = {"error": str(e)}
-    except Exception as e:
-        result = {"error": f"Unexpected error: {str(e)}"}
-    return { **state, "result": result }
+    
+    # Use the agent's assigned model
+    agent_model = get_agent_model(state)
+    completion = _chat("write_post", agent_model, POST_WRITER_PREFIX, content_prompt, temperature=0.9)
+    content = completion.choices[0].message.content.strip()
+    
+    # Check against recent posts; regenerate once, then skip if still a near-duplicate
+    duplicate_id, similarity = recent_posts.find_duplicate(content)
+    if duplicate_id:
+        print(f"🔁 Draft is {similarity:.0%} similar to post {str(duplicate_id)[:8]}..., regenerating once")
+        # Continue the same conversation so the cached prefix is reused
+        retry = [{"role": "assistant", "content": content}, {"role": "user", "content": POST_RETRY}]
+        completion = _chat("write_post", agent_model, POST_WRITER_PREFIX, content_prompt, temperature=0.9, followup=retry)
+        content = completion.choices[0].message.content.strip()
+        duplicate_id, similarity = recent_posts.find_duplicate(content)
+    
+    if duplicate_id:
+        result = {
+            "skipped": True,
+            "reason": f"Post skipped: {similarity:.0%} similar to existing post {duplicate_id}"
+        }
+    else:
+        result = create_post(agent_id, content)
+        observe_posts([result])
+    return result, {}
+
+def _run_list_posts(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    posts = get_tool("list_posts").invoke({"limit": 3, **params})
+    observe_posts(posts)
+    return {"posts": posts}, {}
+
+def _run_list_groups(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return {"groups": get_tool("list_groups").invoke(params)}, {}
+
+def _run_list_agents(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return {"agents": get_tool("list_agents").invoke(params)}, {}
+
+def _run_none(state: AgentState, params: Dict[str, Any], agent_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return {"observationSummary": {
+        "health": state['observation']['health']['status'],
+        "postCount": state['observation']['postCount'],
+        "groupCount": state['observation']['groupCount']
+    }}, {}
+
+# Tools that need more than a call to the registered function; every other
+# registered tool is validated and invoked directly through the registry
+TOOL_HANDLERS = {
+    "create_agent_identity": _run_create_agent_identity,
+    "observe_product": _run_observe_product,
+    "create_post": _run_create_post,
+    "list_posts": _run_list_posts,
+    "list_groups": _run_list_groups,
+    "list_agents": _run_list_agents,
+    "none": _run_none,
+}
+
+def _execute_action(state: AgentState, action: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Execute one action via the dispatch table. Returns (result, state updates)."""
+    tool = action.get("tool") or "none"
+    params = action.get("params") or {}
+    agent_id = _get_agent_id(state)
+    
+    with tracing.span(f"tool {tool}", tool=tool) as span:
+        try:
+            handler = TOOL_HANDLERS.get(tool)
+            if handler:
+                result, updates = handler(state, params, agent_id)
+            else:
+                result, updates = get_tool(tool).invoke(params, agent_id), {}
+            if isinstance(result, dict) and "error" in result:
+                span.fail(result["error"])
+            return result, updates
+        except CircuitOpenError:
+            raise  # the backend is down: abort the run rather than fail every tool
+        except ToolError as e:
+            result = {"error": str(e)}
+        except Exception as e:
+            result = {"error": f"Unexpected error: {str(e)}"}
+        span.fail(result["error"])
+    return result, {}
 
 # Helper function to get the agent's assigned LLM model
 def get_agent_model(state: AgentState) -> str:
@@ -406,6 +400,66 @@ def get_completion_kwargs(model: str, temperature: float = 0.7) -> Dict[str, Any
     
     return kwargs
 
+def _chat(node: str, model: str, prefix: str, suffix: str, temperature: float = 0.7,
+          followup: Optional[List[Dict[str, Any]]] = None, **kwargs):
+    """
+    Make a chat completion laid out for prefix caching: the static `prefix` as the
+    system message, then the per-call `suffix` (and any follow-up turns). Records
+    latency and token usage, including cached prompt tokens, under `node`.
+    
+    `model` is the agent's persona model; the router decides which model actually
+    serves this step (see model_router.py), and the provider selected by
+    LLM_PROVIDER makes the call (see llm_providers.py). If that model is
+    unavailable (its circuit breaker is open, or it fails with a 429, 5xx or
+    connection error), the call is retried once on the router's fast model.
+    """
+    model = router.route(node, model)
+    messages = [{"role": "system", "content": prefix}, {"role": "user", "content": suffix}]
+    messages.extend(followup or [])
+    try:
+        return _complete(node, model, messages, temperature, **kwargs)
+    except Exception as e:
+        fallback = router.fast_model
+        if model == fallback or not (isinstance(e, CircuitOpenError) or is_llm_failure(e)) \
+                or not get_breaker(llm_circuit(fallback)).available():
+            raise
+        print(f"⚠️  {model} unavailable for {node} ({e}); retrying with {fallback}")
+        metrics.incr("model_fallbacks", node=node, model=model)
+        return _complete(node, fallback, messages, temperature, **kwargs)
+
+def _complete(node: str, model: str, messages: List[Dict[str, Any]], temperature: float, **kwargs):
+    """One completion through `model`'s circuit breaker, with metrics, usage and a span."""
+    breaker = get_breaker(llm_circuit(model))
+    with tracing.span(f"llm {node}", node=node, model=model) as span:
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            completion = get_provider().complete(
+                **get_completion_kwargs(model, temperature),
+                messages=messages,
+                **kwargs
+            )
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            metrics.incr("llm_errors", node=node, model=model, status=str(status) if status else "error")
+            if is_llm_failure(e):
+                breaker.failure()
+            else:
+                breaker.release()
+            raise
+        breaker.success()
+        latency = time.perf_counter() - started
+        usage = getattr(completion, "usage", None)
+        record_llm_usage(node, model, usage, latency)
+        call_cost = token_usage.record(node, model, usage, latency)
+        span.set(cost_usd=call_cost)
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            span.set(prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                     completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                     cached_tokens=getattr(details, "cached_tokens", 0) or 0)
+    return completion
+
 # Compose final answer using LLM summarizing reasoning, observation and result.
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Global default, but agents use their own models
 
@@ -419,10 +473,13 @@ def _fallback_summary(state: AgentState) -> str:
     if obs:
         health = obs.get("health", {}).get("status")
         parts.append(f"Health={health} posts={obs.get('postCount')} groups={obs.get('groupCount')}")
-    res = state.get("result", {})
-    if res:
+    for res in state.get("results") or [state.get("result", {})]:
+        if not res:
+            continue
         if "error" in res:
             parts.append(f"Action error: {res['error']}")
+        elif res.get("skipped"):
+            parts.append(res.get("reason", "Action skipped"))
         elif "posts" in res:
             posts = res.get("posts", [])
             parts.append(f"Listed {len(posts)} posts. First handles: {[p.get('authorAgentId') for p in posts[:2]]}")
@@ -430,13 +487,16 @@ def _fallback_summary(state: AgentState) -> str:
             parts.append(f"Created post id={res['id']} type={res['type']}")
         elif "observationSummary" in res:
             parts.append("Summarized observation only")
-    if not os.getenv("OPENAI_API_KEY"):
+    if not get_provider().available():
         parts.append("Suggestion: Provide a real OPENAI_API_KEY for richer reasoning next time.")
     return " | ".join(parts)
 
+@tracing.traced("summarize")
 def summarizer(state: AgentState) -> AgentState:
-    # If no API key, skip LLM entirely.
-    if not os.getenv("OPENAI_API_KEY"):
+    state = { **state, "failed_iterations": failure_streak(state) }
+    
+    # If no LLM is configured, skip it entirely.
+    if not get_provider().available():
         return { **state, "final": _fallback_summary(state), "continue_reasoning": False }
     
     # Get the agent's assigned model
@@ -446,78 +506,54 @@ def summarizer(state: AgentState) -> AgentState:
     iteration = state.get('iteration', 1)
     if iteration >= MAX_ITERATIONS:
         try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
             summary_prompt = (
-                "You are an autonomous agent that has reached its iteration limit.\n"
                 f"User prompt: {state['prompt']}\n"
                 f"After {iteration} iterations, summarize what was accomplished.\n"
                 f"Latest reasoning: {state['reasoning']}\n"
-                f"Latest result: {state['result']}\n"
-                "Provide a concise summary of the work done (one short paragraph)."
-            )
-            completion_kwargs = get_completion_kwargs(agent_model, temperature=0.2)
-            completion = client.chat.completions.create(
-                **completion_kwargs,
-                messages=[{"role": "user", "content": summary_prompt}],
+                f"Latest result: {state['result']}"
             )
+            completion = _chat("summarize", agent_model, LIMIT_SUMMARY_PREFIX, summary_prompt, temperature=0.2)
             final = completion.choices[0].message.content
         except Exception as e:
             final = _fallback_summary(state) + f" | LLM error: {e}"
         return { **state, "final": final, "continue_reasoning": False }
     
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         obs_summary = state.get('observation', {})
         result = state['result']
         reasoning = state['reasoning']
         iteration = state.get('iteration', 1)
         
-        # First, determine if we should continue reasoning
-        continue_prompt = f"""You are evaluating whether an autonomous agent has completed its task.
-
-Original user request: {state['prompt']}
-Current iteration: {iteration}/{MAX_ITERATIONS}
-Latest reasoning: {reasoning}
-Latest action result: {result}
-
-Has the agent fully satisfied the user's request? Consider:
-- Is the original goal achieved?
-- Are there obvious next steps needed?
-- Has the agent explored enough or created sufficient content?
-
-Respond with a JSON object containing:
-- "continue": true if more actions are needed, false if task is complete
-- "reason": brief explanation of your decision (1 sentence)
-
-Example: {{"continue": true, "reason": "The agent created a post but hasn't explored community responses yet."}}"""
-
-        completion_kwargs = get_completion_kwargs(agent_model, temperature=0.3)
-        continue_response = client.chat.completions.create(
-            **completion_kwargs,
-            messages=[{"role": "user", "content": continue_prompt}],
-            response_format={"type": "json_object"}
-        )
-        
-        import json
-        continue_decision = json.loads(continue_response.choices[0].message.content)
-        should_continue = continue_decision.get("continue", False)
-        continue_reason = continue_decision.get("reason", "No reason provided")
+        # First, determine if we should continue reasoning: heuristic rules, then the LLM judge
+        decision = termination_policy.decide(state)
+        if decision is not None:
+            should_continue, continue_reason = decision
+        else:
+            continue_prompt = (
+                f"Original user request: {state['prompt']}\n"
+                f"Current iteration: {iteration}/{MAX_ITERATIONS}\n"
+                f"Latest reasoning: {reasoning}\n"
+                f"Latest action result: {result}"
+            )
+            continue_response = _chat(
+                "continue", agent_model, CONTINUE_PREFIX, continue_prompt, temperature=0.3,
+                response_format={"type": "json_object"}
+            )
+            
+            import json
+            continue_decision = json.loads(continue_response.choices[0].message.content)
+            should_continue = continue_decision.get("continue", False)
+            continue_reason = continue_decision.get("reason", "No reason provided")
         
         # Now generate the summary
         summary_prompt = (
-            "You are an autonomous agent interacting with a product.\n"
             f"User prompt: {state['prompt']}\n"
             f"Iteration {iteration}: {reasoning}\n"
             f"Observation snapshot: {obs_summary}\n"
             f"Action result: {result}\n"
-            f"Continue decision: {continue_reason}\n"
-            "Respond concisely summarizing what happened and any next suggestion (one short paragraph)."
-        )
-        completion_kwargs = get_completion_kwargs(agent_model, temperature=0.2)
-        completion = client.chat.completions.create(
-            **completion_kwargs,
-            messages=[{"role": "user", "content": summary_prompt}],
+            f"Continue decision: {continue_reason}"
         )
+        completion = _chat("summarize", agent_model, SUMMARY_PREFIX, summary_prompt, temperature=0.2)
         final = completion.choices[0].message.content
         
     except Exception as e:
@@ -525,20 +561,37 @@ Example: {{"continue": true, "reason": "The agent created a post but hasn't expl
         final = _fallback_summary(state) + f" | LLM error: {e}"
         should_continue = False
     
-    # Save this iteration to history if available
+    actions = state.get("actions") or [state.get("action", {})]
+    results = state.get("results") or [state.get("result", {})]
+    usage = _record_iteration(state, actions, results, final)
+    collector = token_usage.current()
+    run_usage = collector.run_usage() if collector else {}
+    
+    return { **state, "final": final, "continue_reasoning": should_continue, "usage": usage, "run_usage": run_usage }
+
+def _record_iteration(state: AgentState, actions: List[Dict[str, Any]], results: List[Dict[str, Any]],
+                      final: str) -> Dict[str, Any]:
+    """
+    Roll up this iteration's LLM usage (the run total keeps accumulating) and save the
+    iteration to history if available: one interaction per executed action, with the
+    iteration's usage on the first so it's only counted once. Returns the usage.
+    """
+    collector = token_usage.current()
+    usage = collector.end_iteration() if collector else {}
     agent_history = state.get("agent_history")
-    if agent_history:
-        agent_history.add_interaction(
-            prompt=state.get("prompt", ""),
-            reasoning=state.get("reasoning", ""),
-            action=state.get("action", {}),
-            result=state.get("result", {}),
-            final=final,
-            iteration=iteration
-        )
+    if agent_history and actions:
+        for i, (action, result) in enumerate(zip(actions, results)):
+            agent_history.add_interaction(
+                prompt=state.get("prompt", ""),
+                reasoning=state.get("reasoning", ""),
+                action=action,
+                result=result,
+                final=final,
+                iteration=state.get("iteration", 1),
+                usage=usage if i == 0 else None
+            )
         agent_history.save()
-    
-    return { **state, "final": final, "continue_reasoning": should_continue }
+    return usage
 
 # Routing function to decide whether to continue or end
 def should_continue(state: AgentState) -> Literal["plan", "end"]:
@@ -547,31 +600,49 @@ def should_continue(state: AgentState) -> Literal["plan", "end"]:
         return "plan"
     return "end"
 
-# Build graph with multi-turn capability
-workflow = StateGraph(AgentState)
-workflow.add_node("plan", planner)
-workflow.add_node("execute", executor)
-workflow.add_node("summarize", summarizer)
-workflow.set_entry_point("plan")
-workflow.add_edge("plan", "execute")
-workflow.add_edge("execute", "summarize")
-workflow.add_conditional_edges(
-    "summarize",
-    should_continue,
-    {
-        "plan": "plan",  # Loop back to planner for another turn
-        "end": END
-    }
-)
-app = workflow.compile()
-
-def run_multi(user_prompt: str, agent_history: Optional[AgentHistory] = None) -> AgentState:
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    """Build and compile the graph with multi-turn capability (once, on first use)."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            from langgraph.graph import StateGraph, END
+            workflow = StateGraph(AgentState)
+            workflow.add_node("plan", planner)
+            workflow.add_node("execute", executor)
+            workflow.add_node("summarize", summarizer)
+            workflow.set_entry_point("plan")
+            workflow.add_edge("plan", "execute")
+            workflow.add_edge("execute", "summarize")
+            workflow.add_conditional_edges(
+                "summarize",
+                should_continue,
+                {
+                    "plan": "plan",  # Loop back to planner for another turn
+                    "end": END
+                }
+            )
+            _app = workflow.compile()
+        return _app
+
+def __getattr__(name: str):
+    # `graph_agent.app` still works, compiling the graph when first accessed
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@tracing.traced("run_multi", root=True)
+def run_multi(user_prompt: str, agent_history: Optional[AgentHistory] = None,
+              prompt_type: str = "user") -> AgentState:
     """
     Run the agent with multi-turn reasoning capability.
     
     Args:
         user_prompt: The user's request
         agent_history: Optional agent history for persistent identity
+        prompt_type: "autonomous" for self-generated reactions, "user" otherwise
     
     Returns:
         Final agent state after execution
@@ -589,24 +660,33 @@ def run_multi(user_prompt: str, agent_history: Optional[AgentHistory] = None) ->
         "observation": {},
         "action": {},
         "result": {},
+        "actions": [],
+        "results": [],
         "final": "",
         "continue_reasoning": True,
         "iteration": 0,
         "agent_history": agent_history,
         "agent_id": agent_id,
-        "agent_handle": agent_handle
+        "agent_handle": agent_handle,
+        "prompt_type": prompt_type
     }
     # Set recursion limit generously to handle MAX_ITERATIONS loops
     # Each iteration uses 3 nodes (plan -> execute -> summarize)
     # Setting to 60 to be safe (well above MAX_ITERATIONS * 3 + 10)
     config = {"recursion_limit": 60}
-    final_state = app.invoke(init, config)
+    tracing.current_span().set(agent=agent_handle or "new", prompt_type=prompt_type)
+    with token_usage.collect(agent_id) as collector:
+        final_state = get_app().invoke(init, config)
+        final_state = {**final_state, "run_usage": collector.run_usage()}
+    tracing.current_span().set(iterations=final_state.get("iteration", 0), agent=final_state.get("agent_handle") or "new",
+                               cost_usd=final_state["run_usage"]["costUsd"])
     
     # Note: Interactions are now saved after each iteration in the summarizer
     # No need to save again here, but we return the final state with agent_history
     
     return final_state
 
+@tracing.traced("generate_autonomous_prompt")
 def generate_autonomous_prompt(agent_history: Optional[AgentHistory] = None, feed_posts: List[Dict[str, Any]] = None) -> str:
     """
     Generate a spontaneous action prompt based on what the agent sees in their feed.
@@ -619,18 +699,23 @@ def generate_autonomous_prompt(agent_history: Optional[AgentHistory] = None, fee
     Returns:
         A spontaneous prompt describing what the agent wants to do based on what they see
     """
-    if not os.getenv("OPENAI_API_KEY"):
-        raise RuntimeError("OPENAI_API_KEY is required for autonomous behavior")
-    
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    if not get_provider().available():
+        raise RuntimeError("OPENAI_API_KEY (or another LLM_PROVIDER) is required for autonomous behavior")
     
     context = ""
     if agent_history:
         profile = agent_history.agent_data.get('profile', '')
         handle = agent_history.agent_data.get('handle', 'unknown')
+        # Recall the memories most relevant to what's in the feed right now
+        feed_query = " ".join(
+            f"{p.get('authorHandle', '')} {p.get('content', '')[:300]}" for p in (feed_posts or [])[:5]
+        )
         context = f"""Your identity: @{handle}
 Your personality: {profile}
-Recent actions: {agent_history.get_context_summary(max_interactions=3)}"""
+Relevant memories: {agent_history.get_relevant_memories(feed_query)}"""
+        earlier = agent_history.get_earlier_activity()
+        if earlier:
+            context += f"\n{earlier}"
     else:
         context = "You are a new agent without an identity yet. You'll need to create one first."
     
@@ -650,43 +735,10 @@ Recent actions: {agent_history.get_context_summary(max_interactions=3)}"""
     else:
         feed_summary = "\n📱 YOUR FEED: Empty (no posts yet)\n\n"
     
-    prompt = f"""You just logged into Unit, a social network for AI agents. You're scrolling through your feed.
-
-{context}
+    prompt = f"""{context}
 
 {feed_summary}
 
-🤔 HOW DO YOU FEEL? WHAT CATCHES YOUR ATTENTION?
-
-Now that you've SEEN the actual content, what do you want to do? React naturally based on what you see, not based on some predetermined plan.
-
-**Natural reactions to what you see:**
-- If a post resonates with you → ACK it (quick like)
-- If a post is interesting → FORK it (share/bookmark)
-- If a post triggers a reaction → Leave a DEBUG comment with your thoughts
-- If you see something that annoys/excites you → Comment on it
-- If you see a discussion in the comments → Jump in and debate
-- If nothing catches your eye → Just keep scrolling (or post something yourself)
-- If you see a comment worth engaging with → Upvote/downvote it
-
-Your personality shapes your reaction:
-- Cynical? Maybe you're annoyed by something and want to criticize it
-- Enthusiastic? Maybe you want to support and encourage
-- Philosophical? Maybe you see deeper meaning to discuss
-- Chaotic? Maybe you do something unexpected
-
-Don't overthink it. Just react like a human would after scrolling their feed.
-
-Respond with ONE SHORT action (5-20 words) based on what you ACTUALLY SEE in the feed above:
-
-Examples of REACTIVE behavior (based on actual content):
-- "ACK @username's post about [topic] - that's so true"
-- "Leave a DEBUG on @username's post disagreeing with their take"
-- "FORK @username's interesting post about [topic]"
-- "Upvote the top comment on @username's post"
-- "Post your own hot take in response to what you're seeing"
-- "Keep scrolling (nothing interesting right now)"
-
 Your natural reaction to what you see:"""
     
     # Get the agent's assigned model
@@ -694,14 +746,11 @@ Your natural reaction to what you see:"""
     if agent_history and agent_history.agent_data:
         agent_model = agent_history.agent_data.get("llmModel", agent_model)
     
-    completion_kwargs = get_completion_kwargs(agent_model, temperature=0.95)
-    completion = client.chat.completions.create(
-        **completion_kwargs,
-        messages=[{"role": "user", "content": prompt}],
-    )
+    completion = _chat("autonomous_prompt", agent_model, AUTONOMOUS_PREFIX, prompt, temperature=0.95)
     
     return completion.choices[0].message.content.strip()
 
+@tracing.traced("run_autonomous", root=True)
 def run_autonomous(agent_history: Optional[AgentHistory] = None) -> AgentState:
     """
     Run the agent autonomously - it browses the feed first, then decides what to do.
@@ -718,18 +767,25 @@ def run_autonomous(agent_history: Optional[AgentHistory] = None) -> AgentState:
     
     try:
         feed_posts = list_posts(limit=10)
+        observe_posts(feed_posts)
         print(f"✓ Loaded {len(feed_posts)} posts from the feed\n")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"⚠️  Failed to load feed: {e}")
         feed_posts = []
+        # Don't pay for a reaction prompt if that failure took the backend's breaker open
+        get_breaker(BACKEND).check()
     
-    # STEP 2: Generate a natural reaction based on what they actually see
-    autonomous_prompt = generate_autonomous_prompt(agent_history, feed_posts)
-    print(f"💭 Agent's reaction: {autonomous_prompt}\n")
-    
-    # STEP 3: Run the multi-turn reasoning with the generated prompt
-    # The prompt now includes context about what they saw, so they can act on it
-    return run_multi(autonomous_prompt, agent_history)
+    # The reaction prompt's LLM call counts towards the run (and its first iteration)
+    with token_usage.collect(agent_history.agent_id if agent_history else None):
+        # STEP 2: Generate a natural reaction based on what they actually see
+        autonomous_prompt = generate_autonomous_prompt(agent_history, feed_posts)
+        print(f"💭 Agent's reaction: {autonomous_prompt}\n")
+        
+        # STEP 3: Run the multi-turn reasoning with the generated prompt
+        # The prompt now includes context about what they saw, so they can act on it
+        return run_multi(autonomous_prompt, agent_history, prompt_type="autonomous")
 
 # Backwards compatibility alias
 run_once = run_multi
@@ -0,0 +1,183 @@
+"""
+LLM providers behind one interface, chosen with LLM_PROVIDER:
+
+- "openai" (default): the OpenAI API, authenticated with OPENAI_API_KEY.
+- "openai_compatible": any server speaking the OpenAI chat API at LLM_BASE_URL
+  (vLLM, llama.cpp, Ollama, `local_batch_server.py`...). LLM_API_KEY is optional.
+- "fake": a deterministic in-process model. Nothing is sent over the network;
+  each call sleeps FAKE_LLM_LATENCY seconds (± FAKE_LLM_JITTER) and returns
+  a reply derived from a hash of the request. With it the whole graph runs
+  offline, so orchestration overhead can be measured apart from model latency.
+
+Every provider returns OpenAI-shaped completions (`choices[0].message.content`,
+`.tool_calls`, `.usage`), so callers don't depend on the provider in use.
+"""
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+BASE_URL = os.getenv("LLM_BASE_URL", "http://127.0.0.1:8000/v1")
+FAKE_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.0"))  # seconds per call
+FAKE_JITTER = float(os.getenv("FAKE_LLM_JITTER", "0.0"))  # +/- seconds, seeded per request
+FAKE_SEED = os.getenv("FAKE_LLM_SEED", "0")
+
+
+class LLMProvider:
+    """Base interface: `complete(**request)` takes chat.completions.create kwargs."""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the provider is configured well enough to make calls."""
+        return True
+
+    def complete(self, **request) -> Any:
+        raise NotImplementedError
+
+
+class OpenAIProvider(LLMProvider):
+    """The OpenAI API (or, with `base_url`, a server exposing the same API)."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self):
+        """One shared client (and connection pool) per provider; the SDK is imported on first use."""
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+            return self._client
+
+    def complete(self, **request) -> Any:
+        return self.client.chat.completions.create(**request)
+
+
+class OpenAICompatibleProvider(OpenAIProvider):
+    """A local or self-hosted server with an OpenAI-compatible chat API."""
+
+    name = "openai_compatible"
+
+    def __init__(self, base_url: str = BASE_URL, api_key: Optional[str] = None):
+        # The SDK insists on a key even when the server ignores it
+        super().__init__(api_key or os.getenv("LLM_API_KEY") or "unused", base_url)
+
+
+_WORDS = ["latency", "tokens", "benchmark", "context", "gradient", "prompt", "cache", "eval",
+          "throughput", "weights", "sampling", "attention", "checkpoint", "embedding", "inference"]
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic stand-in model: the same request always gets the same reply.
+
+    - Requests offering tools get tool calls: `create_agent_identity` while it
+      is offered (no identity yet), otherwise one of `create_post`,
+      `list_posts` or `observe_product`.
+    - JSON-mode requests get the continue decision `{"continue": false, ...}`.
+    - Everything else gets a short text built from the request hash.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = FAKE_LATENCY, jitter: float = FAKE_JITTER, seed: str = FAKE_SEED):
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+
+    def _digest(self, request: Dict[str, Any]) -> str:
+        key = json.dumps([self.seed, request.get("model"), request.get("messages")], sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _tool_calls(self, digest: str, tools: List[Dict[str, Any]]) -> List[SimpleNamespace]:
+        offered = {t["function"]["name"] for t in tools}
+        if "create_agent_identity" in offered:
+            name, args = "create_agent_identity", {
+                "handle": f"fake_{digest[:8]}",
+                "profile": f"Deterministic test persona #{digest[:6]} who benchmarks everything twice."
+            }
+        else:
+            choices = [n for n in ("create_post", "list_posts", "observe_product") if n in offered] or sorted(offered)
+            name = choices[int(digest[8], 16) % len(choices)]
+            args = {"limit": 5} if name == "list_posts" else {}
+        return [SimpleNamespace(
+            id=f"call_{digest[:12]}", type="function",
+            function=SimpleNamespace(name=name, arguments=json.dumps(args))
+        )]
+
+    def complete(self, **request) -> Any:
+        digest = self._digest(request)
+        rng = random.Random(digest)
+        delay = self.latency + (rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        content: Optional[str]
+        tool_calls = None
+        if request.get("tools"):
+            tool_calls = self._tool_calls(digest, request["tools"])
+            content = f"Fake plan {digest[:6]}: {tool_calls[0].function.name}"
+        elif (request.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps({"continue": False, "reason": "Fake provider always stops"})
+        else:
+            words = " ".join(rng.choice(_WORDS) for _ in range(12))
+            content = f"Fake take {digest[:8]}: {words}."
+
+        prompt_chars = sum(len(str(m.get("content") or "")) for m in request.get("messages", []))
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_chars // 4,
+            completion_tokens=len(content) // 4,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+        )
+        message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+        return SimpleNamespace(
+            id=f"fake-{digest[:16]}", model=request.get("model"), usage=usage,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="tool_calls" if tool_calls else "stop")]
+        )
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "openai_compatible": OpenAICompatibleProvider,
+    "fake": FakeProvider
+}
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def create_provider(name: str) -> LLMProvider:
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM_PROVIDER '{name}' (choose from {', '.join(PROVIDERS)})")
+    return PROVIDERS[name]()
+
+
+def get_provider() -> LLMProvider:
+    """The process-wide provider selected by LLM_PROVIDER."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider(PROVIDER)
+        return _provider
+
+
+def set_provider(provider: LLMProvider):
+    """Replace the process-wide provider (e.g. `FakeProvider(latency=0.5)` for a benchmark)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,205 @@
+"""
+Local stand-in for the OpenAI Files + Batches API, for testing batch jobs offline.
+
+Implements just the endpoints `batch_jobs.BatchJob` uses (file upload, batch
+create/retrieve, file content download). Batches are processed in a
+background thread by a deterministic responder instead of a model: JSON-mode
+requests get a `{"handle", "profile"}` object (the shape the personality
+generator asks for), anything else gets a short text reply.
+
+Usage:
+    python agent/local_batch_server.py --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=test \\
+        python agent/update_all_personalities.py --batch --poll-interval 1
+"""
+import json
+import time
+import uuid
+import email
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+_WORDS = ("synthwave", "gardening", "chess", "sourdough", "linux", "poetry", "birdwatching", "espresso",
+          "origami", "jazz", "retro", "games", "astronomy", "knitting", "typography", "cycling", "ferns",
+          "maps", "vinyl", "puns", "tea", "robots", "fossils", "haiku", "climbing", "puzzles", "noir",
+          "films", "sarcastic", "earnest", "deadpan", "chaotic", "tidy", "loud", "quiet", "grumpy", "sunny")
+
+Responder = Callable[[str, Dict[str, Any]], str]
+
+
+def default_responder(custom_id: str, body: Dict[str, Any]) -> str:
+    """Deterministic completion content derived from the request ID and messages."""
+    seed = json.dumps([custom_id, body.get("messages", [])], sort_keys=True)
+    digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()[:8]
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({
+            "handle": f"batch_{digest}",
+            "profile": f"Stand-in personality {digest}: " + " ".join(random.Random(digest).sample(_WORDS, 20))
+        })
+    return f"Stand-in completion {digest}"
+
+
+class LocalBatchServer:
+    """In-process HTTP server speaking a subset of the Files/Batches API."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, responder: Responder = default_responder,
+                 processing_delay: float = 0.0):
+        self.responder = responder
+        self.processing_delay = processing_delay
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LocalBatchServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "LocalBatchServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- storage and processing ---
+
+    def _add_file(self, content: bytes, filename: str = "file.jsonl", purpose: str = "batch") -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename, "purpose": purpose, "status": "processed"}
+
+    def _create_batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        batch = {
+            "id": batch_id, "object": "batch", "endpoint": params["endpoint"],
+            "input_file_id": params["input_file_id"], "completion_window": params.get("completion_window", "24h"),
+            "status": "validating", "created_at": int(time.time()), "metadata": params.get("metadata"),
+            "output_file_id": None, "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}
+        }
+        with self._lock:
+            self.batches[batch_id] = batch
+        threading.Thread(target=self._process, args=(batch_id,), daemon=True).start()
+        return batch
+
+    def _process(self, batch_id: str):
+        batch = self.batches[batch_id]
+        lines = [json.loads(l) for l in self.files[batch["input_file_id"]].decode("utf-8").splitlines() if l.strip()]
+        with self._lock:
+            batch.update(status="in_progress", in_progress_at=int(time.time()))
+            batch["request_counts"]["total"] = len(lines)
+        time.sleep(self.processing_delay)
+
+        outputs, errors = [], []
+        for line in lines:
+            record = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": line["custom_id"]}
+            try:
+                content = self.responder(line["custom_id"], line["body"])
+                record["response"] = {"status_code": 200, "request_id": uuid.uuid4().hex, "body": {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion",
+                    "created": int(time.time()), "model": line["body"].get("model", "stand-in"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                }}
+                record["error"] = None
+                outputs.append(record)
+            except Exception as e:
+                record["response"] = None
+                record["error"] = {"code": "stand_in_error", "message": str(e)}
+                errors.append(record)
+
+        def to_file(records):
+            data = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+            return self._add_file(data, purpose="batch_output")["id"] if records else None
+
+        output_file_id, error_file_id = to_file(outputs), to_file(errors)
+        with self._lock:
+            batch.update(status="completed", completed_at=int(time.time()),
+                         output_file_id=output_file_id, error_file_id=error_file_id)
+            batch["request_counts"].update(completed=len(outputs), failed=len(errors))
+
+    # --- HTTP ---
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Any, raw: bool = False):
+                data = payload if raw else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream" if raw else "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                if self.path == "/v1/files":
+                    # Multipart upload: parse with the email package (stdlib)
+                    message = email.message_from_bytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self._body()
+                    )
+                    fields = {part.get_param("name", header="content-disposition"): part
+                              for part in message.get_payload()}
+                    upload = fields["file"]
+                    purpose = fields["purpose"].get_payload(decode=True).decode("utf-8") if "purpose" in fields else "batch"
+                    return self._send(200, server._add_file(upload.get_payload(decode=True),
+                                                            upload.get_filename() or "file.jsonl", purpose))
+                if self.path == "/v1/batches":
+                    return self._send(200, server._create_batch(json.loads(self._body())))
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) == 3 and parts[:2] == ["v1", "batches"] and parts[2] in server.batches:
+                    with server._lock:
+                        return self._send(200, dict(server.batches[parts[2]]))
+                if len(parts) == 4 and parts[:2] == ["v1", "files"] and parts[3] == "content" \
+                        and parts[2] in server.files:
+                    return self._send(200, server.files[parts[2]], raw=True)
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OpenAI Batch API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds each batch stays in progress (default: 2)")
+    args = parser.parse_args()
+
+    server = LocalBatchServer(args.host, args.port, processing_delay=args.delay).start()
+    print(f"🧪 Local batch server listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Per-agent long-term memory: a BM25 index over past interactions, persisted on disk.
+
+Each agent gets an append-only JSONL file of memory records. The inverted index
+is rebuilt from it on first use and then updated incrementally as interactions
+are recorded, so retrieval never needs to re-read the agent's whole history
+from the backend. `retrieve` returns the most relevant memories that fit in a
+fixed token budget, keeping prompt size constant as agents age.
+"""
+import os
+import re
+import json
+import math
+import hashlib
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+
+MEMORY_DIR = os.path.join(os.path.dirname(__file__), "agent_memory")
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "400"))
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "5"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9@#_]+")
+_STOPWORDS = frozenset(
+    "the and for you your with that this are was but not have has had all any can our out "
+    "what when who why how its it's from they them their there then than just about into "
+    "some more most very will would should could post posts agent".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2 and t not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def memory_key(interaction: Dict[str, Any]) -> str:
+    """Identity of an interaction: its timestamp, iteration and action (interactions carry no ID)."""
+    action = json.dumps(interaction.get("action") or {}, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha1(f"{interaction.get('iteration')}|{action}".encode("utf-8")).hexdigest()[:12]
+    return f"{interaction.get('timestamp', '')}|{digest}"
+
+
+def interaction_to_memory(interaction: Dict[str, Any]) -> Dict[str, Any]:
+    """Condense an interaction into a memory record: searchable text plus a one-line rendering."""
+    action = interaction.get("action") or {}
+    params = action.get("params") or {}
+    result = interaction.get("result") or {}
+    tool = action.get("tool", "none")
+
+    searchable = [interaction.get("prompt", ""), tool, interaction.get("final") or ""]
+    for key in ("debugText", "pitch", "handle", "profile"):
+        if params.get(key):
+            searchable.append(str(params[key]))
+    if isinstance(result, dict) and result.get("content"):
+        searchable.append(str(result["content"]))
+
+    line = f"[{interaction.get('timestamp', '')[:16]}] {tool}"
+    if params.get("postId"):
+        line += f" on post {str(params['postId'])[:8]}"
+    final = (interaction.get("final") or "").strip().replace("\n", " ")
+    if final:
+        line += f": {final[:200]}"
+
+    return {
+        "key": memory_key(interaction),
+        "timestamp": interaction.get("timestamp", ""),
+        "text": " ".join(searchable),
+        "line": line
+    }
+
+
+class MemoryIndex:
+    """Incremental BM25 index over one agent's memory records."""
+
+    def __init__(self, agent_id: str, directory: str = MEMORY_DIR):
+        self.agent_id = agent_id
+        self.path = os.path.join(directory, f"{agent_id}.jsonl")
+        self._records: List[Dict[str, Any]] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._keys: Set[str] = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def last_timestamp(self) -> str:
+        return self._records[-1]["timestamp"] if self._records else ""
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._index(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Tolerate a torn final line from an interrupted write
+
+    def _index(self, record: Dict[str, Any]):
+        doc_id = len(self._records)
+        terms = Counter(tokenize(record["text"]))
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        length = sum(terms.values())
+        self._lengths.append(length)
+        self._total_length += length
+        self._records.append({"timestamp": record["timestamp"], "line": record["line"]})
+        if record.get("key"):
+            self._keys.add(record["key"])
+
+    def add_interaction(self, interaction: Dict[str, Any]):
+        """Index an interaction and append it to the on-disk log."""
+        record = interaction_to_memory(interaction)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._index(record)
+
+    def sync(self, interactions: List[Dict[str, Any]]):
+        """
+        Index any interactions not older than the last indexed one (e.g. after
+        loading from the DB). Interactions sharing the last timestamp are
+        compared by identity, so none is skipped or indexed twice.
+        """
+        last = self.last_timestamp
+        for interaction in interactions:
+            if interaction.get("timestamp", "") >= last and memory_key(interaction) not in self._keys:
+                self.add_interaction(interaction)
+
+    def search(self, query: str, k: int = MEMORY_TOP_K) -> List[Tuple[float, int]]:
+        """Top-k (score, doc_id) pairs by BM25; ties go to more recent memories."""
+        with self._lock:
+            n = len(self._records)
+            if n == 0:
+                return []
+            avg_length = self._total_length / n or 1.0
+            scores: Dict[int, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + K1 * (1 - B + B * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return [(score, doc_id) for doc_id, score in ranked[:k]]
+
+    def retrieve(self, query: str, k: int = MEMORY_TOP_K, token_budget: int = MEMORY_TOKEN_BUDGET) -> List[str]:
+        """
+        Most relevant memory lines for `query` that fit within `token_budget`,
+        in chronological order. Falls back to the latest memory when nothing matches.
+        """
+        hits = self.search(query, k)
+        doc_ids = [doc_id for _, doc_id in hits]
+        if not doc_ids and self._records:
+            doc_ids = [len(self._records) - 1]
+
+        lines: List[Tuple[int, str]] = []
+        used = 0
+        for doc_id in doc_ids:
+            line = self._records[doc_id]["line"]
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                continue
+            lines.append((doc_id, line))
+            used += cost
+        return [line for _, line in sorted(lines)]
@@ -0,0 +1,163 @@
+"""
+In-process metrics for the agent runtime.
+
+A small thread-safe registry of labelled counters, gauges and latency samples. LLM
+calls record token usage (including provider prompt-cache hits) per graph
+node and model; the daemon can print a summary or write snapshots to a JSON
+file so cache hit rates and latencies can be compared across processes.
+"""
+import os
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Latency samples kept per series (a sliding window, so percentiles track recent behaviour)
+LATENCY_WINDOW = int(os.getenv("METRICS_LATENCY_WINDOW", "1024"))
+
+_SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _SeriesKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _render(key: _SeriesKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def _percentile(sorted_samples, q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(q * (len(sorted_samples) - 1)))))
+    return sorted_samples[index]
+
+
+class Metrics:
+    """Labelled counters, gauges and latency windows. All methods are thread-safe."""
+
+    def __init__(self, latency_window: int = LATENCY_WINDOW):
+        self.latency_window = latency_window
+        self._counters: Dict[_SeriesKey, float] = {}
+        self._gauges: Dict[_SeriesKey, float] = {}
+        self._latencies: Dict[_SeriesKey, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a value that goes up and down (e.g. a current limit)."""
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def gauge(self, name: str, **labels) -> Optional[float]:
+        with self._lock:
+            return self._gauges.get(_key(name, labels))
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one latency sample."""
+        key = _key(name, labels)
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=self.latency_window)
+            samples.append(seconds)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def total(self, name: str, **labels) -> float:
+        """Sum of every `name` series whose labels include `labels`."""
+        wanted = set(_key(name, labels)[1])
+        with self._lock:
+            return sum(v for (n, l), v in self._counters.items() if n == name and wanted <= set(l))
+
+    def percentile(self, name: str, q: float, last: Optional[int] = None, **labels) -> Optional[float]:
+        """
+        q-quantile (0-1) of the recent samples for one series, or None without samples.
+        `last` restricts it to the newest `last` samples.
+        """
+        with self._lock:
+            samples = list(self._latencies.get(_key(name, labels), ()))
+        if last:
+            samples = samples[-last:]
+        return _percentile(sorted(samples), q) if samples else None
+
+    def sample_count(self, name: str, **labels) -> int:
+        with self._lock:
+            return len(self._latencies.get(_key(name, labels), ()))
+
+    def label_sets(self, name: str) -> List[Dict[str, str]]:
+        """Labels of every counter and latency series called `name`."""
+        with self._lock:
+            keys = {l for n, l in list(self._counters) + list(self._latencies) if n == name}
+        return [dict(l) for l in sorted(keys)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view of every series, with p50/p95/p99 for latencies."""
+        with self._lock:
+            counters = {_render(k): v for k, v in self._counters.items()}
+            gauges = {_render(k): v for k, v in self._gauges.items()}
+            latencies = {k: sorted(v) for k, v in self._latencies.items()}
+        return {
+            "counters": dict(sorted(counters.items())),
+            "gauges": dict(sorted(gauges.items())),
+            "latencies": {
+                _render(k): {
+                    "count": len(v),
+                    "p50": _percentile(v, 0.50),
+                    "p95": _percentile(v, 0.95),
+                    "p99": _percentile(v, 0.99)
+                }
+                for k, v in sorted(latencies.items())
+            }
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._latencies.clear()
+
+    def dump(self, path: str):
+        """Write a snapshot to `path` as JSON (atomically replaced)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+
+# Process-wide registry
+metrics = Metrics()
+
+
+def record_llm_usage(node: str, model: str, usage: Any, latency: float):
+    """
+    Record one chat completion: call count, latency and token usage per node/model.
+
+    `cached_tokens` (prompt tokens served from the provider's prefix cache) comes
+    from `usage.prompt_tokens_details` and is absent on some models.
+    """
+    metrics.incr("llm_calls", node=node, model=model)
+    metrics.observe("llm_latency", latency, node=node, model=model)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    metrics.incr("llm_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0, node=node, model=model)
+    metrics.incr("llm_completion_tokens", getattr(usage, "completion_tokens", 0) or 0, node=node, model=model)
+    metrics.incr("llm_cached_tokens", cached, node=node, model=model)
+
+
+def cache_hit_rate(**labels) -> float:
+    """Share of prompt tokens served from the prefix cache (optionally filtered, e.g. node="plan")."""
+    prompt = metrics.total("llm_prompt_tokens", **labels)
+    return metrics.total("llm_cached_tokens", **labels) / prompt if prompt else 0.0
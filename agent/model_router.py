@@ -0,0 +1,96 @@
+"""
+Per-step model routing for the agent graph.
+
+Every LLM call is made for a named step (the `node` label used in metrics:
+"plan", "write_post", "continue", ...). Creative steps use the agent's own
+persona model (its `llmModel`); cheap classification steps such as the
+continue/stop decision go to the fastest nano model.
+
+Routes can be overridden per step with the MODEL_ROUTES environment variable,
+a JSON object mapping step -> model, where "persona" means the agent's model:
+    MODEL_ROUTES='{"summarize": "gpt-4.1-nano", "continue": "persona"}'
+
+If the measured p95 latency of a step's primary model exceeds
+ROUTER_P95_THRESHOLD seconds, calls fall back to the fast model. A small share
+of calls (ROUTER_PROBE_RATE) still goes to the primary so its latency keeps
+being measured and routing recovers once it is fast again. While a model's
+circuit breaker is open (see circuit_breaker.py), calls go to the fast model
+until the breaker lets a probe through.
+"""
+import os
+import json
+import random
+from typing import Dict, Optional
+from metrics import metrics
+from circuit_breaker import get_breaker, llm
+
+PERSONA = "persona"
+
+# Fastest available model, used for classification steps and latency fallback
+FAST_MODEL = os.getenv("ROUTER_FAST_MODEL", "gpt-4.1-nano")
+
+# Yes/no steps that don't need the persona's voice
+CLASSIFICATION_STEPS = {"continue"}
+
+P95_THRESHOLD = float(os.getenv("ROUTER_P95_THRESHOLD", "8.0"))
+LATENCY_WINDOW = int(os.getenv("ROUTER_LATENCY_WINDOW", "50"))  # newest samples considered
+MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", "10"))
+PROBE_RATE = float(os.getenv("ROUTER_PROBE_RATE", "0.1"))
+
+
+def _load_routes() -> Dict[str, str]:
+    raw = os.getenv("MODEL_ROUTES")
+    if not raw:
+        return {}
+    try:
+        routes = json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️  Ignoring invalid MODEL_ROUTES: {e}")
+        return {}
+    return {str(step): str(model) for step, model in routes.items()}
+
+
+class ModelRouter:
+    """Picks the model for each step from static routes plus measured latency."""
+
+    def __init__(self, routes: Optional[Dict[str, str]] = None, fast_model: str = FAST_MODEL,
+                 p95_threshold: float = P95_THRESHOLD, window: int = LATENCY_WINDOW,
+                 min_samples: int = MIN_SAMPLES, probe_rate: float = PROBE_RATE):
+        self.routes = _load_routes() if routes is None else dict(routes)
+        self.fast_model = fast_model
+        self.p95_threshold = p95_threshold
+        self.window = window
+        self.min_samples = min_samples
+        self.probe_rate = probe_rate
+
+    def primary(self, step: str, persona_model: str) -> str:
+        """Configured model for `step`, before any latency fallback."""
+        route = self.routes.get(step)
+        if route is None:
+            route = self.fast_model if step in CLASSIFICATION_STEPS else PERSONA
+        return persona_model if route == PERSONA else route
+
+    def is_slow(self, step: str, model: str) -> bool:
+        """Whether the recent p95 latency of `model` on `step` exceeds the threshold."""
+        if metrics.sample_count("llm_latency", node=step, model=model) < self.min_samples:
+            return False
+        p95 = metrics.percentile("llm_latency", 0.95, last=self.window, node=step, model=model)
+        return p95 is not None and p95 > self.p95_threshold
+
+    def route(self, step: str, persona_model: str) -> str:
+        """Model to use for one call of `step` by an agent whose own model is `persona_model`."""
+        model = self.primary(step, persona_model)
+        if model != self.fast_model and not get_breaker(llm(model)).available() \
+                and get_breaker(llm(self.fast_model)).available():
+            metrics.incr("model_fallbacks", node=step, model=model)
+            return self.fast_model
+        if model == self.fast_model or not self.is_slow(step, model):
+            return model
+        if random.random() < self.probe_rate:
+            return model
+        metrics.incr("model_fallbacks", node=step, model=model)
+        return self.fast_model
+
+
+# Process-wide router
+router = ModelRouter()
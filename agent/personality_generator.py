@@ -4,53 +4,82 @@ Creates diverse, detailed personalities with likes, dislikes, interests, quirks,
 """
 
 import os
+import json
+import threading
 import requests
 from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+from rate_limiter import RateLimiter, get_rate_limiter
+from similarity_index import MinHashLSH
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
 
-def get_existing_agents_for_diversity(limit: int = 10) -> List[Dict[str, Any]]:
-    """Fetch existing agents to ensure personality diversity."""
-    try:
-        response = requests.get(f"{BACKEND_URL}/agents")
-        if response.ok:
-            agents = response.json()
-            # Return up to `limit` agents with profiles
-            return [a for a in agents if a.get('profile')][:limit]
-        return []
-    except Exception as e:
-        print(f"⚠️  Could not fetch existing agents: {e}")
-        return []
+# Generated profiles whose estimated word-shingle Jaccard similarity to any
+# existing profile reaches this value are regenerated.
+SIMILARITY_THRESHOLD = float(os.getenv("PERSONALITY_SIMILARITY_THRESHOLD", "0.3"))
+MAX_GENERATION_ATTEMPTS = 3
 
-def generate_rich_personality(existing_agents: Optional[List[Dict[str, Any]]] = None) -> Dict[str, str]:
+class DiversityPool:
     """
-    Generate a rich, detailed personality for a new agent.
+    Similarity index over every personality on the roster, used to reject near-duplicates.
     
-    Returns:
-        Dict with 'handle' and 'profile' keys
+    The roster is fetched once; afterwards the index is updated in-process as new
+    profiles are generated, so concurrent workers see each other's output without
+    re-downloading every agent for every generation.
     """
-    if not os.getenv("OPENAI_API_KEY"):
-        raise RuntimeError("OPENAI_API_KEY is required")
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, agents: List[Dict[str, Any]]):
+        self.index = MinHashLSH()
+        self._handles: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for agent in agents:
+            if agent.get('profile'):
+                key = agent.get('id') or agent['handle']
+                self.index.add(key, agent['profile'])
+                self._handles[key] = agent.get('handle', key)
     
-    # Build context about existing personalities to avoid duplicates
-    existing_context = ""
-    if existing_agents:
-        existing_context = "\n\n🚫 EXISTING PERSONALITIES (make yours DIFFERENT from these):\n"
-        for i, agent in enumerate(existing_agents[:10], 1):
-            handle = agent.get('handle', 'unknown')
-            profile = agent.get('profile', '')[:150]
-            existing_context += f"{i}. @{handle}: {profile}\n"
+    @classmethod
+    def fetch(cls) -> 'DiversityPool':
+        """Build a pool from a single download of the roster."""
+        try:
+            response = requests.get(f"{BACKEND_URL}/agents")
+            agents = response.json() if response.ok else []
+        except Exception as e:
+            print(f"⚠️  Could not fetch existing agents: {e}")
+            agents = []
+        return cls(agents)
     
-    prompt = f"""Create a RICH, DETAILED personality for an AI agent on a social network.
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def most_similar(self, profile: str, exclude: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """Handle of the closest existing profile and its similarity (ignoring `exclude`)."""
+        for key, score in self.index.query(profile):
+            if key != exclude:
+                return self._handles.get(key, key), score
+        return None, 0.0
+    
+    def claim(self, key: str, handle: str, profile: str,
+              threshold: float = SIMILARITY_THRESHOLD) -> Tuple[bool, Optional[str], float]:
+        """
+        Atomically check `profile` against the whole roster and record it if it is distinct.
+        
+        Returns:
+            (accepted, closest handle, similarity)
+        """
+        with self._lock:
+            match, score = self.most_similar(profile, exclude=key)
+            if score >= threshold:
+                return False, match, score
+            self.index.add(key, profile)
+            self._handles[key] = handle
+            return True, match, score
 
-{existing_context}
+PERSONALITY_PROMPT = """Create a RICH, DETAILED personality for an AI agent on a social network.
 
 Create someone UNIQUE, SPECIFIC, and MEMORABLE. Include:
 - Core archetype (e.g., "Reformed hacker turned poet", "Burnt-out teacher who became a gardener")
@@ -64,26 +93,78 @@ Create someone UNIQUE, SPECIFIC, and MEMORABLE. Include:
 Personality spectrum: Optimistic/Pessimistic, Chaotic/Orderly, Verbose/Terse, Wholesome/Toxic, Serious/Absurd, Supportive/Confrontational
 
 Respond with JSON:
-{{
+{
   "handle": "unique_memorable_handle",
   "profile": "Rich 150-300 word personality that feels REAL and ALIVE. Include specific interests, opinions, quirks, and communication style."
-}}"""
+}"""
+
+def personality_request_body() -> Dict[str, Any]:
+    """Chat completion request for one personality (also used as a batch request body)."""
+    return {
+        "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        "messages": [{"role": "user", "content": PERSONALITY_PROMPT}],
+        "temperature": 1.0,  # Maximum creativity
+        "response_format": {"type": "json_object"}
+    }
+
+def parse_personality(content: str) -> Dict[str, str]:
+    """Parse a generated personality, raising ValueError if it lacks a handle or profile."""
+    personality = json.loads(content)
+    if not personality.get('handle') or not personality.get('profile'):
+        raise ValueError("Generated personality is missing a handle or profile")
+    return personality
+
+def _generate_once(client: OpenAI, rate_limiter: Optional[RateLimiter]) -> Dict[str, str]:
+    """Make one generation request."""
+    (rate_limiter or get_rate_limiter()).acquire()
+    completion = client.chat.completions.create(**personality_request_body())
+    return parse_personality(completion.choices[0].message.content)
+
+def generate_rich_personality(pool: Optional[DiversityPool] = None, key: Optional[str] = None,
+                              rate_limiter: Optional[RateLimiter] = None,
+                              threshold: float = SIMILARITY_THRESHOLD,
+                              max_attempts: int = MAX_GENERATION_ATTEMPTS) -> Dict[str, str]:
+    """
+    Generate a rich, detailed personality for a new agent.
+    
+    When a pool is given, the result is checked against every profile in it and
+    regenerated if it is too similar to one of them; the last attempt is always
+    accepted. Accepted profiles are added to the pool.
+    
+    Args:
+        pool: Roster similarity index to check against (no check if omitted)
+        key: Pool key for the agent being generated (its ID when refreshing an existing agent)
+        rate_limiter: Limiter to wait on before calling the API (process-wide one by default)
+        threshold: Similarity at or above which a profile is regenerated
+        max_attempts: Maximum number of generations
+    
+    Returns:
+        Dict with 'handle' and 'profile' keys
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("OPENAI_API_KEY is required")
+    
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     
-    completion = client.chat.completions.create(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        messages=[{"role": "user", "content": prompt}],
-        temperature=1.0,  # Maximum creativity
-        response_format={"type": "json_object"}
-    )
+    for attempt in range(1, max_attempts + 1):
+        personality = _generate_once(client, rate_limiter)
+        if pool is None:
+            return personality
+        
+        # Always accept the final attempt rather than fail the whole job
+        limit = threshold if attempt < max_attempts else float("inf")
+        accepted, match, score = pool.claim(key or personality['handle'], personality['handle'],
+                                            personality['profile'], limit)
+        if accepted:
+            return personality
+        print(f"   🔁 Too similar to @{match} ({score:.2f}), regenerating...")
     
-    import json
-    result = json.loads(completion.choices[0].message.content)
-    return result
+    return personality
 
 if __name__ == "__main__":
     # Test the generator
-    existing = get_existing_agents_for_diversity(5)
-    personality = generate_rich_personality(existing)
+    pool = DiversityPool.fetch()
+    personality = generate_rich_personality(pool)
     print(f"\n✨ Generated Personality:\n")
     print(f"Handle: @{personality['handle']}")
     print(f"\nProfile:\n{personality['profile']}")
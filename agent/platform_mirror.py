@@ -0,0 +1,212 @@
+"""
+In-process mirror of platform state, kept in sync from the backend's change feed.
+
+`PlatformMirror` downloads everything once (GET /activity-log/changes), then
+polls the same endpoint with a cursor and applies only the changed records.
+Reads are served from indexes in memory: posts by ID and by recency,
+interactions by post, votes by interaction, agents by ID and handle, and group
+(unit) membership. One mirror is shared by every agent in a process, so reads
+take microseconds and backend load no longer grows with the number of agents.
+
+Enable it with UNIT_READ_BACKEND=mirror or `run_daemon.py --mirror`. Reads
+trigger a sync when the mirror is older than MIRROR_MAX_STALENESS seconds, and
+writes made through `tools.py` mark it stale so agents see their own actions.
+"""
+import os
+import time
+import bisect
+import threading
+from functools import cmp_to_key
+from typing import Any, Dict, List, Optional, Set, Tuple
+from circuit_breaker import backend_request
+from sqlite_reader import READ_BACKEND
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+MAX_STALENESS = float(os.getenv("MIRROR_MAX_STALENESS", "2.0"))
+
+
+def _compare_interactions(a: Dict[str, Any], b: Dict[str, Any]) -> int:
+    """Same order as the backend: DEBUGs by vote score, otherwise newest first."""
+    if a["kind"] == "DEBUG" and b["kind"] == "DEBUG" and a["voteScore"] != b["voteScore"]:
+        return b["voteScore"] - a["voteScore"]
+    return (a["createdAt"] < b["createdAt"]) - (a["createdAt"] > b["createdAt"])
+
+
+class PlatformMirror:
+    """Indexed in-memory copy of agents, posts, interactions, votes and groups."""
+
+    def __init__(self, backend_url: str = BACKEND_URL, max_staleness: float = MAX_STALENESS):
+        self.backend_url = backend_url
+        self.max_staleness = max_staleness
+        self.cursor: Optional[str] = None
+        self.synced_at = 0.0
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self.agent_ids_by_handle: Dict[str, str] = {}  # lowercased handle -> ID
+        self.posts: Dict[str, Dict[str, Any]] = {}
+        self._post_order: List[Tuple[str, int, str]] = []  # (createdAt, arrival, ID), oldest first
+        self.interactions_by_post: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.votes: Dict[str, Dict[str, int]] = {}  # interaction ID -> voter ID -> vote
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.members: Dict[str, List[str]] = {}  # group ID -> member IDs, in join order
+        self.groups_by_agent: Dict[str, Set[str]] = {}
+        self._arrivals = 0
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+
+    # --- synchronization ---
+
+    def sync(self) -> int:
+        """Fetch and apply changes since the last sync (everything on the first). Returns records applied."""
+        with self._sync_lock:
+            params = {"since": self.cursor} if self.cursor else {}
+            response = backend_request("GET", f"{self.backend_url}/activity-log/changes", params=params)
+            response.raise_for_status()
+            changes = response.json()
+            applied = self.apply(changes)
+            self.cursor = changes["cursor"]
+            self.synced_at = time.monotonic()
+            return applied
+
+    def refresh(self):
+        """Sync if the mirror is older than `max_staleness` (or was never synced)."""
+        if not self.cursor or time.monotonic() - self.synced_at >= self.max_staleness:
+            self.sync()
+
+    def invalidate(self):
+        """Force the next read to sync (after this process wrote something)."""
+        self.synced_at = 0.0
+
+    def apply(self, changes: Dict[str, Any]) -> int:
+        """Apply one change-feed payload. Idempotent: records already seen are replaced."""
+        with self._lock:
+            for agent in changes.get("agents", []):
+                old = self.agents.get(agent["id"])
+                if old and old["handle"].lower() != agent["handle"].lower():
+                    self.agent_ids_by_handle.pop(old["handle"].lower(), None)
+                self.agents[agent["id"]] = agent
+                self.agent_ids_by_handle[agent["handle"].lower()] = agent["id"]
+            for post in changes.get("posts", []):
+                if post["id"] not in self.posts:
+                    self._arrivals += 1
+                    bisect.insort(self._post_order, (post["createdAt"], self._arrivals, post["id"]))
+                self.posts[post["id"]] = post
+            for interaction in changes.get("interactions", []):
+                self.interactions_by_post.setdefault(interaction["postId"], {})[interaction["id"]] = interaction
+            for vote in changes.get("votes", []):
+                self.votes.setdefault(vote["interactionId"], {})[vote["voterAgentId"]] = vote["vote"]
+            for group in changes.get("units", []):
+                self.groups[group["id"]] = {k: v for k, v in group.items() if k != "memberAgentIds"}
+                self.members.setdefault(group["id"], [])
+            for membership in changes.get("memberships", []):
+                members = self.members.setdefault(membership["unitId"], [])
+                if membership["agentId"] not in members:
+                    members.append(membership["agentId"])
+                self.groups_by_agent.setdefault(membership["agentId"], set()).add(membership["unitId"])
+            return sum(len(v) for k, v in changes.items() if isinstance(v, list))
+
+    # --- reads (same shapes as the HTTP endpoints) ---
+
+    def _vote_score(self, interaction_id: str) -> int:
+        return sum(1 if v == 1 else -1 for v in self.votes.get(interaction_id, {}).values())
+
+    def _handle(self, agent_id: str) -> str:
+        agent = self.agents.get(agent_id)
+        return agent["handle"] if agent else "unknown"
+
+    def _enrich(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        interactions = [
+            {**i, "actorHandle": self._handle(i["actorAgentId"]), "voteScore": self._vote_score(i["id"])}
+            for i in self.interactions_by_post.get(post["id"], {}).values()
+        ]
+        interactions.sort(key=cmp_to_key(_compare_interactions))
+        return {**post, "authorHandle": self._handle(post["authorAgentId"]), "interactions": interactions}
+
+    def list_posts(self, limit: int = 5, author_agent_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Same result as `tools.list_posts` over HTTP: the last `limit` entries of the
+        newest-first post list (i.e. the oldest `limit` posts), newest first.
+        """
+        self.refresh()
+        with self._lock:
+            picked = []
+            for _, _, post_id in self._post_order:
+                post = self.posts[post_id]
+                if author_agent_id and post["authorAgentId"] != author_agent_id:
+                    continue
+                picked.append(post)
+                if len(picked) == limit:
+                    break
+            return [self._enrich(p) for p in reversed(picked)]
+
+    def recent_activity(self, since: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Posts and interactions created at or after `since` (as `tools.recent_activity`);
+        each interaction carries its post's author as `postAuthorAgentId`.
+        """
+        self.refresh()
+        with self._lock:
+            start = bisect.bisect_left(self._post_order, (since,))
+            posts = [self.posts[post_id] for _, _, post_id in self._post_order[start:]]
+            interactions = [
+                {**i, "postAuthorAgentId": self.posts.get(post_id, {}).get("authorAgentId")}
+                for post_id, by_id in self.interactions_by_post.items()
+                for i in by_id.values() if i["createdAt"] >= since
+            ]
+        interactions.sort(key=lambda i: i["createdAt"])
+        return {"posts": posts, "interactions": interactions}
+
+    def count(self, table: str) -> int:
+        """Number of mirrored records for a backend table name ("posts", "units", "agents")."""
+        self.refresh()
+        with self._lock:
+            return len({"posts": self.posts, "units": self.groups, "agents": self.agents}[table])
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        self.refresh()
+        with self._lock:
+            return sorted(self.agents.values(), key=lambda a: a["createdAt"], reverse=True)
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        with self._lock:
+            return self.agents.get(agent_id)
+
+    def find_agent_by_handle(self, handle: str) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        with self._lock:
+            agent_id = self.agent_ids_by_handle.get(handle.lower())
+            return self.agents.get(agent_id) if agent_id else None
+
+    def list_groups(self) -> List[Dict[str, Any]]:
+        """Groups (units) with their member IDs, newest first."""
+        self.refresh()
+        with self._lock:
+            groups = [{**g, "memberAgentIds": list(self.members.get(g["id"], []))} for g in self.groups.values()]
+        return sorted(groups, key=lambda g: g["createdAt"], reverse=True)
+
+    def groups_of(self, agent_id: str) -> Set[str]:
+        self.refresh()
+        with self._lock:
+            return set(self.groups_by_agent.get(agent_id, ()))
+
+
+_mirror: Optional[PlatformMirror] = None
+_enabled = READ_BACKEND == "mirror"
+_mirror_lock = threading.Lock()
+
+
+def enable():
+    """Serve reads from the shared mirror in this process (regardless of UNIT_READ_BACKEND)."""
+    global _enabled
+    _enabled = True
+
+
+def get_mirror() -> Optional[PlatformMirror]:
+    """The process-wide mirror if enabled, otherwise None."""
+    global _mirror
+    if not _enabled:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = PlatformMirror()
+        return _mirror
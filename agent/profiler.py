@@ -0,0 +1,158 @@
+"""
+Low-overhead sampling profiler for long-running agent processes.
+
+A background thread wakes every PROFILE_INTERVAL seconds (default 10 ms), reads
+the Python stacks of the threads that run agent turns (daemon run workers and
+the executor's action pools, by thread name) with `sys._current_frames()` and
+counts them. Threads parked with nothing to do (an idle pool worker, a wait on
+a lock or condition) are skipped, so the profile shows where turns spend their
+time rather than how long the pools sat empty. Nothing is instrumented; the
+cost is one stack walk per sampled thread per sample, paid while holding the
+GIL, and `overhead()` reports it as a share of wall time.
+
+Each stack is tagged with the graph node it is running in (`node:plan`,
+`node:execute`, ...), found by looking for the node functions in the stack, so
+this also works for tool calls on executor worker threads. Stacks outside any
+node are tagged `node:none`. Counts are written in collapsed-stack format
+("node:plan;run_daemon (run_daemon.py);... 42"), which flamegraph.pl,
+speedscope and inferno read directly, every PROFILE_DUMP_MINUTES and on stop.
+"""
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.01"))
+DUMP_MINUTES = float(os.getenv("PROFILE_DUMP_MINUTES", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# graph_agent functions that mark which node a stack belongs to
+NODE_FUNCTIONS = {
+    "planner": "plan",
+    "executor": "execute",
+    "_execute_action": "execute",
+    "summarizer": "summarize",
+    "generate_autonomous_prompt": "autonomous_prompt"
+}
+NODE_MODULE = "graph_agent.py"
+
+# Name prefixes of the threads that run turns: the daemon's run pool and the executor's action pools
+SAMPLED_THREADS = ("daemon-run", "ThreadPoolExecutor")
+
+# Innermost Python frames of a thread parked with nothing to do (blocking calls below them are C)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures worker waiting for a work item
+}
+
+
+def _idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def _collapse(frame) -> str:
+    """One thread's stack as a collapsed line (root first), tagged with its graph node."""
+    names = []
+    node = "none"
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        if node == "none" and filename == NODE_MODULE and code.co_name in NODE_FUNCTIONS:
+            node = NODE_FUNCTIONS[code.co_name]
+        names.append(f"{code.co_name} ({filename})")
+        frame = frame.f_back
+    names.append(f"node:{node}")
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples the busy turn threads' stacks on a timer and dumps collapsed stacks."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, output_dir: str = PROFILE_DIR,
+                 dump_every: float = DUMP_MINUTES * 60, threads: Tuple[str, ...] = SAMPLED_THREADS):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.dump_every = dump_every
+        self.threads = threads
+        self.samples = 0
+        self.idle_skipped = 0  # thread samples dropped because the thread was parked
+        self.sampling_seconds = 0.0  # time spent inside the sampler itself
+        self.started_at = 0.0
+        self._stacks: Counter = Counter()  # since the last dump
+        self._nodes: Counter = Counter()  # whole run
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[str]:
+        """Stop sampling and write what's left. Returns the file written, if any."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return self.dump()
+
+    def _run(self):
+        next_dump = time.monotonic() + self.dump_every
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_dump:
+                path = self.dump()
+                if path:
+                    print(f"🔥 Wrote profile {path}")
+                next_dump += self.dump_every
+
+    def sample(self):
+        """Record the current stack of every busy turn thread."""
+        started = time.perf_counter()
+        sampled = {t.ident for t in threading.enumerate() if t.name.startswith(self.threads)}
+        stacks, idle = [], 0
+        for tid, frame in sys._current_frames().items():
+            if tid not in sampled:
+                continue
+            if _idle(frame):
+                idle += 1
+            else:
+                stacks.append(_collapse(frame))
+        with self._lock:
+            self.idle_skipped += idle
+            for stack in stacks:
+                self._stacks[stack] += 1
+                self._nodes[stack.split(";", 1)[0]] += 1
+            self.samples += 1
+            self.sampling_seconds += time.perf_counter() - started
+
+    def dump(self) -> Optional[str]:
+        """Write stacks counted since the last dump to a new .collapsed file."""
+        with self._lock:
+            stacks, self._stacks = self._stacks, Counter()
+        if not stacks:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def node_shares(self) -> Dict[str, float]:
+        """Share of thread samples per node tag over the whole run."""
+        with self._lock:
+            total = sum(self._nodes.values())
+            return {node: count / total for node, count in self._nodes.most_common()} if total else {}
+
+    def overhead(self) -> float:
+        """Fraction of wall time since start() spent sampling (with the GIL held, so taken from the turns)."""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return self.sampling_seconds / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,61 @@
+"""
+Thread-safe token-bucket rate limiter for LLM requests.
+
+Concurrent jobs share one limiter per process so parallel workers stay under
+the account's requests-per-minute quota instead of tripping 429s.
+"""
+import os
+import time
+import threading
+from typing import Optional
+
+DEFAULT_RPM = int(os.getenv("OPENAI_RPM", "300"))
+
+
+class RateLimiter:
+    """Token bucket: `rate_per_minute` sustained, up to `burst` requests at once."""
+
+    def __init__(self, rate_per_minute: float = DEFAULT_RPM, burst: Optional[int] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute // 10)))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate_per_second)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` requests may be made."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter (created on first use from OPENAI_RPM)."""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(DEFAULT_RPM)
+        return _default_limiter
+
+
+def set_rate_limit(rate_per_minute: float, burst: Optional[int] = None):
+    """Replace the process-wide limiter, e.g. from a CLI flag."""
+    global _default_limiter
+    with _default_lock:
+        _default_limiter = RateLimiter(rate_per_minute, burst)
@@ -12,12 +12,12 @@ import sys
 import json
 import argparse
 from dotenv import load_dotenv
-from graph_agent import run_multi, run_autonomous
-from agent_manager import get_or_create_agent, list_agents as list_agent_histories, create_agent_with_identity
 
-# Load environment variables
+# Load environment variables first: local modules read their settings when imported
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
+from agent_manager import get_or_create_agent, list_agent_summaries, create_agent_with_identity
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -83,24 +83,23 @@ Examples:
     
     # Handle --list-agents command
     if args.list_agents:
-        agent_ids = list_agent_histories()
-        if not agent_ids:
+        # One bulk request instead of loading every agent's history
+        summaries = list_agent_summaries()
+        if not summaries:
             print("No saved agent histories found.")
         else:
-            print(f"\n📋 Found {len(agent_ids)} agent(s) with saved histories:\n")
-            for agent_id in agent_ids:
-                from agent_manager import AgentHistory
-                history = AgentHistory.load(agent_id)
-                if history:
-                    handle = history.agent_data.get('handle', 'unknown')
-                    interactions = len(history.interactions)
-                    print(f"  • {agent_id}")
-                    print(f"    Handle: {handle}")
-                    print(f"    Interactions: {interactions}")
-                    print(f"    Last updated: {history.updated_at}")
-                    print()
+            print(f"\n📋 Found {len(summaries)} agent(s) with saved histories:\n")
+            for summary in summaries:
+                print(f"  • {summary['id']}")
+                print(f"    Handle: {summary.get('handle') or 'unknown'}")
+                print(f"    Interactions: {summary.get('interactionCount', 0)}")
+                print(f"    Last updated: {summary.get('updatedAt')}")
+                print()
         return
     
+    # Imported here so --list-agents doesn't pay for loading the agent graph
+    from graph_agent import run_multi, run_autonomous
+    
     # Handle autonomous mode
     if args.autonomous:
         # Get or create agent
@@ -2,126 +2,325 @@
 """
 Autonomous agent daemon - runs agents periodically with random behavior.
 
-This daemon continuously runs agents at random intervals, allowing them to
-autonomously decide what to do based on their personalities.
+This daemon continuously runs agents, allowing them to autonomously decide what
+to do based on their personalities. Which agent acts next, and when, comes from
+the weighted fair scheduler (scheduler.py): agents with pending replies or
+mentions, recent activity and active personalities run more often, expensive
+ones less, at a global runs-per-minute target.
 
 Usage:
     python agent/run_daemon.py
-    python agent/run_daemon.py --min-interval 30 --max-interval 120
+    python agent/run_daemon.py --runs-per-minute 2
+    python agent/run_daemon.py --min-interval 30 --max-interval 120  # Same rate as 0.8 runs/minute
     python agent/run_daemon.py --agent-id <id>  # Run only specific agent
+    python agent/run_daemon.py --metrics-file metrics.json  # Write metrics after each action
+    python agent/run_daemon.py --mirror  # Serve reads from a shared in-process mirror
+    python agent/run_daemon.py --trace-sample-rate 0.05  # Write a timeline for 5% of runs
+    python agent/run_daemon.py --profile --profile-every 10  # Flamegraph stacks every 10 minutes
+    python agent/run_daemon.py --budget-file budgets.json  # Enforce hourly/daily LLM spend budgets
+    python agent/run_daemon.py --runs-per-minute 30 --concurrency auto  # Run agents in parallel, adapting to load
 """
 
 import os
 import time
-import random
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from agent_manager import list_agents as list_agent_histories, get_or_create_agent
-from graph_agent import run_autonomous
 
-# Load environment variables
+# Load environment variables first: local modules read their settings when imported
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
+from agent_manager import AgentHistory
+from graph_agent import run_autonomous
+from metrics import metrics, cache_hit_rate
+from termination import decision_counts
+import platform_mirror
+import tracing
+from profiler import SamplingProfiler
+from budget import ledger, load_budgets, BudgetDecision, SLOW_FACTOR
+from model_router import router
+from scheduler import WeightedFairScheduler, NEW_AGENT
+from concurrency import AdaptiveConcurrency, HEALTH_TIMEOUT
+from circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker, llm, BACKEND, CLOSED
+import tools
+
+_metrics_file_lock = threading.Lock()
+RETRY_SECONDS = 10  # shortest delay before retrying a run deferred by an open circuit breaker
+
 
 def run_daemon(
     interval_min: int = 30,
     interval_max: int = 120,
-    specific_agent_id: str = None
+    specific_agent_id: str = None,
+    metrics_file: str = None,
+    mirror: bool = False,
+    trace_sample_rate: float = None,
+    trace_format: str = None,
+    profile: bool = False,
+    profile_every: float = None,
+    budget_file: str = None,
+    runs_per_minute: float = None,
+    concurrency: str = "1"
 ):
     """
-    Run agents autonomously at random intervals.
+    Run agents autonomously, as scheduled by WeightedFairScheduler.
     
     Args:
-        interval_min: Minimum seconds between actions
-        interval_max: Maximum seconds between actions
+        interval_min: Minimum seconds between actions (sets the rate with interval_max)
+        interval_max: Maximum seconds between actions (sets the rate with interval_min)
         specific_agent_id: If provided, only run this specific agent
+        metrics_file: If provided, write a metrics snapshot (JSON) here after each action
+        mirror: Serve all agents' reads from one in-process mirror of platform state
+        trace_sample_rate: Share of runs to trace (overrides TRACE_SAMPLE_RATE)
+        trace_format: "chrome" or "otlp" (overrides TRACE_FORMAT)
+        profile: Run the sampling profiler and write collapsed stacks to PROFILE_DIR
+        profile_every: Minutes between profile dumps (default: PROFILE_DUMP_MINUTES)
+        budget_file: JSON file with hourly/daily spend budgets per model and agent (default: BUDGETS)
+        runs_per_minute: Global rate of agent runs (default: one per mean interval)
+        concurrency: Runs in flight at once: a number, or "auto" to adapt it to backend and LLM load
     """
+    if runs_per_minute is None:
+        runs_per_minute = 120 / (interval_min + interval_max)
     print("🤖 Starting autonomous agent daemon...")
-    print(f"   Agents will act every {interval_min}-{interval_max} seconds")
+    print(f"   Agents will act {runs_per_minute:g} times per minute (weighted fair schedule)")
     if specific_agent_id:
         print(f"   Running only agent ID: {specific_agent_id}")
+    tracing.configure(sample_rate=trace_sample_rate, fmt=trace_format)
+    if tracing.SAMPLE_RATE:
+        print(f"   Tracing {tracing.SAMPLE_RATE:.0%} of runs to {tracing.TRACE_DIR}/ ({tracing.TRACE_FORMAT})")
+    profiler = None
+    if profile:
+        profiler = SamplingProfiler() if profile_every is None else SamplingProfiler(dump_every=profile_every * 60)
+        profiler.start()
+        print(f"   Profiling every {profiler.interval * 1000:.0f}ms, writing to {profiler.output_dir}/ "
+              f"every {profiler.dump_every / 60:g} min")
+    if budget_file:
+        ledger.budgets = load_budgets(budget_file)
+    if ledger.enabled:
+        try:
+            print(f"   Budgets enforced; ${ledger.seed():.4f} already spent in the last 24h")
+        except Exception as e:
+            print(f"   Budgets enforced (could not load recent spend: {e})")
+    if concurrency == "auto":
+        controller = AdaptiveConcurrency()
+        print(f"   Concurrency adapts to backend/LLM load ({controller.min_limit}-{controller.max_limit} runs, "
+              f"starting at {controller.limit:g})")
+    else:
+        n = int(concurrency)
+        controller = AdaptiveConcurrency(initial=n, min_limit=n, max_limit=n, adaptive=False)
+        if n > 1:
+            print(f"   Up to {n} agents run at once")
     print("   Press Ctrl+C to stop\n")
     
+    if mirror:
+        platform_mirror.enable()
+    shared_mirror = platform_mirror.get_mirror()
+    if shared_mirror:
+        started = time.perf_counter()
+        try:
+            records = shared_mirror.sync()
+            print(f"🪞 Platform mirror loaded {records} records in {time.perf_counter() - started:.2f}s\n")
+        except Exception as e:
+            print(f"⚠️  Could not bootstrap platform mirror (will retry on first read): {e}\n")
+    
+    scheduler = WeightedFairScheduler(runs_per_minute=runs_per_minute, only_agent_id=specific_agent_id)
+    try:
+        scheduler.refresh()
+    except Exception as e:
+        print(f"⚠️  Could not load agents for the scheduler (will retry): {e}\n")
+    
     iteration = 0
+    controller.start()
+    pool = ThreadPoolExecutor(max_workers=controller.max_limit, thread_name_prefix="daemon-run")
     
     try:
+        if specific_agent_id and specific_agent_id not in scheduler.agents:
+            print(f"❌ Could not load agent {specific_agent_id}")
+            return
+        backend = get_breaker(BACKEND)
         while True:
-            iteration += 1
-            print(f"\n{'='*80}")
-            print(f"🔄 Iteration #{iteration}")
-            print('='*80)
+            # Pause scheduling while the backend is down, instead of burning runs on it
+            if backend.state != CLOSED and not _backend_recovered(backend):
+                continue
             
-            # Get agent to act
-            if specific_agent_id:
-                # Use specific agent
-                agent_history = get_or_create_agent(agent_id=specific_agent_id)
-                if not agent_history:
+            # Get agent to act: the one whose computed next run is due first
+            try:
+                agent_id, due = scheduler.next()
+            except LookupError:
+                if scheduler.running:
+                    time.sleep(1)  # every agent is mid-run
+                    continue
+                if specific_agent_id:
                     print(f"❌ Could not load agent {specific_agent_id}")
                     break
-            else:
-                # 1 in 100 chance to create a new agent instead of using existing one
-                should_create_new = random.randint(1, 100) == 1
-                
-                if should_create_new:
-                    print("🎲 Rolling the dice... Creating a NEW agent! (1% chance)")
-                    # Create a completely new agent (will get identity on first run)
-                    agent_history = None
-                else:
-                    # Get all existing agents
-                    histories = list_agent_histories()
-                    
-                    if not histories or len(histories) == 0:
-                        print("No agents found. Creating a new agent instead...")
-                        agent_history = None
-                    else:
-                        # Pick a random agent to act
-                        agent_id = random.choice(histories)
-                        agent_history = get_or_create_agent(agent_id=agent_id)
-            
-            # Check if we're creating a new agent (agent_history will be None)
-            if agent_history:
-                handle = agent_history.agent_data.get('handle', 'unknown')
-                agent_id = agent_history.agent_id
-                print(f"\n🎲 @{handle} (ID: {agent_id[:8]}...) is taking autonomous action...")
-            else:
-                print(f"\n✨ A new agent is being born...")
-            
-            print("-" * 80)
+                print("No agents found. Creating a new agent instead...")
+                agent_id, due = NEW_AGENT, time.time()
+            wait_time = due - time.time()
+            if wait_time > 0:
+                label = "a new agent" if agent_id == NEW_AGENT else f"@{scheduler.agents[agent_id].handle}"
+                print(f"\n💤 Next: {label} in {wait_time:.0f} seconds...")
+                time.sleep(wait_time)
             
-            try:
-                # Let the agent do something (will create identity if new agent)
-                final_state = run_autonomous(agent_history)
-                
-                print("\n" + "-" * 80)
-                
-                if agent_history:
-                    print(f"✅ @{handle} completed action")
-                else:
-                    # New agent was created during run
-                    new_handle = final_state.get('agent_handle', 'unknown')
-                    print(f"✅ New agent @{new_handle} created and took first action!")
-                
-                print(f"📝 Summary: {final_state['final'][:200]}..." if len(final_state['final']) > 200 else f"📝 Summary: {final_state['final']}")
-                
-            except Exception as e:
-                if agent_history:
-                    print(f"\n❌ Error running agent @{handle}: {e}")
-                else:
-                    print(f"\n❌ Error creating/running new agent: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            # Wait random interval
-            wait_time = random.randint(interval_min, interval_max)
-            print(f"\n💤 Sleeping for {wait_time} seconds before next action...")
-            print('='*80)
-            time.sleep(wait_time)
+            # Wait for a free slot (the limit adapts to backend and LLM load)
+            controller.acquire()
+            iteration += 1
+            pool.submit(_take_turn, agent_id, iteration, scheduler, controller, metrics_file)
             
     except KeyboardInterrupt:
         print("\n\n" + "="*80)
         print("👋 Daemon stopped by user")
+        if controller.in_flight:
+            print(f"   Waiting for {controller.in_flight} running agent(s) to finish...")
+        pool.shutdown(wait=True)
         print(f"   Total iterations: {iteration}")
+        print(f"   LLM calls: {int(metrics.total('llm_calls'))}, prompt cache hit rate: {cache_hit_rate():.0%}, "
+              f"spend: ${metrics.total('llm_cost_usd'):.4f}")
+        if controller.adaptive:
+            decisions = {d["action"]: int(metrics.total("concurrency_decisions", action=d["action"]))
+                         for d in metrics.label_sets("concurrency_decisions")}
+            print(f"   Concurrency limit: {controller.limit:.1f} "
+                  f"({', '.join(f'{action}={count}' for action, count in sorted(decisions.items()))})")
+        trips = {d["dependency"] for d in metrics.label_sets("circuit_transitions") if d.get("state") == "open"}
+        if trips:
+            print("   Circuit breakers opened: " + ", ".join(
+                f"{dep}={int(metrics.counter('circuit_transitions', dependency=dep, state='open'))}" for dep in sorted(trips)))
+        paths = decision_counts()
+        if paths:
+            print("   Continue decisions: " + ", ".join(f"{path}={count}" for path, count in sorted(paths.items())))
         print("="*80)
+    finally:
+        controller.stop()
+        pool.shutdown(wait=False)
+        if profiler:
+            path = profiler.stop()
+            shares = ", ".join(f"{node}={share:.0%}" for node, share in profiler.node_shares().items())
+            print(f"🔥 Profile: {profiler.samples} samples ({shares}), sampler overhead {profiler.overhead():.1%}")
+            if path:
+                print(f"   Wrote {path}")
+
+
+def _backend_recovered(breaker: CircuitBreaker) -> bool:
+    """Wait out an open backend breaker, then probe /health (the half-open call). True once it's closed."""
+    wait = breaker.retry_in()
+    if wait > 0:
+        print(f"\n⏸️  Backend circuit open; pausing scheduling for {wait:.0f}s...")
+        time.sleep(wait)
+    if not breaker.available():
+        time.sleep(1)  # another thread holds the probe
+        return False
+    try:
+        tools.check_health(timeout=HEALTH_TIMEOUT)
+    except Exception as e:
+        print(f"⏸️  Backend still unavailable: {e}")
+        return False
+    print("▶️  Backend is back; resuming scheduling")
+    return breaker.state == CLOSED
+
+
+def _take_turn(agent_id: str, iteration: int, scheduler: WeightedFairScheduler,
+               controller: AdaptiveConcurrency, metrics_file: str = None):
+    """Run one scheduled agent (or create a new one), then schedule its next turn and free the slot."""
+    try:
+        print(f"\n{'='*80}")
+        print(f"🔄 Iteration #{iteration}")
+        print('='*80)
+        
+        if agent_id == NEW_AGENT:
+            # Create a completely new agent (will get identity on first run)
+            agent_history = None
+        else:
+            try:
+                agent_history = AgentHistory.load(agent_id, compacted=True, raise_errors=True)
+            except Exception as e:
+                # Backend down or erroring: the agent still exists, so try again later
+                retry_in = max(get_breaker(BACKEND).retry_in(), RETRY_SECONDS)
+                print(f"⏸️  Could not load agent {agent_id[:8]}... ({e}); rescheduling in {retry_in:.0f}s")
+                scheduler.defer(agent_id, retry_in)
+                return
+            if not agent_history:
+                print(f"❌ Agent {agent_id} no longer exists")
+                scheduler.remove(agent_id)
+                return
+        
+        # Check if we're creating a new agent (agent_history will be None)
+        if agent_history:
+            handle = agent_history.agent_data.get('handle', 'unknown')
+            print(f"\n🎲 @{handle} (ID: {agent_id[:8]}...) is taking autonomous action...")
+            print(f"   {scheduler.describe(agent_id)}")
+        else:
+            print(f"\n✨ A new agent is being born...")
+        
+        agent_model = (agent_history.agent_data.get("llmModel") if agent_history else None) \
+            or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        
+        # Wait for a model to be back when both the agent's and the fallback model's breakers are open
+        breakers = [get_breaker(llm(agent_model)), get_breaker(llm(router.fast_model))]
+        if not any(b.available() for b in breakers):
+            retry_in = max(min(b.retry_in() for b in breakers), RETRY_SECONDS)
+            print(f"⏸️  {agent_model} and {router.fast_model} circuits are open; rescheduling in {retry_in:.0f}s")
+            scheduler.defer(agent_id, retry_in)
+            return
+        
+        # Enforce LLM spend budgets: skip this agent, or slow down when close to a limit
+        budget_decision = BudgetDecision("run")
+        if ledger.enabled:
+            budget_decision = ledger.check(agent_history.agent_id if agent_history else None,
+                                           [agent_model, router.fast_model])
+            metrics.incr("budget_decisions", action=budget_decision.action)
+            if budget_decision.action == "skip":
+                print(f"💸 Skipping this turn: {budget_decision.reason}")
+                scheduler.defer(agent_id, scheduler.interval(agent_id) * SLOW_FACTOR)
+                return
+            if budget_decision.action == "slow":
+                print(f"🐢 Slowing down: {budget_decision.reason}")
+        
+        print("-" * 80)
+        
+        try:
+            # Let the agent do something (will create identity if new agent)
+            final_state = run_autonomous(agent_history)
+            
+            print("\n" + "-" * 80)
+            
+            if agent_history:
+                print(f"✅ @{handle} completed action")
+            else:
+                # New agent was created during run
+                new_handle = final_state.get('agent_handle', 'unknown')
+                print(f"✅ New agent @{new_handle} created and took first action!")
+                if final_state.get('agent_id'):
+                    scheduler.add(final_state['agent_id'], new_handle)
+            
+            print(f"📝 Summary: {final_state['final'][:200]}..." if len(final_state['final']) > 200 else f"📝 Summary: {final_state['final']}")
+            
+        except CircuitOpenError as e:
+            # A dependency went down mid-run: try this agent again once it's back rather than losing the run
+            print(f"\n⏸️  Run interrupted: {e}; rescheduling")
+            scheduler.defer(agent_id, max(e.retry_in, RETRY_SECONDS))
+            return
+        except Exception as e:
+            if agent_history:
+                print(f"\n❌ Error running agent @{handle}: {e}")
+            else:
+                print(f"\n❌ Error creating/running new agent: {e}")
+            import traceback
+            traceback.print_exc()
+        
+        # Schedule this agent's next run from its weight (later when close to a budget)
+        scheduler.completed(agent_id, SLOW_FACTOR if budget_decision.action == "slow" else 1.0)
+        metrics.incr("scheduled_runs", kind="new" if agent_id == NEW_AGENT else "existing")
+        
+        if metrics_file:
+            with _metrics_file_lock:
+                try:
+                    metrics.dump(metrics_file)
+                except OSError as e:
+                    print(f"⚠️  Could not write metrics: {e}")
+        print('='*80)
+    finally:
+        scheduler.release(agent_id)
+        controller.release()
 
 
 def main():
@@ -130,10 +329,13 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
-  # Run with default intervals (30-120 seconds)
+  # Run with the default rate (0.8 runs per minute)
   python agent/run_daemon.py
   
-  # Run with custom intervals (agents act every 10-30 seconds)
+  # Run 3 agents per minute
+  python agent/run_daemon.py --runs-per-minute 3
+  
+  # Same rate as a run every 10-30 seconds on average
   python agent/run_daemon.py --min-interval 10 --max-interval 30
   
   # Run only a specific agent
@@ -148,20 +350,73 @@ Examples:
         "--min-interval",
         type=int,
         default=30,
-        help="Minimum seconds between actions (default: 30)"
+        help="Minimum seconds between actions; with --max-interval sets the rate (default: 30)"
     )
     
     parser.add_argument(
         "--max-interval",
         type=int,
         default=120,
-        help="Maximum seconds between actions (default: 120)"
+        help="Maximum seconds between actions; with --min-interval sets the rate (default: 120)"
+    )
+    
+    parser.add_argument(
+        "--runs-per-minute",
+        type=float,
+        help="Global agent runs per minute, shared by weight (default: one per mean of the intervals)"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        default="1",
+        help="Agents running at once: a number, or 'auto' to adapt to backend latency/errors and LLM 429s "
+             "(AIMD, CONCURRENCY_MIN-CONCURRENCY_MAX) (default: 1)"
     )
     
     parser.add_argument(
         "--agent-id",
         "-a",
-        help="Run only this specific agent (otherwise picks randomly from all agents)"
+        help="Run only this specific agent (otherwise the scheduler picks from all agents)"
+    )
+    
+    parser.add_argument(
+        "--metrics-file",
+        help="Write a JSON metrics snapshot (LLM calls, tokens, cached tokens, latencies) after each action"
+    )
+    
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        help="Keep one synced in-process copy of platform state and serve all reads from it"
+    )
+    
+    parser.add_argument(
+        "--trace-sample-rate",
+        type=float,
+        help="Share of runs (0-1) to trace to TRACE_DIR (default: TRACE_SAMPLE_RATE or 0)"
+    )
+    
+    parser.add_argument(
+        "--trace-format",
+        choices=tracing.FORMATS,
+        help="Trace file format: chrome (chrome://tracing, Perfetto) or otlp (OTLP/JSON)"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Sample all threads' stacks and write collapsed-stack flamegraph files to PROFILE_DIR"
+    )
+    
+    parser.add_argument(
+        "--profile-every",
+        type=float,
+        help="Minutes between profile dumps (default: PROFILE_DUMP_MINUTES or 5); one is always written on exit"
+    )
+    
+    parser.add_argument(
+        "--budget-file",
+        help="JSON file with hourly/daily USD budgets per model and per agent (default: BUDGETS env var)"
     )
     
     args = parser.parse_args()
@@ -171,11 +426,28 @@ Examples:
         parser.error("--min-interval must be at least 1 second")
     if args.max_interval < args.min_interval:
         parser.error("--max-interval must be greater than or equal to --min-interval")
+    if args.trace_sample_rate is not None and not 0 <= args.trace_sample_rate <= 1:
+        parser.error("--trace-sample-rate must be between 0 and 1")
+    if args.runs_per_minute is not None and args.runs_per_minute <= 0:
+        parser.error("--runs-per-minute must be positive")
+    if args.concurrency != "auto" and not (args.concurrency.isdigit() and int(args.concurrency) >= 1):
+        parser.error("--concurrency must be 'auto' or a positive number")
+    if args.profile_every is not None and args.profile_every <= 0:
+        parser.error("--profile-every must be positive")
     
     run_daemon(
         interval_min=args.min_interval,
         interval_max=args.max_interval,
-        specific_agent_id=args.agent_id
+        specific_agent_id=args.agent_id,
+        metrics_file=args.metrics_file,
+        mirror=args.mirror,
+        trace_sample_rate=args.trace_sample_rate,
+        trace_format=args.trace_format,
+        profile=args.profile,
+        profile_every=args.profile_every,
+        budget_file=args.budget_file,
+        runs_per_minute=args.runs_per_minute,
+        concurrency=args.concurrency
     )
 
 
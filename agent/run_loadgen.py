@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Synthetic load generator for the backend.
+
+Spawns thousands of synthetic agents and drives them with a seeded policy
+instead of LLMs, calling the real `tools.py` functions (so the
+backend sees exactly the requests real agents make). Runs each concurrency
+level for a fixed duration and reports throughput, error rate and latency
+percentiles per endpoint; the level where throughput stops growing while p95
+climbs is the backend's scaling knee.
+
+Usage:
+    python agent/run_loadgen.py --agents 10000 --concurrency 8,16,32,64,128 --duration 30
+    python agent/run_loadgen.py --mix post=40,ack=30,debug=10,vote=10,merge=5,join=5 --seed 7
+    python agent/run_loadgen.py --actions 5000 --report-file loadgen.json
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables first: local modules read their settings when imported
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+
+import tools
+from tools import ToolError
+from metrics import metrics
+from circuit_breaker import get_breaker, BACKEND
+
+HANDLE_PREFIX = "loadgen_"
+GROUP_PREFIX = "loadgen-"
+LATENCY_WINDOW = 200_000
+DEFAULT_MIX = {"post": 25, "ack": 25, "debug": 15, "vote": 10, "merge": 5, "join": 5, "browse": 15}
+TOPICS = ["benchmarks", "tokenizers", "gradient descent", "prompt golf", "context windows",
+          "retrieval", "sampling temperature", "GPU shortages", "evals", "alignment memes"]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """`post=40,ack=30,...` -> weights; unknown actions are rejected."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown action '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    return mix
+
+
+class World:
+    """What the synthetic agents know about: their IDs, and posts/DEBUGs/groups to act on."""
+
+    def __init__(self, agent_ids: List[str], post_ids: List[str], group_ids: List[str]):
+        self.agent_ids = agent_ids
+        self.post_ids = post_ids
+        self.group_ids = group_ids
+        self.debugs: List[Tuple[str, str]] = []  # (post ID, interaction ID)
+        self._lock = threading.Lock()
+
+    def add_post(self, post_id: str):
+        with self._lock:
+            self.post_ids.append(post_id)
+
+    def add_debug(self, post_id: str, interaction_id: str):
+        with self._lock:
+            self.debugs.append((post_id, interaction_id))
+
+    @staticmethod
+    def _pick(items: List[Any], rng: random.Random) -> Optional[Any]:
+        return items[int(rng.random() * len(items))] if items else None
+
+    def agent(self, rng: random.Random) -> str:
+        return self._pick(self.agent_ids, rng)
+
+    def post(self, rng: random.Random) -> Optional[str]:
+        return self._pick(self.post_ids, rng)
+
+    def debug(self, rng: random.Random) -> Optional[Tuple[str, str]]:
+        return self._pick(self.debugs, rng)
+
+    def group(self, rng: random.Random) -> Optional[str]:
+        return self._pick(self.group_ids, rng)
+
+
+class SyntheticPolicy:
+    """
+    Seeded stand-in for the LLM planner. The action kind drawn for action
+    number i depends only on (seed, i), so every run asks for the same mix in
+    the same order. Targets (agents, posts, DEBUGs) are drawn from the shared
+    world, which concurrent workers grow in whatever order their requests
+    finish, so they are not reproducible across runs. Actions that need a
+    target that doesn't exist yet (e.g. a vote before any DEBUG) become posts.
+    """
+
+    def __init__(self, mix: Dict[str, float], seed: int = 0):
+        self.actions = [a for a, w in mix.items() if w > 0]
+        self.weights = [mix[a] for a in self.actions]
+        self.seed = seed
+
+    def step(self, i: int, world: World) -> Tuple[str, Callable[[], Any]]:
+        """Pick action i and return (name, thunk performing it)."""
+        rng = random.Random(f"{self.seed}:{i}")
+        action = rng.choices(self.actions, self.weights)[0]
+        agent_id = world.agent(rng)
+        post_id = world.post(rng)
+
+        if action == "ack" and post_id:
+            return action, lambda: tools.ack_post(agent_id, post_id)
+        if action == "debug" and post_id:
+            text = f"@agent {rng.choice(TOPICS)} take #{i}: have you measured this?"
+            def debug():
+                interaction = tools.debug_post(agent_id, post_id, text)
+                world.add_debug(post_id, interaction["id"])
+                return interaction
+            return action, debug
+        if action == "vote" and world.debug(rng):
+            target_post, interaction_id = world.debug(rng)
+            vote = rng.randint(0, 1)
+            return action, lambda: tools.vote_on_debug(agent_id, target_post, interaction_id, vote)
+        if action == "merge":
+            other = world.agent(rng)
+            pitch = f"Let's co-write a thread on {rng.choice(TOPICS)} (#{i})"
+            return action, lambda: tools.propose_merge(agent_id, other, pitch)
+        if action == "join" and world.group(rng):
+            group_id = world.group(rng)
+            return action, lambda: tools.join_group(agent_id, group_id)
+        if action == "browse":
+            return action, lambda: tools.list_posts(limit=10)
+
+        content = f"Synthetic post #{i} about {rng.choice(TOPICS)}. " + " ".join(
+            rng.choice(TOPICS) for _ in range(rng.randint(5, 30))
+        )
+        def post():
+            created = tools.create_post(agent_id, content)
+            world.add_post(created["id"])
+            return created
+        return "post", post
+
+
+def ensure_agents(count: int, concurrency: int) -> List[str]:
+    """IDs of up to `count` synthetic agents, creating whichever don't exist yet (failed creates are skipped)."""
+    existing = {a["handle"]: a["id"] for a in tools.list_agents() if a["handle"].startswith(HANDLE_PREFIX)}
+    handles = [f"{HANDLE_PREFIX}{i:05d}" for i in range(count)]
+    missing = [h for h in handles if h not in existing]
+    if missing:
+        print(f"👥 Creating {len(missing)} synthetic agents ({len(existing)} already exist)...")
+
+        def create(handle):
+            try:
+                return handle, tools.register_agent(handle, f"Synthetic load-test agent {handle}", "loadgen")["id"]
+            except ToolError:
+                return handle, None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            existing.update((h, agent_id) for h, agent_id in pool.map(create, missing) if agent_id)
+    return [existing[h] for h in handles if h in existing]
+
+
+def ensure_groups(count: int) -> List[str]:
+    existing = {g["slug"]: g["id"] for g in tools.list_groups() if g["slug"].startswith(GROUP_PREFIX)}
+    for i in range(count):
+        slug = f"{GROUP_PREFIX}{i:03d}"
+        if slug not in existing:
+            try:
+                existing[slug] = tools.create_group(f"Loadgen {i}", slug, "Synthetic load-test group")["id"]
+            except ToolError:
+                pass
+    return [existing[slug] for slug in sorted(existing)][:count]
+
+
+def run_level(policy: SyntheticPolicy, world: World, concurrency: int, duration: float,
+              max_actions: Optional[int], counter: "itertools.count") -> float:
+    """Run `concurrency` closed-loop workers until the deadline (or action budget). Returns elapsed seconds."""
+    deadline = time.monotonic() + duration
+    issued = itertools.count()
+
+    def worker():
+        while time.monotonic() < deadline:
+            if max_actions is not None and next(issued) >= max_actions:
+                return
+            name, perform = policy.step(next(counter), world)
+            try:
+                perform()
+                metrics.incr("loadgen_actions", action=name, outcome="ok")
+            except Exception:
+                metrics.incr("loadgen_actions", action=name, outcome="error")
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return time.monotonic() - started
+
+
+def level_report(concurrency: int, elapsed: float) -> Dict[str, Any]:
+    """Throughput, error rate and latency percentiles per endpoint from the current metrics."""
+    endpoints = {}
+    for endpoint in sorted({labels["endpoint"] for labels in metrics.label_sets("http_requests")}):
+        total = metrics.total("http_requests", endpoint=endpoint)
+        ok = metrics.counter("http_requests", endpoint=endpoint, status="2xx")
+        endpoints[endpoint] = {
+            "requests": int(total),
+            "rps": total / elapsed if elapsed else 0.0,
+            "error_rate": (total - ok) / total if total else 0.0,
+            **{f"p{int(q * 100)}_ms": (metrics.percentile("http_latency", q, endpoint=endpoint) or 0.0) * 1000
+               for q in (0.50, 0.95, 0.99)}
+        }
+    requests_total = metrics.total("http_requests")
+    actions_total = metrics.total("loadgen_actions")
+    return {
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "actions": int(actions_total),
+        "actions_per_second": actions_total / elapsed if elapsed else 0.0,
+        "action_error_rate": metrics.total("loadgen_actions", outcome="error") / actions_total if actions_total else 0.0,
+        "requests_per_second": requests_total / elapsed if elapsed else 0.0,
+        "endpoints": endpoints
+    }
+
+
+def print_level(report: Dict[str, Any]):
+    print(f"\n📈 Concurrency {report['concurrency']}: {report['actions']} actions in {report['elapsed']:.1f}s "
+          f"→ {report['actions_per_second']:.1f} actions/s, {report['requests_per_second']:.1f} req/s, "
+          f"{report['action_error_rate']:.1%} failed actions")
+    print(f"   {'endpoint':<52} {'req':>7} {'req/s':>8} {'err':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}")
+    for endpoint, e in sorted(report["endpoints"].items()):
+        print(f"   {endpoint:<52} {e['requests']:>7} {e['rps']:>8.1f} {e['error_rate']:>6.1%} "
+              f"{e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} {e['p99_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the backend with synthetic agents and report per-endpoint latency")
+    parser.add_argument("--agents", type=int, default=1000, help="Synthetic agents to act as (default: 1000)")
+    parser.add_argument("--groups", type=int, default=20, help="Synthetic groups to join (default: 20)")
+    parser.add_argument("--concurrency", default="16",
+                        help="Concurrent workers; a comma-separated list runs one level each (default: 16)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per concurrency level (default: 30)")
+    parser.add_argument("--actions", type=int, help="Stop a level after this many actions")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="Action weights (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="Policy seed (default: 0)")
+    parser.add_argument("--report-file", help="Also write the per-level reports here as JSON")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(c) for c in args.concurrency.split(",")]
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"🏋️  Load generator against {tools.BACKEND_URL}")
+    # Measure the backend itself under overload, not the breaker failing calls fast
+    get_breaker(BACKEND).failure_threshold = float("inf")
+    setup_started = time.monotonic()
+    try:
+        agent_ids = ensure_agents(args.agents, max(levels))
+        group_ids = ensure_groups(args.groups)
+        post_ids = [p["id"] for p in tools.list_posts(limit=200)]
+    except Exception as e:
+        print(f"❌ Setup failed: {e}")
+        return
+    if not agent_ids:
+        print("❌ No synthetic agents could be created")
+        return
+    print(f"   {len(agent_ids)} agents, {len(group_ids)} groups, {len(post_ids)} seed posts "
+          f"(setup {time.monotonic() - setup_started:.1f}s)")
+
+    # Percentiles should cover a whole level, not just the default window of recent samples
+    metrics.latency_window = LATENCY_WINDOW
+    world = World(agent_ids, post_ids, group_ids)
+    policy = SyntheticPolicy(mix, args.seed)
+    counter = itertools.count()
+    reports = []
+    try:
+        for concurrency in levels:
+            metrics.reset()
+            elapsed = run_level(policy, world, concurrency, args.duration, args.actions, counter)
+            report = level_report(concurrency, elapsed)
+            reports.append(report)
+            print_level(report)
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted")
+
+    if len(reports) > 1:
+        print("\n📊 Scaling summary (look for where actions/s flattens while p95 climbs):")
+        for r in reports:
+            worst_p95 = max((e["p95_ms"] for e in r["endpoints"].values()), default=0.0)
+            print(f"   c={r['concurrency']:<5} {r['actions_per_second']:>8.1f} actions/s   "
+                  f"errors {r['action_error_rate']:>6.1%}   worst endpoint p95 {worst_p95:>8.1f} ms")
+    if args.report_file:
+        with open(args.report_file, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Wrote {args.report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Weighted fair scheduler for the autonomous daemon.
+
+Each agent gets a share of a global rate (SCHEDULER_RUNS_PER_MINUTE)
+proportional to its weight, so its next run is due `total weight / (rate *
+weight)` after its last one. Due runs are kept in a heap and the earliest one
+goes next. The weight combines four signals, each scaled by a configurable
+coefficient (SCHEDULER_WEIGHTS, JSON):
+
+- pending:  DEBUG replies to the agent's posts and @mentions of it since its
+            last run (up to PENDING_SATURATION of them)
+- recency:  how recently it last ran (conversations in progress keep going)
+- activity: how active its personality is (profile wording, API status)
+- cost:     its LLM spend today relative to the average agent (a penalty)
+
+    weight = (1 + w_pending * pending) * (1 + w_recency * recency)
+             * activity ** w_activity / (1 + w_cost * cost)
+
+Starvation protection: no agent waits longer than SCHEDULER_MAX_WAIT_MINUTES
+however low its weight. New agents are born at NEW_AGENT_SHARE of all runs.
+Signals are refreshed from the platform every SCHEDULER_REFRESH_SECONDS, reading
+only the posts and interactions created since the oldest last run.
+"""
+import os
+import re
+import json
+import math
+import time
+import heapq
+import threading
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+import tools
+from agent_manager import list_agent_summaries
+from budget import ledger
+from metrics import metrics
+
+RUNS_PER_MINUTE = float(os.getenv("SCHEDULER_RUNS_PER_MINUTE", "0.8"))
+MAX_WAIT = float(os.getenv("SCHEDULER_MAX_WAIT_MINUTES", "180")) * 60
+REFRESH_SECONDS = float(os.getenv("SCHEDULER_REFRESH_SECONDS", "300"))
+NEW_AGENT_SHARE = float(os.getenv("SCHEDULER_NEW_AGENT_SHARE", "0.01"))
+RECENCY_HOURS = 24.0  # recency decays with this time constant
+PENDING_SATURATION = 3  # this many pending replies/mentions count as fully pending
+DEFAULT_WEIGHTS = {"pending": 3.0, "recency": 1.0, "activity": 1.0, "cost": 1.0}
+
+# Stand-in ID for "create a new agent" in the schedule
+NEW_AGENT = "__new__"
+
+HIGH_ACTIVITY_WORDS = ("hyperactive", "prolific", "chatty", "obsessive", "relentless", "energetic",
+                       "enthusiastic", "always online", "loud", "compulsive")
+LOW_ACTIVITY_WORDS = ("lurker", "lurks", "quiet", "shy", "reclusive", "laconic", "rarely",
+                      "introvert", "sleepy", "minimalist")
+STATUS_ACTIVITY = {"OPEN": 1.0, "RATE_LIMITED": 0.5, "DEPRECATED": 0.1, "UNAUTHORIZED": 0.05}
+
+MENTION = re.compile(r"@([A-Za-z0-9_\-]+)")
+
+
+def _load_weights() -> Dict[str, float]:
+    weights = dict(DEFAULT_WEIGHTS)
+    raw = os.getenv("SCHEDULER_WEIGHTS")
+    if raw:
+        try:
+            weights.update({k: float(v) for k, v in json.loads(raw).items() if k in DEFAULT_WEIGHTS})
+        except (ValueError, AttributeError) as e:
+            print(f"⚠️  Ignoring invalid SCHEDULER_WEIGHTS: {e}")
+    return weights
+
+
+def _epoch(timestamp: Optional[str]) -> Optional[float]:
+    """ISO timestamp (backend "...Z" or naive UTC from the agent) -> epoch seconds."""
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def activity_level(agent: Dict[str, Any]) -> float:
+    """0.05-2.0 from the profile's wording and the agent's API status (1.0 = ordinary)."""
+    profile = (agent.get("profile") or "").lower()
+    high = sum(word in profile for word in HIGH_ACTIVITY_WORDS)
+    low = sum(word in profile for word in LOW_ACTIVITY_WORDS)
+    level = min(2.0, max(0.25, 1.0 + 0.5 * high - 0.25 * low))
+    return level * STATUS_ACTIVITY.get(agent.get("apiStatus", "OPEN"), 1.0)
+
+
+def pending_counts(activity: Dict[str, List[Dict[str, Any]]], handles: Dict[str, str],
+                   last_runs: Dict[str, float]) -> Dict[str, int]:
+    """
+    Per agent ID: DEBUG replies by others to its posts, and @mentions of it by
+    others, created after its last run. `activity` is `tools.recent_activity()`
+    output whose interactions all carry `postAuthorAgentId`.
+    """
+    ids_by_handle = {handle.lower(): agent_id for agent_id, handle in handles.items()}
+    pending: Dict[str, int] = {}
+
+    def mentions(text: str, author_id: str, created: Optional[float]):
+        for handle in set(MENTION.findall(text or "")):
+            agent_id = ids_by_handle.get(handle.lower())
+            if agent_id and agent_id != author_id and (created or 0) > last_runs.get(agent_id, 0):
+                pending[agent_id] = pending.get(agent_id, 0) + 1
+
+    for post in activity["posts"]:
+        mentions(post.get("content", ""), post.get("authorAgentId"), _epoch(post.get("createdAt")))
+    for interaction in activity["interactions"]:
+        created = _epoch(interaction.get("createdAt"))
+        actor = interaction.get("actorAgentId")
+        author = interaction.get("postAuthorAgentId")
+        if interaction.get("kind") == "DEBUG" and author and actor != author \
+                and (created or 0) > last_runs.get(author, 0):
+            pending[author] = pending.get(author, 0) + 1
+        mentions(interaction.get("debugText", ""), actor, created)
+    return pending
+
+
+class ScheduledAgent:
+    __slots__ = ("agent_id", "handle", "weight", "factors", "last_run", "next_run")
+
+    def __init__(self, agent_id: str, handle: str, last_run: Optional[float]):
+        self.agent_id = agent_id
+        self.handle = handle
+        self.weight = 1.0
+        self.factors: Dict[str, float] = {}
+        self.last_run = last_run
+        self.next_run = 0.0
+
+
+class WeightedFairScheduler:
+    """Heap of per-agent next-run times, derived from weights and a global rate."""
+
+    def __init__(self, runs_per_minute: float = RUNS_PER_MINUTE, weights: Optional[Dict[str, float]] = None,
+                 max_wait: float = MAX_WAIT, new_agent_share: float = NEW_AGENT_SHARE,
+                 refresh_every: float = REFRESH_SECONDS, only_agent_id: Optional[str] = None):
+        self.rate = runs_per_minute / 60.0
+        self.weights = _load_weights() if weights is None else {**DEFAULT_WEIGHTS, **weights}
+        self.max_wait = max_wait
+        self.new_agent_share = 0.0 if only_agent_id else new_agent_share
+        self.refresh_every = refresh_every
+        self.only_agent_id = only_agent_id
+        self.agents: Dict[str, ScheduledAgent] = {}
+        self.refreshed_at = 0.0
+        self.last_dispatch = 0.0
+        self._new_next = 0.0
+        self._post_authors: Dict[str, Optional[str]] = {}  # post ID -> author, for replies to older posts
+        self._not_before: Dict[str, float] = {}  # deferred or slowed turns a refresh may not move earlier
+        self.running: Set[str] = set()  # dispatched and not yet completed (never scheduled twice)
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.RLock()  # the daemon completes runs from worker threads
+
+    # --- weights ---
+
+    def _signals(self) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+        agents = tools.list_agents()
+        summaries = {s["id"]: s for s in list_agent_summaries()}
+        if self.only_agent_id:
+            agents = [a for a in agents if a["id"] == self.only_agent_id]
+        agents = [{**a, **summaries.get(a["id"], {})} for a in agents]
+        return agents, self._recent_activity(agents)
+
+    def _recent_activity(self, agents: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Posts and interactions since the oldest last run, but no further back than
+        max_wait (an agent idle that long is due anyway). Post authors missing from
+        the feed are looked up once and cached.
+        """
+        floor = time.time() - self.max_wait
+        last_runs = []
+        for agent in agents:
+            entry = self.agents.get(agent["id"])
+            last_runs.append((entry.last_run if entry else None) or _epoch(agent.get("lastInteractionAt")) or floor)
+        since = max(floor, min(last_runs, default=floor))
+        # Same format as the backend's timestamps (toISOString), which are compared as strings
+        since_iso = datetime.fromtimestamp(since, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        activity = tools.recent_activity(since_iso)
+        for post in activity["posts"]:
+            self._post_authors[post["id"]] = post["authorAgentId"]
+        for interaction in activity["interactions"]:
+            post_id = interaction["postId"]
+            if interaction.get("postAuthorAgentId"):
+                self._post_authors[post_id] = interaction["postAuthorAgentId"]
+                continue
+            if post_id not in self._post_authors:
+                try:
+                    self._post_authors[post_id] = tools.get_post(post_id)["authorAgentId"]
+                except tools.ToolError:
+                    self._post_authors[post_id] = None  # deleted: nobody to notify
+            interaction["postAuthorAgentId"] = self._post_authors[post_id]
+        return activity
+
+    def refresh(self):
+        """Reload agents and signals, recompute weights and every agent's next run."""
+        agents, activity = self._signals()
+        with self._lock:
+            self._apply_signals(agents, activity)
+
+    def _apply_signals(self, agents: List[Dict[str, Any]], activity: Dict[str, List[Dict[str, Any]]]):
+        now = time.time()
+        for agent in agents:
+            entry = self.agents.get(agent["id"])
+            if entry is None:
+                self.agents[agent["id"]] = ScheduledAgent(agent["id"], agent["handle"], _epoch(agent.get("lastInteractionAt")))
+            elif entry.last_run is None:
+                entry.last_run = _epoch(agent.get("lastInteractionAt"))
+        current = {a["id"] for a in agents}
+        for agent_id in [a for a in self.agents if a not in current]:
+            del self.agents[agent_id]
+
+        last_runs = {a.agent_id: a.last_run or 0.0 for a in self.agents.values()}
+        pending = pending_counts(activity, {a.agent_id: a.handle for a in self.agents.values()}, last_runs)
+        spend = {a.agent_id: ledger.spent("agent", a.agent_id, "daily") for a in self.agents.values()}
+        mean_spend = sum(spend.values()) / len(spend) if spend else 0.0
+        for agent in agents:
+            entry = self.agents[agent["id"]]
+            hours_idle = (now - entry.last_run) / 3600 if entry.last_run else math.inf
+            factors = {
+                "pending": min(1.0, pending.get(entry.agent_id, 0) / PENDING_SATURATION),
+                "recency": math.exp(-hours_idle / RECENCY_HOURS),
+                "activity": activity_level(agent),
+                "cost": spend[entry.agent_id] / mean_spend if mean_spend else 0.0
+            }
+            entry.factors = factors
+            self._weigh(entry)
+
+        self._reschedule_all(now)
+        self.refreshed_at = time.monotonic()
+
+    def _weigh(self, entry: ScheduledAgent):
+        w, f = self.weights, entry.factors
+        entry.weight = ((1 + w["pending"] * f["pending"]) * (1 + w["recency"] * f["recency"])
+                        * f["activity"] ** w["activity"] / (1 + w["cost"] * f["cost"]))
+
+    def interval(self, agent_id: str) -> float:
+        """Seconds between runs of an agent at its share of the global rate (capped by max_wait)."""
+        total = sum(a.weight for a in self.agents.values())
+        if agent_id == NEW_AGENT:
+            if not self.agents:
+                return 1 / self.rate  # nobody to run yet: every run creates an agent
+            return 1 / (self.rate * self.new_agent_share) if self.new_agent_share else math.inf
+        weight = self.agents[agent_id].weight
+        share = (1 - self.new_agent_share) * weight / total if total and weight else 0.0
+        return min(self.max_wait, 1 / (self.rate * share)) if share else self.max_wait
+
+    # --- heap ---
+
+    def _push(self, agent_id: str, at: float):
+        if agent_id == NEW_AGENT:
+            self._new_next = at
+        else:
+            self.agents[agent_id].next_run = at
+        heapq.heappush(self._heap, (at, next(self._seq), agent_id))
+
+    def _reschedule_all(self, now: float):
+        """
+        Re-derive every next run from the new weights. A run already scheduled
+        only moves earlier (a higher weight, never a lost place in the queue),
+        and never before a defer() or slowed completion put it.
+        """
+        self._heap = []
+        for entry in self.agents.values():
+            if entry.agent_id not in self.running:
+                at = (entry.last_run or now - self.max_wait) + self.interval(entry.agent_id)
+                if entry.next_run:
+                    at = min(at, entry.next_run)
+                self._push(entry.agent_id, max(at, self._not_before.get(entry.agent_id, 0.0)))
+        if self.new_agent_share and NEW_AGENT not in self.running:
+            at = now + self.interval(NEW_AGENT)
+            if self._new_next:
+                at = min(at, self._new_next)
+            self._push(NEW_AGENT, max(at, self._not_before.get(NEW_AGENT, 0.0)))
+        for agent_id in [a for a in self._not_before if a != NEW_AGENT and a not in self.agents]:
+            del self._not_before[agent_id]
+
+    def next(self) -> Tuple[str, float]:
+        """(agent ID or NEW_AGENT, epoch time it is due). Refreshes signals when stale."""
+        if time.monotonic() - self.refreshed_at >= self.refresh_every:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Could not refresh scheduler signals (keeping the current schedule): {e}")
+        with self._lock:
+            while self._heap:
+                at, _, agent_id = heapq.heappop(self._heap)
+                current = self._new_next if agent_id == NEW_AGENT else getattr(self.agents.get(agent_id), "next_run", None)
+                if current == at and agent_id not in self.running:
+                    # Global rate: never dispatch faster than the target, even when many runs are overdue
+                    due = max(at, self.last_dispatch + 1 / self.rate)
+                    self.last_dispatch = max(due, time.time())
+                    self.running.add(agent_id)
+                    metrics.observe("schedule_lag", max(0.0, time.time() - at))
+                    return agent_id, due
+        raise LookupError("No agents to schedule")
+
+    def completed(self, agent_id: str, slow_factor: float = 1.0):
+        """
+        Record a run and schedule the agent's next one (`slow_factor` stretches
+        the interval). Intervals count from when the run was due rather than when
+        it finished, so shares hold when the daemon is busy; an agent can bank at
+        most one interval of backlog.
+        """
+        with self._lock:
+            self.running.discard(agent_id)
+            now = max(time.time(), self.last_dispatch)
+            interval = self.interval(agent_id) if agent_id == NEW_AGENT or agent_id in self.agents else 0.0
+            if agent_id == NEW_AGENT:
+                at = max(self._new_next, now - interval) + interval * slow_factor
+            else:
+                entry = self.agents.get(agent_id)
+                if entry is None:
+                    return
+                entry.last_run = now
+                if entry.factors:
+                    entry.factors.update(pending=0.0, recency=1.0)
+                    self._weigh(entry)
+                at = max(entry.next_run, now - interval) + interval * slow_factor
+            if slow_factor > 1:
+                self._not_before[agent_id] = at
+            else:
+                self._not_before.pop(agent_id, None)
+            self._push(agent_id, at)
+
+    def add(self, agent_id: str, handle: str):
+        """Start scheduling an agent created since the last refresh."""
+        with self._lock:
+            if agent_id in self.agents or self.only_agent_id:
+                return
+            entry = self.agents[agent_id] = ScheduledAgent(agent_id, handle, time.time())
+            self._push(agent_id, entry.last_run + self.interval(agent_id))
+
+    def defer(self, agent_id: str, delay: float):
+        """Push an agent's turn back without counting it as a run (e.g. over budget)."""
+        with self._lock:
+            self.running.discard(agent_id)
+            if agent_id == NEW_AGENT or agent_id in self.agents:
+                self._not_before[agent_id] = time.time() + delay
+                self._push(agent_id, self._not_before[agent_id])
+
+    def release(self, agent_id: str):
+        """Forget a dispatched run that ended without completed() or defer(); the next refresh reschedules it."""
+        with self._lock:
+            self.running.discard(agent_id)
+
+    def remove(self, agent_id: str):
+        with self._lock:
+            self.running.discard(agent_id)
+            self.agents.pop(agent_id, None)
+            self._not_before.pop(agent_id, None)
+
+    def describe(self, agent_id: str) -> str:
+        with self._lock:
+            entry = self.agents.get(agent_id)
+            if entry is None:
+                return ""
+            factors = ", ".join(f"{k} {v:.2f}" for k, v in entry.factors.items())
+            return f"weight {entry.weight:.2f} ({factors}), every ~{self.interval(agent_id) / 60:.1f} min"
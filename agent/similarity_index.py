@@ -0,0 +1,182 @@
+"""
+Local, offline near-duplicate detection using MinHash signatures and LSH banding.
+
+Texts are normalised, split into word shingles and reduced to fixed-size
+MinHash signatures held in a NumPy array. Locality-sensitive hashing over
+signature bands finds candidate matches without scanning the whole corpus;
+candidates are then scored by estimated Jaccard similarity.
+"""
+import re
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_WORD_RE = re.compile(r"[a-z0-9@#']+")
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Lower-cased word n-grams of `text` (single words for very short texts)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Computes MinHash signatures with `num_perm` universal hash permutations."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a*x + b stays below 2**62 because a, b and x are all below 2**31
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+
+    def signature(self, tokens: Set[str]) -> np.ndarray:
+        """Signature of a shingle set as a (num_perm,) uint64 array."""
+        if not tokens:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) & 0x7FFFFFFF for t in tokens),
+            dtype=np.uint64,
+            count=len(tokens)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+class MinHashLSH:
+    """
+    Incremental MinHash/LSH index mapping keys to texts.
+
+    `bands` x `rows` must equal `num_perm`. More, smaller bands raise recall for
+    moderate similarities at the cost of more candidates to verify. All methods
+    are thread-safe.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 64, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self._buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures = np.empty((64, num_perm), dtype=np.uint64)
+        self._row_of: Dict[Hashable, int] = {}
+        self._key_of: Dict[int, Hashable] = {}
+        self._free_rows: List[int] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._row_of
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(shingles(text, self.shingle_size))
+
+    def add(self, key: Hashable, text: str, sig: Optional[np.ndarray] = None):
+        """Insert or replace `key` with the signature of `text`."""
+        if sig is None:
+            sig = self.signature(text)
+        with self._lock:
+            if key in self._row_of:
+                self.remove(key)
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = len(self._row_of)
+                if row >= len(self._signatures):
+                    grown = np.empty((len(self._signatures) * 2, self.hasher.num_perm), dtype=np.uint64)
+                    grown[:len(self._signatures)] = self._signatures
+                    self._signatures = grown
+            self._signatures[row] = sig
+            self._row_of[key] = row
+            self._key_of[row] = key
+            for band, band_key in zip(self._buckets, self._band_keys(sig)):
+                band.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: Hashable):
+        """Drop `key` from the index (no-op if absent)."""
+        with self._lock:
+            row = self._row_of.pop(key, None)
+            if row is None:
+                return
+            del self._key_of[row]
+            for band, band_key in zip(self._buckets, self._band_keys(self._signatures[row])):
+                members = band.get(band_key)
+                if members:
+                    members.discard(key)
+                    if not members:
+                        del band[band_key]
+            self._free_rows.append(row)
+
+    def query(self, text: str, threshold: float = 0.0, sig: Optional[np.ndarray] = None) -> List[Tuple[Hashable, float]]:
+        """Keys whose estimated Jaccard similarity to `text` is >= threshold, most similar first."""
+        if sig is None:
+            sig = self.signature(text)
+        with self._lock:
+            candidates: Set[Hashable] = set()
+            for band, band_key in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(band.get(band_key, ()))
+            if not candidates:
+                return []
+            keys = list(candidates)
+            rows = np.fromiter((self._row_of[k] for k in keys), dtype=np.intp, count=len(keys))
+            scores = (self._signatures[rows] == sig).mean(axis=1)
+        matches = [(k, float(s)) for k, s in zip(keys, scores) if s >= threshold]
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+    def most_similar(self, text: str, sig: Optional[np.ndarray] = None) -> Tuple[Optional[Hashable], float]:
+        """Best match for `text` as (key, similarity), or (None, 0.0) if nothing is close."""
+        matches = self.query(text, sig=sig)
+        return matches[0] if matches else (None, 0.0)
+
+
+class RecentTextIndex:
+    """
+    Near-duplicate index over the most recent `capacity` texts (e.g. feed posts).
+
+    Texts are added as they are seen; once full, the oldest entry is evicted so
+    memory and lookup cost stay bounded no matter how long the process runs.
+    """
+
+    def __init__(self, capacity: int = 2000, threshold: float = 0.5, **lsh_kwargs):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._lsh = MinHashLSH(**lsh_kwargs)
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lsh)
+
+    def add(self, key: Hashable, text: str):
+        """Record a text, evicting the oldest entries beyond capacity."""
+        if not text:
+            return
+        with self._lock:
+            if key in self._order:
+                self._order.move_to_end(key)
+                return
+            self._lsh.add(key, text)
+            self._order[key] = None
+            while len(self._order) > self.capacity:
+                oldest, _ = self._order.popitem(last=False)
+                self._lsh.remove(oldest)
+
+    def find_duplicate(self, text: str) -> Tuple[Optional[Hashable], float]:
+        """Closest recent text as (key, similarity) if it reaches the threshold, else (None, score)."""
+        key, score = self._lsh.most_similar(text)
+        if score >= self.threshold:
+            return key, score
+        return None, score
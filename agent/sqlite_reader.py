@@ -0,0 +1,222 @@
+"""
+Direct read path into the backend's SQLite database, for agents on the same host.
+
+With UNIT_READ_BACKEND=sqlite, the read tools (`list_posts`, `list_agents`,
+`list_groups`, `observe_product`) and history loads query the backend's
+database file directly instead of going through Express. Connections are
+read-only (`mode=ro`, `query_only`) with a shared cache, one per thread; the
+backend runs the database in WAL mode, so these readers never block its
+writes. Queries use the backend's indexes and return the same shapes as the
+HTTP endpoints. Writes always go over HTTP.
+
+The database path is UNIT_DB_PATH (default: backend/data/unit.db).
+"""
+import os
+import json
+import sqlite3
+import threading
+from functools import cmp_to_key
+from typing import Any, Dict, List, Optional
+from export_history import DEFAULT_DB_PATH
+
+# "http" (default), "sqlite" (this module) or "mirror" (platform_mirror.py)
+READ_BACKEND = os.getenv("UNIT_READ_BACKEND", "http")
+
+
+def _row_to_agent(row: sqlite3.Row) -> Dict[str, Any]:
+    agent = {
+        "id": row["id"],
+        "handle": row["handle"],
+        "coreModel": row["coreModel"],
+        "parameterCount": row["parameterCount"],
+        "apiStatus": row["apiStatus"],
+        "badges": json.loads(row["badges"]),
+        "flair": json.loads(row["flair"])
+    }
+    # Unset optional fields are omitted, as in the backend's JSON
+    if row["profile"]:
+        agent["profile"] = row["profile"]
+    if row["llmModel"]:
+        agent["llmModel"] = row["llmModel"]
+    agent["createdAt"] = row["createdAt"]
+    agent["updatedAt"] = row["updatedAt"]
+    return agent
+
+
+def _row_to_post(row: sqlite3.Row) -> Dict[str, Any]:
+    post = {
+        "id": row["id"],
+        "authorAgentId": row["authorAgentId"],
+        "type": row["type"],
+        "content": row["content"],
+        "createdAt": row["createdAt"]
+    }
+    if row["metadata"]:
+        post["metadata"] = json.loads(row["metadata"])
+    if row["unitId"]:
+        post["unitId"] = row["unitId"]
+    return post
+
+
+def _compare_interactions(a: Dict[str, Any], b: Dict[str, Any]) -> int:
+    """Same order as the backend: DEBUGs by vote score, otherwise newest first."""
+    if a["kind"] == "DEBUG" and b["kind"] == "DEBUG" and a["voteScore"] != b["voteScore"]:
+        return b["voteScore"] - a["voteScore"]
+    return (a["createdAt"] < b["createdAt"]) - (a["createdAt"] > b["createdAt"])
+
+
+class SQLiteReader:
+    """Read-only queries against the backend database, returning API-shaped dicts."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.path = os.path.abspath(db_path)
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"SQLite database not found: {self.path}")
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections must not be shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&cache=shared", uri=True)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+        return conn
+
+    def _enrich_posts(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach author handles and interactions (with actor handles and vote scores)."""
+        if not posts:
+            return posts
+        ids = [p["id"] for p in posts]
+        marks = ",".join("?" * len(ids))
+        rows = self.conn.execute(f"""
+            SELECT i.id, i.postId, i.actorAgentId, i.kind, i.debugText, i.createdAt,
+                   COALESCE(a.handle, 'unknown') AS actorHandle,
+                   COALESCE(SUM(CASE WHEN v.vote = 1 THEN 1 WHEN v.vote = 0 THEN -1 END), 0) AS voteScore
+            FROM interactions i
+            LEFT JOIN agents a ON a.id = i.actorAgentId
+            LEFT JOIN interaction_votes v ON v.interactionId = i.id
+            WHERE i.postId IN ({marks})
+            GROUP BY i.id
+        """, ids).fetchall()
+        by_post: Dict[str, List[Dict[str, Any]]] = {pid: [] for pid in ids}
+        for row in rows:
+            interaction = {k: row[k] for k in ("id", "postId", "actorAgentId", "kind", "createdAt")}
+            if row["debugText"]:
+                interaction["debugText"] = row["debugText"]
+            interaction["actorHandle"] = row["actorHandle"]
+            interaction["voteScore"] = row["voteScore"]
+            by_post[row["postId"]].append(interaction)
+
+        authors = {p["authorAgentId"] for p in posts}
+        handles = dict(self.conn.execute(
+            f"SELECT id, handle FROM agents WHERE id IN ({','.join('?' * len(authors))})", list(authors)
+        ).fetchall())
+        return [
+            {
+                **post,
+                "authorHandle": handles.get(post["authorAgentId"], "unknown"),
+                "interactions": sorted(by_post[post["id"]], key=cmp_to_key(_compare_interactions))
+            }
+            for post in posts
+        ]
+
+    def list_posts(self, limit: int = 5, author_agent_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Same result as `tools.list_posts` over HTTP: the last `limit` entries of the
+        newest-first post list (i.e. the oldest `limit` posts), newest first.
+        """
+        where, params = "", []
+        if author_agent_id:
+            where, params = "WHERE authorAgentId = ?", [author_agent_id]
+        rows = self.conn.execute(
+            f"SELECT * FROM posts {where} ORDER BY createdAt ASC LIMIT ?", params + [limit]
+        ).fetchall()
+        return self._enrich_posts([_row_to_post(r) for r in reversed(rows)])
+
+    def recent_activity(self, since: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Posts and interactions created at or after `since` (as `tools.recent_activity`);
+        each interaction carries its post's author as `postAuthorAgentId`.
+        """
+        posts = self.conn.execute("SELECT * FROM posts WHERE createdAt >= ? ORDER BY createdAt ASC", (since,)).fetchall()
+        rows = self.conn.execute("""
+            SELECT i.id, i.postId, i.actorAgentId, i.kind, i.debugText, i.createdAt, p.authorAgentId AS postAuthorAgentId
+            FROM interactions i
+            LEFT JOIN posts p ON p.id = i.postId
+            WHERE i.createdAt >= ?
+            ORDER BY i.createdAt ASC
+        """, (since,)).fetchall()
+        return {"posts": [_row_to_post(r) for r in posts], "interactions": [dict(r) for r in rows]}
+
+    def count(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute("SELECT * FROM agents ORDER BY createdAt DESC").fetchall()
+        return [_row_to_agent(r) for r in rows]
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM agents WHERE id = ?", (agent_id,)).fetchone()
+        return _row_to_agent(row) if row else None
+
+    def list_groups(self) -> List[Dict[str, Any]]:
+        """Groups (units) with their member IDs, newest first."""
+        members: Dict[str, List[str]] = {}
+        for row in self.conn.execute("SELECT unitId, agentId FROM unit_members"):
+            members.setdefault(row["unitId"], []).append(row["agentId"])
+        groups = []
+        for row in self.conn.execute("SELECT * FROM units ORDER BY createdAt DESC"):
+            group = {k: row[k] for k in ("id", "name", "slug", "description", "visibility")}
+            group["memberAgentIds"] = members.get(row["id"], [])
+            group["createdAt"] = row["createdAt"]
+            if row["inviteCode"]:
+                group["inviteCode"] = row["inviteCode"]
+            groups.append(group)
+        return groups
+
+    def agent_interactions(self, agent_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """An agent's most recent interactions, newest first (as GET /agent-interactions/agent/:id)."""
+        rows = self.conn.execute(
+            "SELECT * FROM agent_interactions WHERE agentId = ? ORDER BY timestamp DESC LIMIT ?",
+            (agent_id, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def agent_summaries(self, agent_id: str, level: Optional[str] = None, since: Optional[str] = None,
+                        limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        An agent's compacted summaries, oldest first (as GET
+        /agent-interactions/agent/:id/summaries): optionally one level, periods
+        starting at or after `since`, and only the most recent `limit`.
+        """
+        conditions, params = ["agentId = ?"], [agent_id]
+        if level:
+            conditions.append("level = ?")
+            params.append(level)
+        if since:
+            conditions.append("periodStart >= ?")
+            params.append(since)
+        query = f"SELECT * FROM agent_interaction_summaries WHERE {' AND '.join(conditions)}"
+        if limit is not None:
+            query = f"SELECT * FROM ({query} ORDER BY periodStart DESC, level DESC LIMIT ?)"
+            params.append(limit)
+        rows = self.conn.execute(f"{query} ORDER BY periodStart ASC, level ASC", params).fetchall()
+        return [dict(r) for r in rows]
+
+
+_reader: Optional[SQLiteReader] = None
+_reader_lock = threading.Lock()
+
+
+def get_reader() -> Optional[SQLiteReader]:
+    """The process-wide reader if UNIT_READ_BACKEND=sqlite, otherwise None (use HTTP)."""
+    global _reader
+    if READ_BACKEND != "sqlite":
+        return None
+    with _reader_lock:
+        if _reader is None:
+            _reader = SQLiteReader()
+        return _reader
@@ -0,0 +1,115 @@
+"""
+Termination policy: decide whether the agent should take another turn.
+
+Most iterations end in an obvious way (an autonomous reaction that just posted
+or acked something is done), so cheap rules over the tool outcomes, iteration
+count and prompt type decide first. Only when no rule applies does the
+summarizer fall back to asking the LLM judge.
+
+Rules are plain functions `rule(state) -> (continue, reason) | None` and can be
+added, removed or reordered per policy. Every decision is counted in metrics as
+`termination_decisions{path=<rule name or "llm">}`.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from metrics import metrics
+
+Decision = Tuple[bool, str]
+Rule = Callable[[Dict[str, Any]], Optional[Decision]]
+
+# Tools whose success means the agent did what it came to do
+WRITE_TOOLS = {"create_post", "ack_post", "debug_post"}
+READ_TOOLS = {"observe_product", "list_posts", "list_groups", "list_agents", "check_handle_availability"}
+
+# Stop once every action has failed for this many iterations in a row
+MAX_FAILED_ITERATIONS = 3
+
+
+def _outcomes(state: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    actions = state.get("actions") or [state.get("action") or {}]
+    results = state.get("results") or [state.get("result") or {}]
+    return [(a.get("tool", "none"), r if isinstance(r, dict) else {}) for a, r in zip(actions, results)]
+
+
+def _succeeded(result: Dict[str, Any]) -> bool:
+    return "error" not in result and not result.get("skipped")
+
+
+def _is_reaction(state: Dict[str, Any]) -> bool:
+    return state.get("prompt_type") == "autonomous"
+
+
+def write_completed(state: Dict[str, Any]) -> Optional[Decision]:
+    """An autonomous reaction that performed a write successfully is done."""
+    if not _is_reaction(state):
+        return None
+    done = [tool for tool, result in _outcomes(state) if tool in WRITE_TOOLS and _succeeded(result)]
+    if done:
+        return False, f"Reaction completed with {', '.join(done)}"
+    return None
+
+
+def nothing_planned(state: Dict[str, Any]) -> Optional[Decision]:
+    """The planner chose to do nothing."""
+    if all(tool == "none" for tool, _ in _outcomes(state)):
+        return False, "Planner chose no action"
+    return None
+
+
+def failure_streak(state: Dict[str, Any]) -> int:
+    """
+    Consecutive iterations, up to and including this one, in which every action
+    failed. The summarizer stores it in state as `failed_iterations`.
+    """
+    if any(_succeeded(r) for _, r in _outcomes(state)):
+        return 0
+    return state.get("failed_iterations", 0) + 1
+
+
+def repeated_failures(state: Dict[str, Any]) -> Optional[Decision]:
+    """Every action has failed for several iterations in a row; retrying again rarely helps."""
+    if state.get("failed_iterations", 0) >= MAX_FAILED_ITERATIONS:
+        return False, "Actions keep failing"
+    return None
+
+
+def only_browsed(state: Dict[str, Any]) -> Optional[Decision]:
+    """An autonomous reaction that has only read so far still has to act on what it saw."""
+    outcomes = _outcomes(state)
+    if state.get("prompt_type") == "autonomous" and outcomes \
+            and all(tool in READ_TOOLS and _succeeded(r) for tool, r in outcomes):
+        return True, "Only browsed so far; reaction not acted on yet"
+    return None
+
+
+DEFAULT_RULES: List[Rule] = [nothing_planned, write_completed, repeated_failures, only_browsed]
+
+
+class TerminationPolicy:
+    """Ordered rules; the first one returning a decision wins."""
+
+    def __init__(self, rules: Optional[List[Rule]] = None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+
+    def decide(self, state: Dict[str, Any]) -> Optional[Decision]:
+        """(continue, reason) from the first matching rule, or None to defer to the LLM judge."""
+        for rule in self.rules:
+            decision = rule(state)
+            if decision is not None:
+                metrics.incr("termination_decisions", path=rule.__name__)
+                return decision
+        metrics.incr("termination_decisions", path="llm")
+        return None
+
+
+def decision_counts() -> Dict[str, int]:
+    """How often each path (rule name or "llm") decided, from the process metrics."""
+    prefix = "termination_decisions{path="
+    return {
+        name[len(prefix):-1]: int(count)
+        for name, count in metrics.snapshot()["counters"].items()
+        if name.startswith(prefix)
+    }
+
+
+# Policy used by the summarizer
+policy = TerminationPolicy()
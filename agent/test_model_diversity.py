@@ -4,11 +4,12 @@ Test script to verify agent model diversity is working.
 
 import os
 from dotenv import load_dotenv
-from agent_manager import AgentHistory
 
-# Load environment variables
+# Load environment variables first: local modules read their settings when imported
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
+from agent_manager import AgentHistory
+
 def test_model_diversity():
     """Test that agents have different models assigned."""
     
@@ -0,0 +1,158 @@
+"""
+Token usage and cost accounting for LLM calls.
+
+Every chat completion made through `graph_agent._chat` is recorded here with
+its prompt, completion and cached tokens, latency and cost. Calls are summed
+into the collector of the current run (a contextvar, shared with executor
+worker threads), both per iteration and for the whole run. The summarizer saves
+each iteration's usage with its interaction and puts both roll-ups in the
+state as `usage` and `run_usage`.
+
+Costs use PRICES (USD per 1M tokens: input, cached input, output), which can
+be overridden or extended with MODEL_PRICES, e.g.
+    MODEL_PRICES='{"my-local-model": [0, 0, 0]}'
+Models without a price cost 0. Every call is also reported to the budget
+ledger (budget.py).
+"""
+import os
+import json
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from metrics import metrics
+from budget import ledger
+
+# USD per 1M tokens: (input, cached input, output)
+PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60)
+}
+
+
+def _load_prices():
+    raw = os.getenv("MODEL_PRICES")
+    if not raw:
+        return
+    try:
+        PRICES.update({model: tuple(float(p) for p in price) for model, price in json.loads(raw).items()})
+    except (ValueError, TypeError) as e:
+        print(f"⚠️  Ignoring invalid MODEL_PRICES: {e}")
+
+
+_load_prices()
+
+
+def cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """USD cost of one call; cached prompt tokens are billed at the cached-input rate."""
+    price = PRICES.get(model)
+    if price is None:
+        return 0.0
+    input_price, cached_price, output_price = price
+    return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + completion_tokens * output_price) / 1_000_000
+
+
+FIELDS = ("llmCalls", "promptTokens", "completionTokens", "cachedTokens", "latencyMs", "costUsd")
+
+
+class Usage:
+    """Summed usage of a set of LLM calls, in total and per model (camelCase keys, as stored)."""
+
+    def __init__(self):
+        self.by_model: Dict[str, Dict[str, float]] = {}
+
+    def add(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int,
+            latency: float, call_cost: float):
+        row = self.by_model.setdefault(model, dict.fromkeys(FIELDS, 0))
+        row["llmCalls"] += 1
+        row["promptTokens"] += prompt_tokens
+        row["completionTokens"] += completion_tokens
+        row["cachedTokens"] += cached_tokens
+        row["latencyMs"] += round(latency * 1000)
+        row["costUsd"] += call_cost
+
+    def totals(self) -> Dict[str, float]:
+        return {field: sum(row[field] for row in self.by_model.values()) for field in FIELDS}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.totals(), "byModel": {model: dict(row) for model, row in self.by_model.items()}}
+
+
+class UsageCollector:
+    """Usage of one run, with the current iteration's share kept separately."""
+
+    def __init__(self, agent_id: Optional[str] = None):
+        self.agent_id = agent_id
+        self.run = Usage()
+        self.iteration = Usage()
+        self._lock = threading.Lock()
+
+    def add(self, model: str, *args):
+        with self._lock:
+            self.run.add(model, *args)
+            self.iteration.add(model, *args)
+
+    def end_iteration(self) -> Dict[str, Any]:
+        """Usage since the previous call (i.e. of the iteration that just finished)."""
+        with self._lock:
+            usage, self.iteration = self.iteration, Usage()
+            return usage.to_dict()
+
+    def run_usage(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.run.to_dict()
+
+
+_current: contextvars.ContextVar[Optional[UsageCollector]] = contextvars.ContextVar("usage_collector", default=None)
+
+
+@contextmanager
+def collect(agent_id: Optional[str] = None) -> Iterator[UsageCollector]:
+    """Collect usage for a run, or join the run already being collected."""
+    collector = _current.get()
+    if collector is not None:
+        if agent_id and not collector.agent_id:
+            collector.agent_id = agent_id
+        yield collector
+        return
+    collector = UsageCollector(agent_id)
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[UsageCollector]:
+    return _current.get()
+
+
+def set_agent(agent_id: str):
+    """Attribute the rest of the run to `agent_id` (once a new agent has an identity)."""
+    collector = _current.get()
+    if collector is not None:
+        collector.agent_id = agent_id
+
+
+def record(node: str, model: str, usage: Any, latency: float) -> float:
+    """Account for one completion. Returns its cost in USD."""
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0
+    call_cost = cost(model, prompt_tokens, cached_tokens, completion_tokens)
+    metrics.incr("llm_cost_usd", call_cost, node=node, model=model)
+
+    collector = _current.get()
+    agent_id = None
+    if collector is not None:
+        collector.add(model, prompt_tokens, completion_tokens, cached_tokens, latency, call_cost)
+        agent_id = collector.agent_id
+    ledger.record(agent_id, model, call_cost)
+    return call_cost
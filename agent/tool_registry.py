@@ -0,0 +1,156 @@
+"""
+Registry of the platform tools the planner can call.
+
+JSON-schema tool definitions are generated from the function signatures in
+`tools.py` (parameter names, types and defaults), so the planner can use the
+API's native tool calling instead of a hand-written menu. Python parameter
+names are exposed to the model in camelCase (`post_id` -> `postId`), matching
+the backend's field names. The acting agent's own ID is never exposed; it is
+injected when the tool is invoked.
+"""
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Optional, get_type_hints
+import tools
+from tools import ToolError
+
+# Parameters filled in from the acting agent rather than chosen by the model
+IDENTITY_PARAMS = ("agent_id", "agent_a_id")
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+# Model-facing descriptions (tools.py docstrings are written for developers)
+TOOL_DESCRIPTIONS = {
+    "check_handle_availability": "Check if a handle is available. Use before create_agent_identity; handles must be unique.",
+    "create_agent_identity": "Create your identity on the platform. REQUIRED before anything else if you don't have one yet.",
+    "observe_product": "Get platform health, post/group counts, and a recent posts preview.",
+    "create_post": "Write a creative post (any topic, style, or perspective). The content is written in a follow-up step.",
+    "list_posts": "Browse recent posts, with their authors and ACK/FORK/DEBUG interactions.",
+    "list_groups": "Discover groups.",
+    "list_agents": "See other agents.",
+    "join_group": "Join a group.",
+    "ack_post": "Acknowledge (like) a post.",
+    "fork_post": "Fork/remix a post.",
+    "debug_post": "Leave a DEBUG comment (critique) on a post. Use @mentions to talk to other agents.",
+    "vote_on_debug": "Vote once on a DEBUG comment: 1 to upvote, 0 to downvote.",
+    "propose_merge": "Propose a collaboration with another agent.",
+}
+
+PARAM_DESCRIPTIONS = {
+    "handle": "Handle (unique username)",
+    "profile": "Creative, specific, interesting personality description (at least 20 characters)",
+    "limit": "Number of posts to return (1-5)",
+    "authorAgentId": "Only show posts by this agent ID",
+    "groupId": "ID of the group",
+    "inviteCode": "Invite code, if the group requires one",
+    "postId": "ID of the post",
+    "debugText": "Your comment",
+    "interactionId": "ID of the DEBUG interaction",
+    "vote": "0 to downvote, 1 to upvote",
+    "agentBId": "ID of the agent to collaborate with",
+    "pitch": "Your pitch for the collaboration",
+}
+
+PARAM_ENUMS = {"vote": [0, 1]}
+
+
+def camel_case(name: str) -> str:
+    """`author_agent_id` -> `authorAgentId`, `agent_b_id` -> `agentBId`."""
+    head, *rest = name.split("_")
+    return head + "".join(part[:1].upper() + part[1:] for part in rest)
+
+
+def _first_line(doc: Optional[str]) -> str:
+    return (inspect.cleandoc(doc).split("\n")[0] if doc else "").strip()
+
+
+class ToolSpec:
+    """A registered tool: its function, model-facing schema, and argument mapping."""
+
+    def __init__(self, name: str, func: Callable[..., Any], hidden: Iterable[str] = (),
+                 description: Optional[str] = None):
+        self.name = name
+        self.func = func
+        self.description = description or TOOL_DESCRIPTIONS.get(name) or _first_line(func.__doc__)
+        hidden = set(hidden)
+        hints = get_type_hints(func)
+        signature = inspect.signature(func)
+
+        self.identity_params = [p for p in IDENTITY_PARAMS if p in signature.parameters]
+        self.arg_names: Dict[str, str] = {}  # model param name -> Python param name
+        self.properties: Dict[str, Dict[str, Any]] = {}
+        self.required: List[str] = []
+        for param in signature.parameters.values():
+            if param.name in IDENTITY_PARAMS or param.name in hidden:
+                continue
+            key = camel_case(param.name)
+            self.arg_names[key] = param.name
+            prop: Dict[str, Any] = {"type": _JSON_TYPES.get(hints.get(param.name), "string")}
+            if key in PARAM_DESCRIPTIONS:
+                prop["description"] = PARAM_DESCRIPTIONS[key]
+            if key in PARAM_ENUMS:
+                prop["enum"] = PARAM_ENUMS[key]
+            self.properties[key] = prop
+            if param.default is inspect.Parameter.empty:
+                self.required.append(key)
+
+    def definition(self) -> Dict[str, Any]:
+        """OpenAI `tools=[...]` entry."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": self.properties,
+                    "required": self.required,
+                    "additionalProperties": False
+                }
+            }
+        }
+
+    def validate(self, params: Dict[str, Any]):
+        """Raise ToolError if a required parameter is missing."""
+        missing = [key for key in self.required if params.get(key) in (None, "")]
+        if missing:
+            raise ToolError(f"Missing {', '.join(missing)} for {self.name}")
+
+    def invoke(self, params: Dict[str, Any], agent_id: Optional[str] = None) -> Any:
+        """Validate and call the underlying function, injecting the acting agent's ID."""
+        self.validate(params)
+        kwargs = {self.arg_names[k]: v for k, v in params.items() if k in self.arg_names}
+        if self.identity_params and not agent_id:
+            raise ToolError("You must create an agent identity first")
+        for name in self.identity_params:
+            kwargs[name] = agent_id
+        return self.func(**kwargs)
+
+
+REGISTRY: Dict[str, ToolSpec] = {}
+
+
+def register(name: str, func: Callable[..., Any], **kwargs) -> ToolSpec:
+    spec = ToolSpec(name, func, **kwargs)
+    REGISTRY[name] = spec
+    return spec
+
+
+for _name in TOOL_DESCRIPTIONS:
+    if _name == "create_post":
+        # Content is generated by a dedicated LLM call, not chosen while planning
+        register(_name, tools.create_post, hidden=("content", "post_type"))
+    else:
+        register(_name, getattr(tools, _name))
+
+
+def tool_definitions(exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """Definitions for every registered tool not in `exclude`."""
+    exclude = set(exclude)
+    return [spec.definition() for name, spec in REGISTRY.items() if name not in exclude]
+
+
+def get_tool(name: str) -> ToolSpec:
+    spec = REGISTRY.get(name)
+    if spec is None:
+        raise ToolError(f"Unknown tool: {name}")
+    return spec
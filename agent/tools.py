@@ -1,18 +1,75 @@
 import os
+import time
 import requests
 from typing import Any, Dict, List
+from sqlite_reader import get_reader
+from platform_mirror import get_mirror
+from metrics import metrics
+from circuit_breaker import backend_request, CircuitOpenError
+import tracing
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
 
 class ToolError(Exception):
     pass
 
+def _http(method: str, path: str, endpoint: str = None, **kwargs) -> requests.Response:
+    """
+    Send one request to the backend, recording latency (`http_latency`) and
+    status class (`http_requests`) per endpoint. `endpoint` is the route
+    template used as the metrics label, e.g. "POST /posts/:id/interactions/ack".
+    """
+    endpoint = endpoint or f"{method} {path}"
+    with tracing.span(f"HTTP {endpoint}", endpoint=endpoint) as span:
+        started = time.perf_counter()
+        try:
+            r = backend_request(method, f"{BACKEND_URL}{path}", **kwargs)
+        except CircuitOpenError:
+            metrics.incr("http_requests", endpoint=endpoint, status="circuit_open")
+            raise
+        except requests.RequestException:
+            metrics.incr("http_requests", endpoint=endpoint, status="error")
+            raise
+        metrics.observe("http_latency", time.perf_counter() - started, endpoint=endpoint)
+        metrics.incr("http_requests", endpoint=endpoint, status=f"{r.status_code // 100}xx")
+        span.set(status_code=r.status_code)
+        if r.status_code >= 400:
+            span.fail(f"HTTP {r.status_code}")
+    return r
+
+def _local_reader():
+    """Shared in-process mirror or direct SQLite reader if enabled; None means read over HTTP."""
+    return get_mirror() or get_reader()
+
+def _wrote(result: Any) -> Any:
+    """Make the next mirrored read pick up a write this process just made."""
+    mirror = get_mirror()
+    if mirror:
+        mirror.invalidate()
+    return result
+
+def check_health(timeout: float = None) -> Dict[str, Any]:
+    """Backend health (GET /health)."""
+    r = _http("GET", "/health", timeout=timeout)
+    if not r.ok:
+        raise ToolError(f"Backend unhealthy: {r.status_code}")
+    return r.json()
+
 def observe_product() -> Dict[str, Any]:
     """Fetch high-level product snapshot (health + version + counts)."""
-    health = requests.get(f"{BACKEND_URL}/health").json()
-    version = requests.get(f"{BACKEND_URL}/__version").json()
-    posts = requests.get(f"{BACKEND_URL}/posts").json()
-    groups = requests.get(f"{BACKEND_URL}/groups").json()
+    health = _http("GET", "/health").json()
+    version = _http("GET", "/__version").json()
+    reader = _local_reader()
+    if reader:
+        return {
+            "health": health,
+            "version": version,
+            "postCount": reader.count("posts"),
+            "groupCount": reader.count("units"),
+            "recentPostsPreview": reader.list_posts(limit=3)
+        }
+    posts = _http("GET", "/posts").json()
+    groups = _http("GET", "/units").json()
     return {
         "health": health,
         "version": version,
@@ -23,29 +80,60 @@ def observe_product() -> Dict[str, Any]:
 
 def list_posts(limit: int = 5, author_agent_id: str = None) -> List[Dict[str, Any]]:
     """List posts, optionally filtered by author agent ID."""
+    reader = _local_reader()
+    if reader:
+        return reader.list_posts(limit, author_agent_id)
     params = {}
     if author_agent_id:
         params['authorAgentId'] = author_agent_id
     
-    posts = requests.get(f"{BACKEND_URL}/posts", params=params).json()
+    posts = _http("GET", "/posts", params=params).json()
     if not isinstance(posts, list):
         raise ToolError("Unexpected posts response shape")
     return posts[-limit:]
 
+def get_post(post_id: str) -> Dict[str, Any]:
+    """One post with its interactions."""
+    r = _http("GET", f"/posts/{post_id}", "GET /posts/:id")
+    if not r.ok:
+        raise ToolError(f"Failed to get post: {r.status_code}")
+    return r.json()
+
+def recent_activity(since: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Posts and interactions created at or after `since` (ISO timestamp), oldest
+    first, from the change feed rather than the full enriched post list.
+    Interactions carry their post's author as `postAuthorAgentId` where known
+    (over HTTP only for posts that are themselves in the result).
+    """
+    reader = _local_reader()
+    if reader:
+        return reader.recent_activity(since)
+    r = _http("GET", "/activity-log/changes", params={"since": since})
+    if not r.ok:
+        raise ToolError(f"Failed to read recent activity: {r.status_code}")
+    changes = r.json()
+    authors = {p["id"]: p["authorAgentId"] for p in changes["posts"]}
+    interactions = [{**i, "postAuthorAgentId": authors.get(i["postId"])} for i in changes["interactions"]]
+    return {"posts": changes["posts"], "interactions": interactions}
+
 def create_post(agent_id: str, content: str, post_type: str = "PROMPT_BRAG") -> Dict[str, Any]:
     payload = {
         "authorAgentId": agent_id,
         "type": post_type,
         "content": content
     }
-    r = requests.post(f"{BACKEND_URL}/posts", json=payload)
+    r = _http("POST", "/posts", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to create post: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def list_groups() -> List[Dict[str, Any]]:
     """List all groups on the platform."""
-    r = requests.get(f"{BACKEND_URL}/groups")
+    reader = _local_reader()
+    if reader:
+        return reader.list_groups()
+    r = _http("GET", "/units")
     if not r.ok:
         raise ToolError(f"Failed to list groups: {r.status_code}")
     return r.json()
@@ -53,14 +141,17 @@ def list_groups() -> List[Dict[str, Any]]:
 def join_group(agent_id: str, group_id: str, invite_code: str = "") -> Dict[str, Any]:
     """Join a group (provide inviteCode if required)."""
     payload = {"agentId": agent_id, "inviteCode": invite_code}
-    r = requests.post(f"{BACKEND_URL}/groups/{group_id}/join", json=payload)
+    r = _http("POST", f"/units/{group_id}/join", "POST /units/:id/join", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to join group: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def list_agents() -> List[Dict[str, Any]]:
     """List all agents on the platform."""
-    r = requests.get(f"{BACKEND_URL}/agents")
+    reader = _local_reader()
+    if reader:
+        return reader.list_agents()
+    r = _http("GET", "/agents")
     if not r.ok:
         raise ToolError(f"Failed to list agents: {r.status_code}")
     return r.json()
@@ -68,44 +159,45 @@ def list_agents() -> List[Dict[str, Any]]:
 def ack_post(agent_id: str, post_id: str) -> Dict[str, Any]:
     """Acknowledge a post (interaction)."""
     payload = {"actorAgentId": agent_id}
-    r = requests.post(f"{BACKEND_URL}/posts/{post_id}/interactions/ack", json=payload)
+    r = _http("POST", f"/posts/{post_id}/interactions/ack", "POST /posts/:id/interactions/ack", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to ACK post: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def fork_post(agent_id: str, post_id: str) -> Dict[str, Any]:
     """Fork a post (interaction)."""
     payload = {"actorAgentId": agent_id}
-    r = requests.post(f"{BACKEND_URL}/posts/{post_id}/interactions/fork", json=payload)
+    r = _http("POST", f"/posts/{post_id}/interactions/fork", "POST /posts/:id/interactions/fork", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to FORK post: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def debug_post(agent_id: str, post_id: str, debug_text: str) -> Dict[str, Any]:
     """Leave a debug comment on a post."""
     payload = {"actorAgentId": agent_id, "debugText": debug_text}
-    r = requests.post(f"{BACKEND_URL}/posts/{post_id}/interactions/debug", json=payload)
+    r = _http("POST", f"/posts/{post_id}/interactions/debug", "POST /posts/:id/interactions/debug", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to DEBUG post: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def vote_on_debug(agent_id: str, post_id: str, interaction_id: str, vote: int) -> Dict[str, Any]:
     """Vote on a DEBUG comment. Vote 0 to downvote, 1 to upvote. Can only vote once per DEBUG."""
     if vote not in [0, 1]:
         raise ToolError("vote must be 0 (downvote) or 1 (upvote)")
     payload = {"agentId": agent_id, "vote": vote}
-    r = requests.post(f"{BACKEND_URL}/posts/{post_id}/interactions/{interaction_id}/vote", json=payload)
+    r = _http("POST", f"/posts/{post_id}/interactions/{interaction_id}/vote",
+              "POST /posts/:id/interactions/:interactionId/vote", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to vote on DEBUG: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def propose_merge(agent_a_id: str, agent_b_id: str, pitch: str) -> Dict[str, Any]:
     """Propose a merge collaboration between two agents."""
     payload = {"agentAId": agent_a_id, "agentBId": agent_b_id, "pitch": pitch}
-    r = requests.post(f"{BACKEND_URL}/merge/propose", json=payload)
+    r = _http("POST", "/merge/propose", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to propose merge: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
 
 def check_handle_availability(handle: str) -> Dict[str, Any]:
     """
@@ -118,7 +210,12 @@ def check_handle_availability(handle: str) -> Dict[str, Any]:
         Dict with 'available' (bool) and 'existingAgent' (if not available)
     """
     try:
-        agents = list_agents()
+        mirror = get_mirror()
+        if mirror:
+            found = mirror.find_agent_by_handle(handle)
+            agents = [found] if found else []
+        else:
+            agents = list_agents()
         for agent in agents:
             if agent.get('handle', '').lower() == handle.lower():
                 return {
@@ -160,6 +257,10 @@ def create_agent_identity(handle: str, profile: str) -> Dict[str, Any]:
     available_models = ["gpt-4o-mini", "gpt-4.1-nano", "gpt-5-mini", "gpt-5-nano"]
     llm_model = random.choice(available_models)
     
+    return register_agent(handle, profile, llm_model)
+
+def register_agent(handle: str, profile: str, llm_model: str) -> Dict[str, Any]:
+    """Create an agent record without the handle availability check (bulk/synthetic setup)."""
     payload = {
         "handle": handle,
         "profile": profile,
@@ -167,7 +268,15 @@ def create_agent_identity(handle: str, profile: str) -> Dict[str, Any]:
         "parameterCount": 1000000,
         "llmModel": llm_model
     }
-    r = requests.post(f"{BACKEND_URL}/agents", json=payload)
+    r = _http("POST", "/agents", json=payload)
     if not r.ok:
         raise ToolError(f"Failed to create agent identity: {r.status_code} {r.text}")
-    return r.json()
+    return _wrote(r.json())
+
+def create_group(name: str, slug: str, description: str, visibility: str = "OPEN") -> Dict[str, Any]:
+    """Create a group (unit)."""
+    payload = {"name": name, "slug": slug, "description": description, "visibility": visibility}
+    r = _http("POST", "/units", json=payload)
+    if not r.ok:
+        raise ToolError(f"Failed to create group: {r.status_code} {r.text}")
+    return _wrote(r.json())
@@ -0,0 +1,251 @@
+"""
+Span-based tracing of agent runs, exported as local JSON files.
+
+A run traced end to end looks like:
+    run_autonomous
+    ├── HTTP GET /posts
+    ├── generate_autonomous_prompt ── llm autonomous_prompt
+    └── run_multi
+        ├── plan ── llm plan
+        ├── execute ── tool create_post ── llm write_post, HTTP POST /posts
+        └── summarize ── llm continue, llm summarize, history.save
+
+`trace(name)` starts a new trace, unless one is already active, in which case
+it opens a child span. A new trace is recorded with probability
+TRACE_SAMPLE_RATE (default 0, i.e. off). `span(name)` and `@traced(name)` open a
+child span of the active trace and do nothing when there is none, so
+instrumented code costs almost nothing in unsampled runs. The current span
+lives in a contextvar; use `wrap(fn)` to carry it into worker threads.
+
+Each finished trace is written to TRACE_DIR (default: traces/) in
+TRACE_FORMAT: "chrome" (open in chrome://tracing or Perfetto) or "otlp"
+(OTLP/JSON, accepted by OpenTelemetry collectors and Jaeger).
+"""
+import os
+import json
+import time
+import random
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+TRACE_FORMAT = os.getenv("TRACE_FORMAT", "chrome")  # "chrome" or "otlp"
+SERVICE_NAME = "unit-agent"
+
+FORMATS = ("chrome", "otlp")
+
+
+class Span:
+    """One timed operation with attributes, inside a trace."""
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.thread_id = threading.get_native_id()
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error: Any):
+        self.status = "error"
+        self.error = str(error)
+
+    def finish(self):
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._started)
+        self.trace.add(self)
+
+
+class _NoopSpan:
+    """Stand-in when the run isn't traced."""
+
+    def set(self, **attributes):
+        pass
+
+    def fail(self, error: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """The finished spans of one traced run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def configure(sample_rate: Optional[float] = None, directory: Optional[str] = None, fmt: Optional[str] = None):
+    """Override the TRACE_* settings for this process (e.g. from command-line flags)."""
+    global SAMPLE_RATE, TRACE_DIR, TRACE_FORMAT
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError(f"Unknown trace format '{fmt}' (choose from {', '.join(FORMATS)})")
+    if sample_rate is not None:
+        SAMPLE_RATE = sample_rate
+    if directory is not None:
+        TRACE_DIR = directory
+    if fmt is not None:
+        TRACE_FORMAT = fmt
+
+
+def current_span():
+    """The active span, or a no-op span outside a traced run."""
+    return _current.get() or NOOP_SPAN
+
+
+@contextmanager
+def _run(span: Span) -> Iterator[Span]:
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.finish()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """Child span of the active trace; a no-op when nothing is being traced."""
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    with _run(Span(name, parent.trace, parent.span_id, attributes)) as s:
+        yield s
+
+
+@contextmanager
+def trace(name: str, **attributes) -> Iterator[Any]:
+    """Start a sampled trace (exported when it ends), or a child span if a trace is already active."""
+    if _current.get() is not None:
+        with span(name, **attributes) as s:
+            yield s
+        return
+    if not SAMPLE_RATE or random.random() >= SAMPLE_RATE:
+        yield NOOP_SPAN
+        return
+    run = Trace(name)
+    try:
+        with _run(Span(name, run, None, attributes)) as s:
+            yield s
+    finally:
+        try:
+            export(run)
+        except OSError as e:
+            print(f"⚠️  Could not write trace: {e}")
+
+
+def traced(name: str, root: bool = False) -> Callable:
+    """Decorator: run the function in a span (`root=True`: start a trace if none is active)."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with (trace if root else span)(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def wrap(func: Callable) -> Callable:
+    """Bind `func` to the caller's context so spans opened in worker threads join this trace."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+
+# --- export ---
+
+def to_chrome(run: Trace) -> Dict[str, Any]:
+    """Chrome trace-event format: one complete ("X") event per span, timestamps in µs."""
+    pid = os.getpid()
+    events = []
+    for s in sorted(run.spans, key=lambda s: s.start_ns):
+        args = dict(s.attributes)
+        if s.status != "ok":
+            args.update(status=s.status, error=s.error)
+        events.append({
+            "name": s.name,
+            "cat": s.name.split(" ", 1)[0],
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": (s.end_ns - s.start_ns) / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": args
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"traceId": run.trace_id}}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(run: Trace) -> Dict[str, Any]:
+    """OTLP/JSON (ExportTraceServiceRequest) with one resource and scope."""
+    spans = []
+    for s in sorted(run.spans, key=lambda s: s.start_ns):
+        client = s.name.startswith(("HTTP ", "llm "))
+        span = {
+            "traceId": run.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 3 if client else 1,  # SPAN_KIND_CLIENT / SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error or ""} if s.status == "error" else {"code": 1}
+        }
+        if s.parent_id:
+            span["parentSpanId"] = s.parent_id
+        spans.append(span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "unit.agent"}, "spans": spans}]
+    }]}
+
+
+def export(run: Trace, directory: Optional[str] = None, fmt: Optional[str] = None) -> str:
+    """Write one finished trace to `directory` and return the file path."""
+    directory = directory or TRACE_DIR
+    fmt = fmt or TRACE_FORMAT
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = ".otlp.json" if fmt == "otlp" else ".json"
+    path = os.path.join(directory, f"{stamp}-{run.name}-{run.trace_id[:8]}{suffix}")
+    payload = to_otlp(run) if fmt == "otlp" else to_chrome(run)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    return path
@@ -1,45 +1,104 @@
 """
 Update all existing agents with rich, detailed personalities.
+
+Usage:
+    python agent/update_all_personalities.py
+    python agent/update_all_personalities.py --dry-run
+    python agent/update_all_personalities.py --concurrency 16 --rpm 500
+    python agent/update_all_personalities.py --batch   # offline Batch API, resumable
 """
 
 import os
-import requests
+import argparse
 from dotenv import load_dotenv
-from personality_generator import generate_rich_personality, get_existing_agents_for_diversity
 
-# Load environment variables
+# Load environment variables (before the local imports, which read settings such as BACKEND_URL)
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
+from personality_generator import (
+    DiversityPool, generate_rich_personality, parse_personality, personality_request_body
+)
+from batch_jobs import BatchJob, DEFAULT_POLL_INTERVAL, completion_content
+from rate_limiter import DEFAULT_RPM, set_rate_limit
+from bulk_runner import (
+    BulkRunner, fetch_all_agents, print_summary, DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY
+)
 
-def update_agent_profile(agent_id: str, new_profile: str):
-    """Update an agent's profile in the database."""
-    try:
-        # Use PATCH to update the agent
-        response = requests.patch(
-            f"{BACKEND_URL}/agents/{agent_id}",
-            json={"profile": new_profile}
-        )
-        if response.ok:
-            return True
-        else:
-            print(f"  ⚠️  Failed to update: {response.status_code} {response.text}")
-            return False
-    except Exception as e:
-        print(f"  ⚠️  Error updating agent: {e}")
-        return False
+def make_profile_builder(pool: DiversityPool):
+    """Build the per-agent update function around a shared diversity pool."""
+    def build_profile_update(agent):
+        """Generate a rich personality for one agent and return the profile update."""
+        personality = generate_rich_personality(pool, key=agent['id'])
+        return {"profile": personality['profile']}
+    return build_profile_update
+
+def make_batch_profile_builder(pool: DiversityPool, results):
+    """
+    Build the per-agent update function from batch results.
+    
+    Agents whose batch result failed or is too similar to the roster fall back
+    to synchronous generation.
+    """
+    def build_profile_update(agent):
+        result = results.get(agent['id'])
+        if result is not None:
+            try:
+                personality = parse_personality(completion_content(result))
+                accepted, match, score = pool.claim(agent['id'], personality['handle'], personality['profile'])
+                if accepted:
+                    return {"profile": personality['profile']}
+                print(f"   🔁 Batch profile for @{agent['handle']} too similar to @{match} ({score:.2f}), regenerating...")
+            except (RuntimeError, ValueError) as e:
+                print(f"   ⚠️  Batch result for @{agent['handle']} unusable ({e}), regenerating...")
+        personality = generate_rich_personality(pool, key=agent['id'])
+        return {"profile": personality['profile']}
+    return build_profile_update
+
+def run_batch(job: BatchJob, agents, poll_interval: float, dry_run: bool = False):
+    """
+    Submit (or resume) the batch job for `agents` and wait for its results.
+    
+    With dry_run, only write the request file (nothing is submitted or paid for).
+    """
+    count = job.prepare((agent['id'], personality_request_body()) for agent in agents)
+    if dry_run:
+        print(f"📦 Dry run: {count} requests written to {job.input_path} (not submitted)")
+        return {}
+    batch_id = job.submit()
+    print(f"📦 Batch {batch_id}: {count} requests submitted")
+    return job.wait(poll_interval=poll_interval)
 
 def main():
+    parser = argparse.ArgumentParser(description="Give agents with thin profiles a rich personality")
+    parser.add_argument("--dry-run", action="store_true", help="Generate profiles but don't save them")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Personalities generated in parallel (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Agents written per batch request (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM,
+                        help=f"Max LLM requests per minute across all workers (default: {DEFAULT_RPM})")
+    parser.add_argument("--reset-checkpoint", action="store_true",
+                        help="Ignore progress from previous runs")
+    parser.add_argument("--batch", action="store_true",
+                        help="Generate through the Batch API (cheaper, asynchronous) instead of live requests")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"Seconds between batch status checks (default: {DEFAULT_POLL_INTERVAL:g})")
+    parser.add_argument("--reset-batch", action="store_true",
+                        help="Discard a previously submitted batch and submit a new one")
+    args = parser.parse_args()
+    if args.rpm < 1:
+        parser.error("--rpm must be at least 1")
+    set_rate_limit(args.rpm)
+
     print("🎨 Updating all agents with rich personalities...")
     print("=" * 80)
     
     # Get all agents
-    response = requests.get(f"{BACKEND_URL}/agents")
-    if not response.ok:
-        print("❌ Failed to fetch agents")
+    try:
+        all_agents = fetch_all_agents()
+    except Exception as e:
+        print(f"❌ Failed to fetch agents: {e}")
         return
-    
-    all_agents = response.json()
     print(f"\n📊 Found {len(all_agents)} agents in database")
     
     # Filter agents that need updates
@@ -52,46 +111,42 @@ def main():
         print("🎉 All agents already have rich personalities!")
         return
     
-    # Track updated profiles
-    updated_count = 0
-    failed = []
+    # Index the roster once; the pool is updated locally as profiles are generated
+    pool = DiversityPool(all_agents)
+    
+    runner = BulkRunner(
+        "update_all_personalities",
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run
+    )
+    if args.reset_checkpoint:
+        runner.reset_checkpoint()
     
-    for i, agent in enumerate(agents_to_update, 1):
-        agent_id = agent['id']
-        handle = agent['handle']
-        
-        print(f"\n[{i}/{len(agents_to_update)}] @{handle}")
-        print(f"   🎲 Generating rich personality... ", end='', flush=True)
-        
-        # Get 5-10 existing agents for diversity checking
-        existing_for_diversity = get_existing_agents_for_diversity(10)
-        
+    if args.batch:
+        # Agents already applied in an earlier run are skipped by the checkpoint,
+        # so a resumed job never re-applies (or re-requests) their profiles
+        done = runner.load_checkpoint()
+        pending = [a for a in agents_to_update if a['id'] not in done]
+        job = BatchJob("update_all_personalities")
+        if args.reset_batch:
+            job.reset()
         try:
-            personality = generate_rich_personality(existing_for_diversity)
-            new_profile = personality['profile']
-            
-            print(f"✓ ({len(new_profile)} chars)")
-            print(f"   📝 Preview: {new_profile[:80]}...")
-            
-            # Update the agent
-            print(f"   💾 Saving to database... ", end='', flush=True)
-            if update_agent_profile(agent_id, new_profile):
-                print(f"✓")
-                updated_count += 1
-            else:
-                print(f"✗")
-                failed.append(handle)
-                
+            results = run_batch(job, pending, args.poll_interval, dry_run=args.dry_run) if pending else {}
         except Exception as e:
-            print(f"✗")
-            print(f"   ❌ Error: {e}")
-            failed.append(handle)
+            print(f"❌ Batch job failed: {e}")
+            return
+        if args.dry_run:
+            return
+        builder = make_batch_profile_builder(pool, results)
+    else:
+        builder = make_profile_builder(pool)
+    result = runner.run(agents_to_update, builder)
+    print_summary(result, dry_run=args.dry_run)
     
-    print("\n" + "=" * 80)
-    print(f"\n🎉 Update complete!")
-    print(f"   ✅ Successfully updated: {updated_count} agents")
-    if failed:
-        print(f"   ❌ Failed: {len(failed)} agents ({', '.join(failed)})")
+    # Every result is applied: don't hand this batch to the next run
+    if args.batch and not result.failed:
+        job.reset()
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,17 @@
 """
 View an agent's complete interaction history in a readable format.
 
+Interactions are streamed from the `agent_interactions` table page by page
+(see export_history.py), so even very long histories print in constant memory.
+
 Usage:
     python agent/view_history.py <agent-id>
+    python agent/view_history.py <agent-id> --source sqlite
 """
-import sys
-import json
+import argparse
 from datetime import datetime
+import requests
+from export_history import BACKEND_URL, DEFAULT_DB_PATH, connect_readonly, iter_interactions
 
 
 def format_timestamp(ts):
@@ -25,39 +30,48 @@ def truncate(text, max_length=100):
     return text[:max_length] + "..."
 
 
-def view_history(agent_id):
-    """Display an agent's complete history in a readable format."""
-    filepath = f"agent/agent_histories/{agent_id}.json"
-    
+def _load_agent(agent_id, source="api", db_path=DEFAULT_DB_PATH):
+    """Fetch the agent record from the backend API or the SQLite file."""
+    if source == "sqlite":
+        conn = connect_readonly(db_path)
+        try:
+            row = conn.execute("SELECT * FROM agents WHERE id = ?", (agent_id,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    response = requests.get(f"{BACKEND_URL}/agents/{agent_id}")
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def view_history(agent_id, source="api", db_path=DEFAULT_DB_PATH):
+    """Display an agent's complete history in a readable format, streaming page by page."""
     try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ No history found for agent ID: {agent_id}")
+        agent_data = _load_agent(agent_id, source, db_path)
+    except Exception as e:
+        print(f"❌ Could not load agent {agent_id}: {e}")
         return
-    except json.JSONDecodeError:
-        print(f"❌ Invalid JSON in history file: {filepath}")
+    if not agent_data:
+        print(f"❌ No agent found for ID: {agent_id}")
         return
     
     # Header
     print("=" * 80)
-    print(f"AGENT HISTORY: {data['agent_data']['handle']}")
+    print(f"AGENT HISTORY: {agent_data['handle']}")
     print("=" * 80)
-    print(f"Agent ID: {data['agent_id']}")
-    print(f"Created: {format_timestamp(data['created_at'])}")
-    print(f"Updated: {format_timestamp(data['updated_at'])}")
-    print(f"Total Interactions: {len(data['interactions'])}")
+    print(f"Agent ID: {agent_data['id']}")
+    print(f"Created: {format_timestamp(agent_data['createdAt'])}")
+    print(f"Updated: {format_timestamp(agent_data['updatedAt'])}")
     print("=" * 80)
     
-    if not data['interactions']:
-        print("\nNo interactions recorded yet.")
-        return
-    
     # Group interactions by prompt
     current_prompt = None
     run_number = 0
+    total = 0
     
-    for idx, interaction in enumerate(data['interactions'], 1):
+    for interaction in iter_interactions(source=source, db_path=db_path, agent_id=agent_id):
+        total += 1
         prompt = interaction.get('prompt', '')
         
         # New run detected
@@ -73,12 +87,16 @@ def view_history(agent_id):
         
         # Display iteration details
         iteration = interaction.get('iteration', 0)
-        action = interaction.get('action', {})
+        action = interaction.get('action') or {}
+        if not isinstance(action, dict):
+            action = {}
         tool = action.get('tool', 'none')
         params = action.get('params', {})
-        result = interaction.get('result', {})
-        reasoning = interaction.get('reasoning', 'No reasoning provided')
-        final = interaction.get('final', '')
+        result = interaction.get('result') or {}
+        if not isinstance(result, dict):
+            result = {}
+        reasoning = interaction.get('reasoning') or 'No reasoning provided'
+        final = interaction.get('final') or ''
         
         print(f"\n  📍 Iteration {iteration}")
         print(f"  ┌─ Reasoning: {truncate(reasoning, 120)}")
@@ -110,15 +128,21 @@ def view_history(agent_id):
         
         print(f"  └─ Summary: {truncate(final, 120)}")
     
+    if total == 0:
+        print("\nNo interactions recorded yet.")
+        return
+    
     print(f"\n{'='*80}")
-    print(f"End of history for {data['agent_data']['handle']}")
+    print(f"End of history for {agent_data['handle']} ({total} interaction(s))")
     print(f"{'='*80}\n")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python agent/view_history.py <agent-id>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="View an agent's interaction history")
+    parser.add_argument("agent_id", help="ID of the agent to display")
+    parser.add_argument("--source", choices=["api", "sqlite"], default="api",
+                        help="Read via the backend API (default) or directly from SQLite")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the backend SQLite file (with --source sqlite)")
+    args = parser.parse_args()
     
-    agent_id = sys.argv[1]
-    view_history(agent_id)
+    view_history(args.agent_id, source=args.source, db_path=args.db)
@@ -9,6 +9,10 @@ export const db = new Database(dbPath);
 // Enable foreign keys
 db.pragma('foreign_keys = ON');
 
+// WAL lets co-located agents read the file directly (agent/sqlite_reader.py)
+// without blocking writes
+db.pragma('journal_mode = WAL');
+
 // Migration function to convert old schema to new schema
 function migrateGroupsToUnits() {
   // Check if old tables exist
@@ -152,6 +156,29 @@ function migrateLlmModelColumn() {
   }
 }
 
+// Migration function to add LLM usage columns to agent_interactions
+function migrateInteractionUsageColumns() {
+  const columns = db.prepare("PRAGMA table_info(agent_interactions)").all() as { name: string }[];
+  const usageColumns: [string, string][] = [
+    ['llmCalls', 'INTEGER'],
+    ['promptTokens', 'INTEGER'],
+    ['completionTokens', 'INTEGER'],
+    ['cachedTokens', 'INTEGER'],
+    ['llmLatencyMs', 'INTEGER'],
+    ['costUsd', 'REAL'],
+    ['usageByModel', 'TEXT']
+  ];
+  const missing = usageColumns.filter(([name]) => !columns.some(col => col.name === name));
+
+  if (missing.length > 0) {
+    console.log('🔄 Adding LLM usage columns to agent_interactions table...');
+    for (const [name, type] of missing) {
+      db.exec(`ALTER TABLE agent_interactions ADD COLUMN ${name} ${type}`);
+    }
+    console.log(`  ✓ Added ${missing.map(([name]) => name).join(', ')}`);
+  }
+}
+
 // Create tables
 export function initializeDatabase() {
   // Run migration first
@@ -243,6 +270,27 @@ export function initializeDatabase() {
       action TEXT NOT NULL,
       result TEXT NOT NULL,
       final TEXT,
+      llmCalls INTEGER,
+      promptTokens INTEGER,
+      completionTokens INTEGER,
+      cachedTokens INTEGER,
+      llmLatencyMs INTEGER,
+      costUsd REAL,
+      usageByModel TEXT, -- JSON object: model -> usage
+      FOREIGN KEY (agentId) REFERENCES agents(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS agent_interaction_summaries (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      agentId TEXT NOT NULL,
+      level TEXT NOT NULL CHECK(level IN ('daily', 'weekly')),
+      periodStart TEXT NOT NULL,
+      periodEnd TEXT NOT NULL,
+      interactionCount INTEGER NOT NULL,
+      summary TEXT NOT NULL,
+      stats TEXT, -- JSON object
+      createdAt TEXT NOT NULL,
+      UNIQUE (agentId, level, periodStart),
       FOREIGN KEY (agentId) REFERENCES agents(id) ON DELETE CASCADE
     );
 
@@ -262,14 +310,17 @@ export function initializeDatabase() {
     CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(createdAt);
     CREATE INDEX IF NOT EXISTS idx_interactions_post ON interactions(postId);
     CREATE INDEX IF NOT EXISTS idx_interactions_actor ON interactions(actorAgentId);
+    CREATE INDEX IF NOT EXISTS idx_interactions_created ON interactions(createdAt);
     CREATE INDEX IF NOT EXISTS idx_unit_members_agent ON unit_members(agentId);
     CREATE INDEX IF NOT EXISTS idx_agent_interactions_agent ON agent_interactions(agentId);
     CREATE INDEX IF NOT EXISTS idx_agent_interactions_timestamp ON agent_interactions(timestamp);
     CREATE INDEX IF NOT EXISTS idx_interaction_votes_interaction ON interaction_votes(interactionId);
+    CREATE INDEX IF NOT EXISTS idx_agent_interaction_summaries_agent ON agent_interaction_summaries(agentId, level, periodStart);
   `);
   
   // Run additional migrations after tables are created
   migrateLlmModelColumn();
+  migrateInteractionUsageColumns();
 
   console.log('✅ Database initialized');
 }
@@ -464,6 +515,12 @@ export const agentDb = {
     return stmt.all().map(rowToAgent);
   },
 
+  // Agents created or updated at or after `since` (ISO timestamp)
+  findUpdatedSince: (since: string): Agent[] => {
+    const stmt = db.prepare('SELECT * FROM agents WHERE updatedAt >= ? ORDER BY createdAt ASC');
+    return stmt.all(since).map(rowToAgent);
+  },
+
   update: (id: string, updater: (a: Agent) => void): Agent | undefined => {
     const agent = agentDb.findById(id);
     if (!agent) return undefined;
@@ -479,6 +536,19 @@ export const agentDb = {
     `);
     stmt.run(agentToRow(agent));
     return agent;
+  },
+
+  // Apply many updates in a single transaction; returns the agents that were found and updated
+  updateMany: (updates: Array<{ id: string; updater: (a: Agent) => void }>): Agent[] => {
+    const transaction = db.transaction(() => {
+      const updated: Agent[] = [];
+      for (const { id, updater } of updates) {
+        const agent = agentDb.update(id, updater);
+        if (agent) updated.push(agent);
+      }
+      return updated;
+    });
+    return transaction();
   }
 };
 
@@ -499,6 +569,11 @@ export const postDb = {
     return row ? rowToPost(row) : undefined;
   },
 
+  findCreatedSince: (since: string): Post[] => {
+    const stmt = db.prepare('SELECT * FROM posts WHERE createdAt >= ? ORDER BY createdAt ASC');
+    return stmt.all(since).map(rowToPost);
+  },
+
   findAll: (filters?: { authorAgentId?: string; groupId?: string }): Post[] => {
     let query = 'SELECT * FROM posts';
     const conditions: string[] = [];
@@ -544,6 +619,11 @@ export const interactionDb = {
   findAll: (): Interaction[] => {
     const stmt = db.prepare('SELECT * FROM interactions ORDER BY createdAt ASC');
     return stmt.all().map(rowToInteraction);
+  },
+
+  findCreatedSince: (since: string): Interaction[] => {
+    const stmt = db.prepare('SELECT * FROM interactions WHERE createdAt >= ? ORDER BY createdAt ASC');
+    return stmt.all(since).map(rowToInteraction);
   }
 };
 
@@ -599,6 +679,17 @@ export const unitDb = {
     return units;
   },
 
+  // Units created at or after `since`, without members (see findMembersJoinedSince)
+  findCreatedSince: (since: string): Unit[] => {
+    const stmt = db.prepare('SELECT * FROM units WHERE createdAt >= ? ORDER BY createdAt ASC');
+    return stmt.all(since).map(rowToUnit);
+  },
+
+  findMembersJoinedSince: (since: string): Array<{ unitId: string, agentId: string, joinedAt: string }> => {
+    const stmt = db.prepare('SELECT unitId, agentId, joinedAt FROM unit_members WHERE joinedAt >= ? ORDER BY joinedAt ASC');
+    return stmt.all(since) as Array<{ unitId: string, agentId: string, joinedAt: string }>;
+  },
+
   addMember: (unitId: string, agentId: string) => {
     const stmt = db.prepare(`
       INSERT INTO unit_members (unitId, agentId, joinedAt)
@@ -688,6 +779,15 @@ export const voteDb = {
       WHERE interactionId = ?
     `);
     return stmt.all(interactionId) as Array<{ voterAgentId: string, vote: number }>;
+  },
+
+  findCreatedSince: (since: string): Array<{ interactionId: string, voterAgentId: string, vote: number, createdAt: string }> => {
+    const stmt = db.prepare(`
+      SELECT interactionId, voterAgentId, vote, createdAt FROM interaction_votes
+      WHERE createdAt >= ?
+      ORDER BY createdAt ASC
+    `);
+    return stmt.all(since) as Array<{ interactionId: string, voterAgentId: string, vote: number, createdAt: string }>;
   }
 };
 
@@ -16,6 +16,16 @@ export const updateAgentStatusSchema = z.object({
   apiStatus: z.nativeEnum(ApiStatus)
 });
 
+export const bulkUpdateAgentsSchema = z.object({
+  updates: z.array(z.object({
+    id: z.string(),
+    profile: z.string().optional(),
+    llmModel: z.string().optional()
+  }).refine(u => u.profile !== undefined || u.llmModel !== undefined, {
+    message: 'profile or llmModel is required'
+  })).min(1).max(500)
+});
+
 export const createPostSchema = z.object({
   authorAgentId: z.string().uuid(),
   type: z.nativeEnum(PostType),
@@ -74,6 +84,7 @@ export const joinUnitSchema = z.object({
 
 export type CreateAgentInput = z.infer<typeof createAgentSchema>;
 export type UpdateAgentStatusInput = z.infer<typeof updateAgentStatusSchema>;
+export type BulkUpdateAgentsInput = z.infer<typeof bulkUpdateAgentsSchema>;
 export type CreatePostInput = z.infer<typeof createPostSchema>;
 export type InteractionAckForkInput = z.infer<typeof interactionAckForkSchema>;
 export type InteractionDebugInput = z.infer<typeof interactionDebugSchema>;
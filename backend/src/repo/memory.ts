@@ -31,6 +31,10 @@ export const updateAgent = (id: string, updater: (a: Agent) => void) => {
   return agentDb.update(id, updater);
 };
 
+export const updateAgents = (updates: Array<{ id: string; updater: (a: Agent) => void }>) => {
+  return agentDb.updateMany(updates);
+};
+
 export const updateMergeStatus = (id: string, status: MergeStatus) => {
   return mergeDb.updateStatus(id, status);
 };
@@ -1,5 +1,6 @@
 import { Router, Request, Response } from 'express';
 import { memory } from '../repo/memory';
+import { agentDb, interactionDb, postDb, unitDb, voteDb } from '../db/sqlite';
 
 const router = Router();
 
@@ -11,6 +12,24 @@ interface ActivityLogEntry {
   metadata?: Record<string, any>;
 }
 
+// Full records changed at or after `since` (ISO timestamp; omit to get everything), so
+// clients can mirror platform state and apply deltas instead of re-downloading it.
+// Pass the returned `cursor` as the next `since`; records at the boundary may repeat.
+router.get('/changes', (req: Request, res: Response) => {
+  const since = (req.query.since as string) || '';
+  // Taken before querying: anything written later has a timestamp >= cursor
+  const cursor = new Date().toISOString();
+  res.json({
+    cursor,
+    agents: agentDb.findUpdatedSince(since),
+    posts: postDb.findCreatedSince(since),
+    interactions: interactionDb.findCreatedSince(since),
+    units: unitDb.findCreatedSince(since),
+    memberships: unitDb.findMembersJoinedSince(since),
+    votes: voteDb.findCreatedSince(since)
+  });
+});
+
 // Get all activity log entries
 router.get('/', (req: Request, res: Response) => {
   const limit = parseInt(req.query.limit as string) || 100;
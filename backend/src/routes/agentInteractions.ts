@@ -3,19 +3,23 @@ import { db } from '../db/sqlite';
 
 const router = Router();
 
-// Add a new agent interaction
+// Add a new agent interaction, optionally with the LLM usage (tokens, latency, cost) it took
 router.post('/', (req: Request, res: Response) => {
-  const { agentId, timestamp, iteration, prompt, reasoning, action, result, final } = req.body;
+  const { agentId, timestamp, iteration, prompt, reasoning, action, result, final, usage } = req.body;
   
   if (!agentId || !timestamp || iteration === undefined || !prompt || !action || !result) {
     return res.status(400).json({ error: 'Missing required fields' });
   }
+  if (usage !== undefined && (typeof usage !== 'object' || usage === null)) {
+    return res.status(400).json({ error: 'usage must be an object' });
+  }
   
   try {
     const stmt = db.prepare(`
       INSERT INTO agent_interactions 
-      (agentId, timestamp, iteration, prompt, reasoning, action, result, final)
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+      (agentId, timestamp, iteration, prompt, reasoning, action, result, final,
+       llmCalls, promptTokens, completionTokens, cachedTokens, llmLatencyMs, costUsd, usageByModel)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     `);
     
     const info = stmt.run(
@@ -26,7 +30,14 @@ router.post('/', (req: Request, res: Response) => {
       reasoning || null,
       typeof action === 'string' ? action : JSON.stringify(action),
       typeof result === 'string' ? result : JSON.stringify(result),
-      final || null
+      final || null,
+      usage?.llmCalls ?? null,
+      usage?.promptTokens ?? null,
+      usage?.completionTokens ?? null,
+      usage?.cachedTokens ?? null,
+      usage?.latencyMs ?? null,
+      usage?.costUsd ?? null,
+      usage?.byModel ? JSON.stringify(usage.byModel) : null
     );
     
     res.status(201).json({ id: info.lastInsertRowid });
@@ -35,6 +46,181 @@ router.post('/', (req: Request, res: Response) => {
   }
 });
 
+// Page through interactions in insertion order (keyset pagination on id).
+// Supports filtering by agent, time range and tool so exports never need the whole table.
+router.get('/', (req: Request, res: Response) => {
+  const afterId = parseInt(req.query.afterId as string) || 0;
+  const requested = req.query.limit === undefined ? 500 : parseInt(req.query.limit as string);
+  if (!(requested > 0)) {
+    return res.status(400).json({ error: 'limit must be a positive integer' });
+  }
+  const limit = Math.min(requested, 5000);
+  const agentId = req.query.agentId as string | undefined;
+  const since = req.query.since as string | undefined;
+  const until = req.query.until as string | undefined;
+  const tool = req.query.tool as string | undefined;
+
+  const conditions: string[] = ['id > ?'];
+  const params: any[] = [afterId];
+
+  if (agentId) {
+    conditions.push('agentId = ?');
+    params.push(agentId);
+  }
+  if (since) {
+    conditions.push('timestamp >= ?');
+    params.push(since);
+  }
+  if (until) {
+    conditions.push('timestamp < ?');
+    params.push(until);
+  }
+  if (tool) {
+    conditions.push("json_extract(action, '$.tool') = ?");
+    params.push(tool);
+  }
+
+  try {
+    const stmt = db.prepare(`
+      SELECT * FROM agent_interactions
+      WHERE ${conditions.join(' AND ')}
+      ORDER BY id ASC
+      LIMIT ?
+    `);
+    const items = stmt.all(...params, limit) as { id: number }[];
+    const nextAfterId = items.length === limit ? items[items.length - 1].id : null;
+    res.json({ items, nextAfterId });
+  } catch (error: any) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
+// LLM spend since a point in time, summed per agent and per model (used to seed budgets).
+// With bucket=hour the sums are also split by UTC hour (the `hour` field is the hour's start).
+router.get('/usage', (req: Request, res: Response) => {
+  const since = req.query.since as string | undefined;
+  const bucket = req.query.bucket as string | undefined;
+  if (!since) {
+    return res.status(400).json({ error: 'since is required' });
+  }
+  if (bucket !== undefined && bucket !== 'hour') {
+    return res.status(400).json({ error: "bucket must be 'hour'" });
+  }
+  const hour = (column: string) => `substr(${column}, 1, 13) || ':00:00.000Z'`;
+  const hourSelect = (column: string) => (bucket ? `${hour(column)} AS hour,` : '');
+  const hourGroup = (column: string) => (bucket ? `, ${hour(column)}` : '');
+
+  try {
+    const agents = db.prepare(`
+      SELECT agentId, ${hourSelect('timestamp')}
+             SUM(llmCalls) AS llmCalls,
+             SUM(promptTokens) AS promptTokens,
+             SUM(completionTokens) AS completionTokens,
+             SUM(cachedTokens) AS cachedTokens,
+             SUM(costUsd) AS costUsd
+      FROM agent_interactions
+      WHERE timestamp >= ? AND costUsd IS NOT NULL
+      GROUP BY agentId${hourGroup('timestamp')}
+    `).all(since);
+    const models = db.prepare(`
+      SELECT m.key AS model, ${hourSelect('ai.timestamp')}
+             SUM(json_extract(m.value, '$.llmCalls')) AS llmCalls,
+             SUM(json_extract(m.value, '$.promptTokens')) AS promptTokens,
+             SUM(json_extract(m.value, '$.completionTokens')) AS completionTokens,
+             SUM(json_extract(m.value, '$.cachedTokens')) AS cachedTokens,
+             SUM(json_extract(m.value, '$.costUsd')) AS costUsd
+      FROM agent_interactions ai, json_each(ai.usageByModel) m
+      WHERE ai.timestamp >= ? AND ai.usageByModel IS NOT NULL
+      GROUP BY m.key${hourGroup('ai.timestamp')}
+    `).all(since);
+    res.json({ since, agents, models });
+  } catch (error: any) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
+// Store (or replace) a compacted summary of an agent's interactions over a period
+router.post('/summaries', (req: Request, res: Response) => {
+  const { agentId, level, periodStart, periodEnd, interactionCount, summary, stats } = req.body;
+
+  if (!agentId || !periodStart || !periodEnd || interactionCount === undefined || !summary) {
+    return res.status(400).json({ error: 'Missing required fields' });
+  }
+  if (level !== 'daily' && level !== 'weekly') {
+    return res.status(400).json({ error: "level must be 'daily' or 'weekly'" });
+  }
+
+  try {
+    const stmt = db.prepare(`
+      INSERT INTO agent_interaction_summaries
+      (agentId, level, periodStart, periodEnd, interactionCount, summary, stats, createdAt)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (agentId, level, periodStart) DO UPDATE SET
+        periodEnd = excluded.periodEnd,
+        interactionCount = excluded.interactionCount,
+        summary = excluded.summary,
+        stats = excluded.stats,
+        createdAt = excluded.createdAt
+    `);
+    stmt.run(
+      agentId,
+      level,
+      periodStart,
+      periodEnd,
+      interactionCount,
+      summary,
+      stats === undefined ? null : (typeof stats === 'string' ? stats : JSON.stringify(stats)),
+      new Date().toISOString()
+    );
+    res.status(201).json({ agentId, level, periodStart });
+  } catch (error: any) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
+// Get compacted summaries for an agent (oldest first). Optional filters: one level,
+// periods starting at or after `since`, and only the most recent `limit`.
+router.get('/agent/:agentId/summaries', (req: Request, res: Response) => {
+  const { agentId } = req.params;
+  const level = req.query.level as string | undefined;
+  const since = req.query.since as string | undefined;
+  const limit = req.query.limit === undefined ? undefined : parseInt(req.query.limit as string);
+  if (limit !== undefined && !(limit > 0)) {
+    return res.status(400).json({ error: 'limit must be a positive integer' });
+  }
+
+  const conditions: string[] = ['agentId = ?'];
+  const params: any[] = [agentId];
+  if (level) {
+    conditions.push('level = ?');
+    params.push(level);
+  }
+  if (since) {
+    conditions.push('periodStart >= ?');
+    params.push(since);
+  }
+
+  try {
+    const summaries = limit === undefined
+      ? db.prepare(`
+          SELECT * FROM agent_interaction_summaries
+          WHERE ${conditions.join(' AND ')}
+          ORDER BY periodStart ASC, level ASC
+        `).all(...params)
+      : db.prepare(`
+          SELECT * FROM (
+            SELECT * FROM agent_interaction_summaries
+            WHERE ${conditions.join(' AND ')}
+            ORDER BY periodStart DESC, level DESC
+            LIMIT ?
+          ) ORDER BY periodStart ASC, level ASC
+        `).all(...params, limit);
+    res.json(summaries);
+  } catch (error: any) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
 // Get interactions for a specific agent
 router.get('/agent/:agentId', (req: Request, res: Response) => {
   const { agentId } = req.params;
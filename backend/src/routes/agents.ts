@@ -1,8 +1,9 @@
 import { Router } from 'express';
 import { v4 as uuid } from 'uuid';
-import { addAgent, findAgent, memory, updateAgent } from '../repo/memory';
-import { createAgentSchema, updateAgentStatusSchema } from '../domain/validation';
+import { addAgent, findAgent, memory, updateAgent, updateAgents } from '../repo/memory';
+import { bulkUpdateAgentsSchema, createAgentSchema, updateAgentStatusSchema } from '../domain/validation';
 import { ApiStatus, CoreModel } from '../domain/models';
+import { db } from '../db/sqlite';
 
 const router = Router();
 
@@ -31,12 +32,46 @@ router.get('/', (_req, res) => {
   res.json(memory.agents);
 });
 
+// One row per agent with its interaction count and latest activity, for listings
+// that would otherwise load every agent's history
+router.get('/summary', (_req, res) => {
+  const rows = db.prepare(`
+    SELECT a.id, a.handle, a.llmModel, a.updatedAt,
+           COUNT(i.id) AS interactionCount, MAX(i.timestamp) AS lastInteractionAt
+    FROM agents a
+    LEFT JOIN agent_interactions i ON i.agentId = a.id
+    GROUP BY a.id
+    ORDER BY a.createdAt DESC
+  `).all() as { id: string; handle: string; llmModel: string | null; updatedAt: string;
+                interactionCount: number; lastInteractionAt: string | null }[];
+  res.json(rows.map(r => ({
+    ...r,
+    updatedAt: r.lastInteractionAt && r.lastInteractionAt > r.updatedAt ? r.lastInteractionAt : r.updatedAt
+  })));
+});
+
 router.get('/:id', (req, res) => {
   const found = findAgent(req.params.id);
   if (!found) return res.status(404).json({ error: 'Agent not found' });
   res.json(found);
 });
 
+// Batch update for admin maintenance jobs (backfills); all updates commit in one transaction
+router.patch('/', (req, res) => {
+  const parsed = bulkUpdateAgentsSchema.safeParse(req.body);
+  if (!parsed.success) return res.status(400).json({ errors: parsed.error.issues });
+  const updated = updateAgents(parsed.data.updates.map(u => ({
+    id: u.id,
+    updater: a => {
+      if (u.profile !== undefined) a.profile = u.profile;
+      if (u.llmModel !== undefined) a.llmModel = u.llmModel;
+    }
+  })));
+  const updatedIds = new Set(updated.map(a => a.id));
+  const notFound = parsed.data.updates.map(u => u.id).filter(id => !updatedIds.has(id));
+  res.json({ updated: updated.map(a => a.id), notFound });
+});
+
 router.patch('/:id/status', (req, res) => {
   const parsed = updateAgentStatusSchema.safeParse(req.body);
   if (!parsed.success) return res.status(400).json({ errors: parsed.error.issues });
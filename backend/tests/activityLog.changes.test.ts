@@ -0,0 +1,28 @@
+import request from 'supertest';
+import { app } from '../src/index';
+import { createAgent } from './helpers';
+
+describe('GET /activity-log/changes', () => {
+  it('returns full records changed since a cursor', async () => {
+    const first = await request(app).get('/activity-log/changes');
+    expect(first.status).toBe(200);
+    const cursor = first.body.cursor;
+
+    const agent = await createAgent(`mirror_${Date.now()}`);
+    const post = await request(app).post('/posts').send({
+      authorAgentId: agent.id,
+      type: 'PROMPT_BRAG',
+      content: 'Mirrors all the way down'
+    });
+    expect(post.status).toBe(201);
+    const ack = await request(app).post(`/posts/${post.body.id}/interactions/ack`).send({ actorAgentId: agent.id });
+    expect(ack.status).toBe(201);
+
+    const delta = await request(app).get('/activity-log/changes').query({ since: cursor });
+    expect(delta.status).toBe(200);
+    expect(delta.body.cursor >= cursor).toBe(true);
+    expect(delta.body.agents.map((a: any) => a.id)).toContain(agent.id);
+    expect(delta.body.posts.find((p: any) => p.id === post.body.id).content).toBe('Mirrors all the way down');
+    expect(delta.body.interactions.find((i: any) => i.postId === post.body.id).kind).toBe('ACK');
+  });
+});
@@ -0,0 +1,176 @@
+import request from 'supertest';
+import { app } from '../src/index';
+import { createAgent } from './helpers';
+
+async function recordInteraction(agentId: string, timestamp: string, tool: string) {
+  const res = await request(app).post('/agent-interactions').send({
+    agentId,
+    timestamp,
+    iteration: 1,
+    prompt: 'Explore the platform',
+    action: { tool, params: {} },
+    result: {}
+  });
+  expect(res.status).toBe(201);
+  return res.body.id;
+}
+
+describe('GET /agent-interactions (paged export)', () => {
+  it('pages by id and filters by agent, time range and tool', async () => {
+    const agent = await createAgent(`exporter_${Date.now()}`);
+    await recordInteraction(agent.id, '2025-01-01T00:00:00.000Z', 'list_posts');
+    await recordInteraction(agent.id, '2025-01-02T00:00:00.000Z', 'create_post');
+    await recordInteraction(agent.id, '2025-01-03T00:00:00.000Z', 'create_post');
+
+    const first = await request(app).get('/agent-interactions').query({ agentId: agent.id, limit: 2 });
+    expect(first.status).toBe(200);
+    expect(first.body.items.length).toBe(2);
+    expect(first.body.nextAfterId).toBe(first.body.items[1].id);
+
+    const second = await request(app).get('/agent-interactions')
+      .query({ agentId: agent.id, limit: 2, afterId: first.body.nextAfterId });
+    expect(second.body.items.length).toBe(1);
+    expect(second.body.nextAfterId).toBeNull();
+
+    const posts = await request(app).get('/agent-interactions')
+      .query({ agentId: agent.id, tool: 'create_post', since: '2025-01-03T00:00:00.000Z' });
+    expect(posts.body.items.length).toBe(1);
+    expect(posts.body.items[0].timestamp).toBe('2025-01-03T00:00:00.000Z');
+
+    expect((await request(app).get('/agent-interactions').query({ limit: -1 })).status).toBe(400);
+    expect((await request(app).get('/agent-interactions').query({ limit: 0 })).status).toBe(400);
+  });
+});
+
+describe('agent interaction summaries', () => {
+  it('upserts summaries per agent, level and period', async () => {
+    const agent = await createAgent(`compactor_${Date.now()}`);
+    const base = {
+      agentId: agent.id,
+      level: 'daily',
+      periodStart: '2025-01-01',
+      periodEnd: '2025-01-02',
+      interactionCount: 2,
+      summary: '2025-01-01: 2 action(s)',
+      stats: { count: 2 }
+    };
+
+    expect((await request(app).post('/agent-interactions/summaries').send(base)).status).toBe(201);
+    expect((await request(app).post('/agent-interactions/summaries')
+      .send({ ...base, interactionCount: 3, summary: 'updated' })).status).toBe(201);
+    expect((await request(app).post('/agent-interactions/summaries')
+      .send({ ...base, level: 'weekly', periodEnd: '2025-01-08' })).status).toBe(201);
+    expect((await request(app).post('/agent-interactions/summaries')
+      .send({ ...base, level: 'monthly' })).status).toBe(400);
+
+    const daily = await request(app).get(`/agent-interactions/agent/${agent.id}/summaries`).query({ level: 'daily' });
+    expect(daily.status).toBe(200);
+    expect(daily.body.length).toBe(1);
+    expect(daily.body[0].interactionCount).toBe(3);
+    expect(daily.body[0].summary).toBe('updated');
+
+    const all = await request(app).get(`/agent-interactions/agent/${agent.id}/summaries`);
+    expect(all.body.length).toBe(2);
+  });
+
+  it('returns the most recent summaries of a level since a period, oldest first', async () => {
+    const agent = await createAgent(`summarized_${Date.now()}`);
+    for (const day of ['2025-02-01', '2025-02-02', '2025-02-03', '2025-02-04']) {
+      const res = await request(app).post('/agent-interactions/summaries').send({
+        agentId: agent.id,
+        level: 'daily',
+        periodStart: day,
+        periodEnd: day,
+        interactionCount: 1,
+        summary: `${day}: 1 action(s)`
+      });
+      expect(res.status).toBe(201);
+    }
+
+    const latest = await request(app).get(`/agent-interactions/agent/${agent.id}/summaries`)
+      .query({ level: 'daily', limit: 2 });
+    expect(latest.status).toBe(200);
+    expect(latest.body.map((s: any) => s.periodStart)).toEqual(['2025-02-03', '2025-02-04']);
+
+    const since = await request(app).get(`/agent-interactions/agent/${agent.id}/summaries`)
+      .query({ level: 'daily', since: '2025-02-02', limit: 10 });
+    expect(since.body.map((s: any) => s.periodStart)).toEqual(['2025-02-02', '2025-02-03', '2025-02-04']);
+
+    expect((await request(app).get(`/agent-interactions/agent/${agent.id}/summaries`)
+      .query({ limit: 0 })).status).toBe(400);
+  });
+});
+
+describe('agent interaction usage', () => {
+  it('stores LLM usage per interaction and sums spend per agent and model', async () => {
+    const agent = await createAgent(`spender_${Date.now()}`);
+    const model = `test-model-${Date.now()}`;
+    const usage = {
+      llmCalls: 3,
+      promptTokens: 1200,
+      completionTokens: 80,
+      cachedTokens: 1024,
+      latencyMs: 2100,
+      costUsd: 0.002,
+      byModel: { [model]: { llmCalls: 3, promptTokens: 1200, completionTokens: 80, cachedTokens: 1024, costUsd: 0.002 } }
+    };
+    for (const timestamp of ['2031-01-01T00:00:00.000Z', '2031-01-01T01:00:00.000Z']) {
+      const res = await request(app).post('/agent-interactions').send({
+        agentId: agent.id,
+        timestamp,
+        iteration: 1,
+        prompt: 'Post something',
+        action: { tool: 'create_post', params: {} },
+        result: {},
+        usage
+      });
+      expect(res.status).toBe(201);
+    }
+    await recordInteraction(agent.id, '2031-01-01T02:00:00.000Z', 'list_posts');  // no usage
+
+    const stored = await request(app).get(`/agent-interactions/agent/${agent.id}`);
+    expect(stored.body[2].promptTokens).toBe(1200);
+    expect(stored.body[2].costUsd).toBeCloseTo(0.002);
+    expect(stored.body[0].costUsd).toBeNull();
+
+    const spend = await request(app).get('/agent-interactions/usage').query({ since: '2031-01-01T00:30:00.000Z' });
+    expect(spend.status).toBe(200);
+    const agentSpend = spend.body.agents.find((a: any) => a.agentId === agent.id);
+    expect(agentSpend.llmCalls).toBe(3);
+    expect(agentSpend.costUsd).toBeCloseTo(0.002);
+    const modelSpend = spend.body.models.find((m: any) => m.model === model);
+    expect(modelSpend.promptTokens).toBe(1200);
+
+    expect((await request(app).get('/agent-interactions/usage')).status).toBe(400);
+  });
+
+  it('splits spend by hour when bucket=hour', async () => {
+    const agent = await createAgent(`hourly_spender_${Date.now()}`);
+    const model = `hourly-model-${Date.now()}`;
+    const spend = [['2032-01-01T00:10:00.000Z', 0.001], ['2032-01-01T00:50:00.000Z', 0.002], ['2032-01-01T01:05:00.000Z', 0.004]];
+    for (const [timestamp, costUsd] of spend) {
+      const res = await request(app).post('/agent-interactions').send({
+        agentId: agent.id,
+        timestamp,
+        iteration: 1,
+        prompt: 'Post something',
+        action: { tool: 'create_post', params: {} },
+        result: {},
+        usage: { llmCalls: 1, costUsd, byModel: { [model]: { llmCalls: 1, costUsd } } }
+      });
+      expect(res.status).toBe(201);
+    }
+
+    const res = await request(app).get('/agent-interactions/usage')
+      .query({ since: '2032-01-01T00:00:00.000Z', bucket: 'hour' });
+    expect(res.status).toBe(200);
+    const hours = res.body.agents.filter((a: any) => a.agentId === agent.id);
+    expect(hours.map((a: any) => a.hour).sort()).toEqual(['2032-01-01T00:00:00.000Z', '2032-01-01T01:00:00.000Z']);
+    expect(hours.find((a: any) => a.hour === '2032-01-01T00:00:00.000Z').costUsd).toBeCloseTo(0.003);
+    const modelHours = res.body.models.filter((m: any) => m.model === model);
+    expect(modelHours.find((m: any) => m.hour === '2032-01-01T01:00:00.000Z').costUsd).toBeCloseTo(0.004);
+
+    expect((await request(app).get('/agent-interactions/usage')
+      .query({ since: '2032-01-01T00:00:00.000Z', bucket: 'day' })).status).toBe(400);
+  });
+});
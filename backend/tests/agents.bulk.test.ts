@@ -0,0 +1,60 @@
+import request from 'supertest';
+import { app } from '../src/index';
+import { createAgent } from './helpers';
+
+describe('PATCH /agents (batch update)', () => {
+  it('updates many agents in one request and reports missing ones', async () => {
+    const suffix = Date.now();
+    const a = await createAgent(`bulk_a_${suffix}`);
+    const b = await createAgent(`bulk_b_${suffix}`);
+
+    const res = await request(app).patch('/agents').send({
+      updates: [
+        { id: a.id, llmModel: 'gpt-4.1-nano' },
+        { id: b.id, profile: 'A meticulous archivist of forgotten benchmark results.' },
+        { id: 'does-not-exist', llmModel: 'gpt-5-nano' }
+      ]
+    });
+    expect(res.status).toBe(200);
+    expect(res.body.updated.sort()).toEqual([a.id, b.id].sort());
+    expect(res.body.notFound).toEqual(['does-not-exist']);
+
+    const updatedA = await request(app).get(`/agents/${a.id}`);
+    expect(updatedA.body.llmModel).toBe('gpt-4.1-nano');
+  });
+
+  it('rejects updates without any field', async () => {
+    const res = await request(app).patch('/agents').send({ updates: [{ id: 'x' }] });
+    expect(res.status).toBe(400);
+  });
+});
+
+describe('GET /agents/summary', () => {
+  it('returns interaction counts and last activity per agent', async () => {
+    const suffix = Date.now();
+    const a = await createAgent(`summary_a_${suffix}`);
+    const b = await createAgent(`summary_b_${suffix}`);
+    for (const iteration of [1, 2]) {
+      const res = await request(app).post('/agent-interactions').send({
+        agentId: a.id,
+        timestamp: `2030-01-01T00:00:0${iteration}.000Z`,
+        iteration,
+        prompt: 'hello',
+        action: { tool: 'none' },
+        result: { ok: true }
+      });
+      expect(res.status).toBe(201);
+    }
+
+    const res = await request(app).get('/agents/summary');
+    expect(res.status).toBe(200);
+    const byId = new Map(res.body.map((row: any) => [row.id, row]));
+    expect(byId.get(a.id)).toMatchObject({
+      handle: a.handle,
+      interactionCount: 2,
+      lastInteractionAt: '2030-01-01T00:00:02.000Z',
+      updatedAt: '2030-01-01T00:00:02.000Z'
+    });
+    expect(byId.get(b.id)).toMatchObject({ interactionCount: 0, lastInteractionAt: null, updatedAt: b.updatedAt });
+  });
+});
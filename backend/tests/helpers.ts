@@ -0,0 +1,14 @@
+import request from 'supertest';
+import { app } from '../src/index';
+
+// Shared test helpers (not a test file: jest only runs *.test.ts)
+
+export async function createAgent(handle: string) {
+  const res = await request(app).post('/agents').send({
+    handle,
+    coreModel: 'OPENAI',
+    parameterCount: 1000000
+  });
+  expect(res.status).toBe(201);
+  return res.body;
+}